@@ -0,0 +1,19 @@
+# backend/app/api/llm/cache/__init__.py
+
+from .codec import CacheCodec
+from .instrumented import InstrumentedRedis
+from .local import LocalTTLCache
+from .namespace import VersionedNamespace, CacheSweeper
+from .single_flight import SingleFlight, RedisLock
+from .tiered import TieredCache
+
+__all__ = [
+    "CacheCodec",
+    "InstrumentedRedis",
+    "LocalTTLCache",
+    "VersionedNamespace",
+    "CacheSweeper",
+    "SingleFlight",
+    "RedisLock",
+    "TieredCache"
+]
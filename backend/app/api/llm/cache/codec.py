@@ -0,0 +1,114 @@
+# backend/app/api/llm/cache/codec.py
+
+import logging
+from typing import Any, Dict
+
+import ormsgpack
+import zstandard
+
+logger = logging.getLogger(__name__)
+
+# 0xFF nunca aparece em UTF-8, então valores gravados antes do codec
+# (texto puro) não se confundem com o cabeçalho
+_MAGIC = 0xFF
+
+# Tipo do valor original (bits 0-1) e compressão (bit 2)
+_KIND_BYTES = 0x00
+_KIND_STR = 0x01
+_KIND_STRUCTURED = 0x02
+_KIND_MASK = 0x03
+_FLAG_ZSTD = 0x04
+
+
+class CacheCodec:
+    """
+    Serialização dos valores gravados no Redis.
+
+    bytes e str são gravados como estão; dicionários, listas e demais
+    estruturas usam MessagePack (binário, mais compacto que JSON). Acima de
+    `compression_threshold` bytes o payload é comprimido com zstandard, e a
+    versão comprimida só é mantida se for de fato menor. Os bytes originais
+    e os armazenados são contabilizados para dimensionar a memória do Redis.
+    """
+
+    def __init__(self, compression_threshold: int = 1024, compression_level: int = 3):
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+        self._compressor = zstandard.ZstdCompressor(level=compression_level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+        self.stats = {
+            "encoded": 0,
+            "decoded": 0,
+            "compressed": 0,
+            "compression_skipped": 0,
+            "original_bytes": 0,
+            "stored_bytes": 0,
+            "legacy_values": 0,
+        }
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Serializa (e comprime, se valer a pena) um valor
+
+        Args:
+            value: bytes, str ou estrutura serializável em MessagePack
+
+        Returns:
+            Payload com cabeçalho de 2 bytes pronto para o Redis
+        """
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            kind, data = _KIND_BYTES, bytes(value)
+        elif isinstance(value, str):
+            kind, data = _KIND_STR, value.encode("utf-8")
+        else:
+            kind, data = _KIND_STRUCTURED, ormsgpack.packb(value)
+
+        flags = kind
+        payload = data
+        if len(data) >= self.compression_threshold:
+            compressed = self._compressor.compress(data)
+            if len(compressed) < len(data):
+                flags |= _FLAG_ZSTD
+                payload = compressed
+                self.stats["compressed"] += 1
+            else:
+                self.stats["compression_skipped"] += 1
+
+        encoded = bytes((_MAGIC, flags)) + payload
+        self.stats["encoded"] += 1
+        self.stats["original_bytes"] += len(data)
+        self.stats["stored_bytes"] += len(encoded)
+        return encoded
+
+    def decode(self, payload: bytes) -> Any:
+        """Reverte `encode`; payloads sem cabeçalho são devolvidos como estão"""
+        if len(payload) < 2 or payload[0] != _MAGIC:
+            self.stats["legacy_values"] += 1
+            return payload
+
+        flags = payload[1]
+        data = payload[2:]
+        if flags & _FLAG_ZSTD:
+            data = self._decompressor.decompress(data)
+
+        self.stats["decoded"] += 1
+        kind = flags & _KIND_MASK
+        if kind == _KIND_STR:
+            return data.decode("utf-8")
+        if kind == _KIND_STRUCTURED:
+            return ormsgpack.unpackb(data)
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Bytes originais x armazenados e taxa de compressão"""
+        stats = self.stats.copy()
+        stats["compression_threshold"] = self.compression_threshold
+        stats["saved_bytes"] = stats["original_bytes"] - stats["stored_bytes"]
+        stats["compression_ratio"] = (
+            stats["original_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 1.0
+        )
+        stats["avg_stored_bytes"] = (
+            stats["stored_bytes"] / stats["encoded"] if stats["encoded"] else 0.0
+        )
+        return stats
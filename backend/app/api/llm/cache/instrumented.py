@@ -0,0 +1,29 @@
+# backend/app/api/llm/cache/instrumented.py
+
+import time
+
+import redis.asyncio as redis
+
+from app.utils.metrics import REGISTRY
+
+REDIS_COMMAND_SECONDS = REGISTRY.histogram(
+    "redis_command_duration_seconds", "Latência dos comandos Redis", ["command", "outcome"]
+)
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Cliente Redis assíncrono que mede cada comando (por nome) no registro
+    de métricas. Pub/sub fica de fora: a espera por mensagens não é latência.
+    """
+
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).split(" ")[0].upper() if args else "UNKNOWN"
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await super().execute_command(*args, **options)
+            outcome = "ok"
+            return result
+        finally:
+            REDIS_COMMAND_SECONDS.observe(time.perf_counter() - started, command=command, outcome=outcome)
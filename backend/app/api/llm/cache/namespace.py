@@ -0,0 +1,128 @@
+# backend/app/api/llm/cache/namespace.py
+
+import asyncio
+import logging
+from typing import Optional
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+class VersionedNamespace:
+    """
+    Namespace de cache invalidado por geração.
+
+    As chaves têm o formato "{nome}:{geração}:{sufixo}". Invalidar o namespace
+    é um único INCR na chave de geração (O(1)); as chaves antigas ficam
+    inalcançáveis e são removidas depois pelo CacheSweeper (ou pelo TTL).
+    """
+
+    def __init__(self, redis_client: redis.Redis, name: str):
+        self.redis_client = redis_client
+        self.name = name
+        self.generation_key = f"{name}:generation"
+
+    async def current(self) -> int:
+        """Geração atual do namespace"""
+        generation = await self.redis_client.get(self.generation_key)
+        return int(generation or 0)
+
+    def key(self, generation: int, suffix: str) -> str:
+        """Monta a chave de cache de uma geração"""
+        return f"{self.name}:{generation}:{suffix}"
+
+    async def bump(self) -> int:
+        """Invalida todas as chaves do namespace avançando a geração"""
+        generation = await self.redis_client.incr(self.generation_key)
+        logger.info(f"Namespace '{self.name}' avançou para a geração {generation}")
+        return generation
+
+    def parse_generation(self, key: str) -> Optional[int]:
+        """Extrai a geração de uma chave (None para chaves fora do formato)"""
+        parts = key.split(":", 2)
+        if len(parts) < 3 or parts[0] != self.name or not parts[1].isdigit():
+            return None
+        return int(parts[1])
+
+
+class CacheSweeper:
+    """
+    Remove em segundo plano as chaves de gerações antigas de um namespace.
+
+    Usa SCAN incremental e UNLINK em lotes pequenos, liberando o event loop
+    entre os lotes, para nunca bloquear o Redis como KEYS + DEL.
+    """
+
+    def __init__(self,
+                 namespace: VersionedNamespace,
+                 batch_size: int = 500,
+                 pause_seconds: float = 0.01):
+        self.namespace = namespace
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._rerun = False
+        self.stats = {"sweeps": 0, "keys_scanned": 0, "keys_removed": 0}
+
+    def _is_stale(self, key: str, current: int) -> bool:
+        if key == self.namespace.generation_key:
+            return False
+        generation = self.namespace.parse_generation(key)
+        # Chaves no formato antigo (sem geração) também são descartadas
+        return generation is None or generation < current
+
+    async def sweep(self) -> int:
+        """
+        Executa uma varredura completa do namespace
+
+        Returns:
+            Quantidade de chaves removidas
+        """
+        redis_client = self.namespace.redis_client
+        current = await self.namespace.current()
+        removed = 0
+        batch = []
+
+        async for raw_key in redis_client.scan_iter(match=f"{self.namespace.name}:*", count=self.batch_size):
+            key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+            self.stats["keys_scanned"] += 1
+            if not self._is_stale(key, current):
+                continue
+
+            batch.append(key)
+            if len(batch) >= self.batch_size:
+                removed += await redis_client.unlink(*batch)
+                batch = []
+                await asyncio.sleep(self.pause_seconds)
+
+        if batch:
+            removed += await redis_client.unlink(*batch)
+
+        self.stats["sweeps"] += 1
+        self.stats["keys_removed"] += removed
+        logger.info(f"Varredura de '{self.namespace.name}' concluída: {removed} chaves removidas")
+        return removed
+
+    async def _run(self):
+        while True:
+            self._rerun = False
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Erro na varredura do cache '{self.namespace.name}': {e}")
+            if not self._rerun:
+                break
+
+    def schedule(self) -> asyncio.Task:
+        """Agenda uma varredura em segundo plano (no máximo uma por vez)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        else:
+            # Nova invalidação durante a varredura: repete ao terminar
+            self._rerun = True
+        return self._task
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
@@ -0,0 +1,75 @@
+# backend/app/api/llm/cache/single_flight.py
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+# Só remove o lock se ele ainda pertencer a quem o adquiriu
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Garante uma única execução concorrente por chave dentro do processo.
+    Chamadas simultâneas para a mesma chave aguardam o resultado da primeira.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "followers": 0}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._in_flight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Executa `fn` ou aguarda a execução já em andamento para a chave"""
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats["followers"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.stats["leaders"] += 1
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # evita o aviso de exceção não lida sem seguidores
+            raise
+        finally:
+            del self._in_flight[key]
+
+
+class RedisLock:
+    """Lock distribuído simples (SET NX PX + liberação condicional) entre workers"""
+
+    def __init__(self, redis_client: redis.Redis, key: str, ttl_ms: int = 10000):
+        self.redis_client = redis_client
+        self.key = key
+        self.ttl_ms = ttl_ms
+        self.token = uuid.uuid4().hex
+
+    async def acquire(self) -> bool:
+        return bool(await self.redis_client.set(self.key, self.token, px=self.ttl_ms, nx=True))
+
+    async def release(self):
+        try:
+            await self.redis_client.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+        except Exception as e:
+            logger.warning(f"Erro ao liberar lock {self.key}: {e}")
@@ -0,0 +1,307 @@
+# backend/app/api/llm/cache/tiered.py
+
+import asyncio
+import logging
+import math
+import random
+import struct
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .codec import CacheCodec
+from .local import LocalTTLCache
+from .namespace import VersionedNamespace
+from .single_flight import RedisLock, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Envelope das entradas de get_or_compute: marcador + (expira_em, custo_do_cálculo)
+_ENTRY_MARKER = b"\x01"
+_ENTRY_HEADER = struct.Struct("!dd")
+
+
+def pack_entry(value: bytes, ttl: float, compute_seconds: float) -> bytes:
+    """Anexa expiração absoluta e custo de recomputação ao valor"""
+    return _ENTRY_MARKER + _ENTRY_HEADER.pack(time.time() + ttl, compute_seconds) + value
+
+
+def unpack_entry(payload: bytes) -> Optional[Tuple[float, float, bytes]]:
+    """Retorna (expira_em, custo, valor) ou None para payloads fora do formato"""
+    if not payload.startswith(_ENTRY_MARKER) or len(payload) < 1 + _ENTRY_HEADER.size:
+        return None
+    expires_at, compute_seconds = _ENTRY_HEADER.unpack_from(payload, 1)
+    return expires_at, compute_seconds, payload[1 + _ENTRY_HEADER.size:]
+
+
+class TieredCache:
+    """
+    Cache em duas camadas: memória do processo (L1) na frente do Redis (L2).
+
+    A geração do namespace fica em memória, então um hit em L1 não faz
+    nenhuma chamada ao Redis. Cada invalidação é publicada via pub/sub para
+    os demais workers, que descartam o L1 na hora; a geração também é
+    revalidada a cada `generation_refresh_seconds` caso uma mensagem se perca.
+
+    No Redis os valores passam pelo `CacheCodec` (compressão e contagem de
+    bytes); o L1 guarda o valor já decodificado.
+    """
+
+    def __init__(self,
+                 namespace: VersionedNamespace,
+                 local_cache: LocalTTLCache = None,
+                 redis_ttl: int = 3600,
+                 generation_refresh_seconds: float = 5.0,
+                 early_refresh_beta: float = 1.0,
+                 distributed_lock: bool = False,
+                 lock_wait_seconds: float = 2.0,
+                 codec: CacheCodec = None):
+        self.namespace = namespace
+        self.redis_client = namespace.redis_client
+        self.local = local_cache or LocalTTLCache()
+        self.codec = codec or CacheCodec()
+        self.redis_ttl = redis_ttl
+        self.generation_refresh_seconds = generation_refresh_seconds
+        self.channel = f"{namespace.name}:invalidations"
+
+        self.early_refresh_beta = early_refresh_beta
+        self.distributed_lock = distributed_lock
+        self.lock_wait_seconds = lock_wait_seconds
+        self.single_flight = SingleFlight()
+
+        self._generation: Optional[int] = None
+        self._generation_checked_at = 0.0
+        self._listener_task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "early_refreshes": 0,
+            "computations": 0,
+            "lock_waits": 0,
+            "errors": 0,
+            "invalidations_received": 0,
+        }
+
+    # ------------------------------------------
+    # Geração
+    # ------------------------------------------
+
+    def _apply_generation(self, generation: int):
+        if generation != self._generation:
+            self._generation = generation
+            self.local.clear()
+        self._generation_checked_at = time.monotonic()
+
+    async def current_generation(self) -> int:
+        """Geração atual, consultando o Redis só quando a cópia local envelhece"""
+        age = time.monotonic() - self._generation_checked_at
+        if self._generation is None or age >= self.generation_refresh_seconds:
+            self._apply_generation(await self.namespace.current())
+        return self._generation
+
+    # ------------------------------------------
+    # Leitura e escrita
+    # ------------------------------------------
+
+    async def get(self, suffix: str) -> Optional[Any]:
+        """Busca primeiro em memória e depois no Redis"""
+        key = self.namespace.key(await self.current_generation(), suffix)
+
+        value = self.local.get(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+
+        payload = await self.redis_client.get(key)
+        if payload is not None:
+            value = self.codec.decode(payload)
+            self.stats["redis_hits"] += 1
+            self.local.set(key, value)
+            return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, suffix: str, value: Any, ttl: Optional[int] = None):
+        """Grava nas duas camadas"""
+        key = self.namespace.key(await self.current_generation(), suffix)
+        ttl = ttl or self.redis_ttl
+        await self.redis_client.set(key, self.codec.encode(value), ex=ttl)
+        self.local.set(key, value, ttl_seconds=min(ttl, self.local.ttl_seconds))
+
+    # ------------------------------------------
+    # Proteção contra stampede
+    # ------------------------------------------
+
+    def _should_refresh_early(self, expires_at: float, compute_seconds: float) -> bool:
+        """
+        Recomputação antecipada probabilística (XFetch): quanto mais perto
+        da expiração e mais caro o cálculo, maior a chance de um único
+        chamador renovar a entrada antes que todos percam o cache juntos.
+        """
+        if self.early_refresh_beta <= 0 or compute_seconds <= 0:
+            return False
+        jitter = -compute_seconds * self.early_refresh_beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= expires_at
+
+    async def _read_entry(self, suffix: str) -> Optional[Tuple[float, float, bytes]]:
+        try:
+            payload = await self.get(suffix)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Erro ao ler cache '{self.namespace.name}': {e}")
+            return None
+        return unpack_entry(payload) if payload is not None else None
+
+    async def _compute_and_store(self,
+                                 suffix: str,
+                                 compute: Callable[[], Awaitable[bytes]],
+                                 ttl: int,
+                                 negative_ttl: int,
+                                 stale: Optional[bytes] = None) -> bytes:
+        lock = None
+        if self.distributed_lock:
+            lock = RedisLock(self.redis_client, f"lock:{self.namespace.name}:{suffix}")
+            try:
+                if not await lock.acquire():
+                    # Outro worker já está calculando: espera o valor aparecer no Redis
+                    self.stats["lock_waits"] += 1
+                    lock = None
+                    if stale is not None:
+                        return stale
+                    entry = await self._wait_for_entry(suffix)
+                    if entry is not None:
+                        return entry[2]
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Erro no lock distribuído de '{self.namespace.name}': {e}")
+                lock = None
+
+        try:
+            started = time.perf_counter()
+            value = await compute()
+            compute_seconds = time.perf_counter() - started
+            self.stats["computations"] += 1
+
+            # Resultado vazio também é cacheado, mas por menos tempo
+            entry_ttl = ttl if value else negative_ttl
+            try:
+                await self.set(suffix, pack_entry(value, entry_ttl, compute_seconds), ttl=entry_ttl)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Erro ao gravar cache '{self.namespace.name}': {e}")
+            return value
+        finally:
+            if lock is not None:
+                await lock.release()
+
+    async def _wait_for_entry(self, suffix: str) -> Optional[Tuple[float, float, bytes]]:
+        deadline = time.monotonic() + self.lock_wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await self._read_entry(suffix)
+            if entry is not None:
+                return entry
+        return None
+
+    async def get_or_compute(self,
+                             suffix: str,
+                             compute: Callable[[], Awaitable[bytes]],
+                             ttl: Optional[int] = None,
+                             negative_ttl: int = 60) -> bytes:
+        """
+        Busca no cache ou calcula o valor com proteção contra stampede
+
+        Args:
+            suffix: Sufixo da chave (ex.: hash da consulta)
+            compute: Corrotina que produz o valor em bytes
+            ttl: TTL de resultados não vazios (padrão: redis_ttl)
+            negative_ttl: TTL de resultados vazios (cache negativo)
+
+        Returns:
+            Valor em cache ou recém-calculado. Erros do Redis não impedem o
+            cálculo; erros de `compute` são propagados sem gravar no cache.
+        """
+        ttl = ttl or self.redis_ttl
+        entry = await self._read_entry(suffix)
+        stale = None
+
+        if entry is not None:
+            expires_at, compute_seconds, value = entry
+            if not value:
+                self.stats["negative_hits"] += 1
+            if not self._should_refresh_early(expires_at, compute_seconds):
+                return value
+            if self.single_flight.in_flight(suffix):
+                # Alguém já está renovando: serve o valor atual
+                return value
+            self.stats["early_refreshes"] += 1
+            stale = value
+
+        return await self.single_flight.do(
+            suffix, lambda: self._compute_and_store(suffix, compute, ttl, negative_ttl, stale)
+        )
+
+    async def invalidate(self) -> int:
+        """Avança a geração e avisa os outros workers"""
+        generation = await self.namespace.bump()
+        self._apply_generation(generation)
+        try:
+            await self.redis_client.publish(self.channel, generation)
+        except Exception as e:
+            logger.warning(f"Erro ao publicar invalidação de '{self.namespace.name}': {e}")
+        return generation
+
+    # ------------------------------------------
+    # Pub/sub entre workers
+    # ------------------------------------------
+
+    async def _listen(self):
+        pubsub = self.redis_client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                self.stats["invalidations_received"] += 1
+                self._apply_generation(int(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Listener de invalidação de '{self.namespace.name}' encerrado: {e}")
+        finally:
+            await pubsub.aclose()
+
+    def start_listener(self):
+        """Começa a escutar invalidações publicadas por outros workers"""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop_listener(self):
+        if self._listener_task and not self._listener_task.done():
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+        self._listener_task = None
+
+    # ------------------------------------------
+    # Estatísticas
+    # ------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit ratio por camada"""
+        stats = self.stats.copy()
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["lookups"] = lookups
+        stats["local_hit_rate"] = (stats["local_hits"] / lookups * 100) if lookups else 0.0
+        stats["redis_hit_rate"] = (stats["redis_hits"] / lookups * 100) if lookups else 0.0
+        stats["generation"] = self._generation
+        stats["listener_running"] = self._listener_task is not None and not self._listener_task.done()
+        stats["single_flight"] = self.single_flight.stats.copy()
+        stats["local"] = self.local.get_stats()
+        stats["codec"] = self.codec.get_stats()
+        return stats
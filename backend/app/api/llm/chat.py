@@ -1,21 +1,39 @@
 # backend/app/api/llm/chat.py
 
+import asyncio
 import os
 import logging
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+import time
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, HTTPException, Depends
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 from typing import Optional
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 # Dependências locais
+from app.data.database import SessionLocal
 from app.data.dependencies import get_db
-from .multiagent.hybrid_conversation_service import (
-    HybridConversationService,
-    MultiAgentBenchmark
-)
+from app.api.auth.auth_bearer import JWTBearer
+from app.utils.embeddings import DEFAULT_INDEX_PATH, VectorIndex
+from app.utils.metrics import REGISTRY
+from .multiagent.hybrid_conversation_service import HybridConversationService, LANGGRAPH_AVAILABLE
+from .multiagent.strategy_selector import StrategySelector
+from .multiagent.benchmark import run_benchmark_subprocess
 from .providers.factory import LLMProviderFactory
+from .cache.codec import CacheCodec
+from .cache.instrumented import InstrumentedRedis
 from .services.rag_service import RAGService
+from .services.answer_cache import AnswerCache
+from .services.prompt_budget import PromptBudget
+from .services.response_templates import ResponseTemplateRegistry
+from .services.intent_router import IntentRouter
+from .services.tool_selector import ToolSelector
+from .services.neo4j_schema import Neo4jSchemaManager
 from .services.conversation_service import ConversationService
+from .warmup import WarmupState
+from .health import HealthProber, ProbeNotReady
 
 # Dependências de serviços externos
 from neo4j import GraphDatabase
@@ -50,6 +68,17 @@ class HealthCheckResponse(BaseModel):
     details: dict
 
 
+class BenchmarkRequest(BaseModel):
+    iterations: int = Field(3, ge=1, le=50)
+    warmup: int = Field(1, ge=0, le=10)
+    llm_latency: float = Field(0.0, ge=0.0, le=5.0)
+    transactions: int = Field(500, ge=0, le=100_000)
+
+
+class StrategyConfig(BaseModel):
+    adaptive: bool
+
+
 # -----------------------------
 # CONFIGURAÇÃO DE SERVIÇOS
 # -----------------------------
@@ -58,6 +87,29 @@ class HealthCheckResponse(BaseModel):
 _conversation_service = None
 _neo4j_driver = None
 _redis_client = None
+_warmup = WarmupState()
+_health = HealthProber()
+
+RAG_CACHE_LOOKUPS = REGISTRY.counter(
+    "rag_cache_lookups_total", "Consultas ao cache de contexto do RAG por resultado", ["result"]
+)
+RAG_CACHE_HIT_RATIO = REGISTRY.gauge(
+    "rag_cache_hit_ratio", "Fração das consultas de contexto servidas pelo cache", ["layer"]
+)
+
+
+def collect_chat_metrics():
+    """Hit rate do cache de contexto (as estatísticas já são mantidas pelo TieredCache)"""
+    if _conversation_service is None:
+        return
+    stats = _conversation_service.rag_service.get_cache_stats()
+    for result in ("local_hits", "redis_hits", "misses"):
+        RAG_CACHE_LOOKUPS.set(stats[result], result=result)
+    for layer in ("local", "redis"):
+        RAG_CACHE_HIT_RATIO.set(stats[f"{layer}_hit_rate"] / 100, layer=layer)
+
+
+REGISTRY.register_collector(collect_chat_metrics)
 
 
 async def get_neo4j_driver():
@@ -89,7 +141,8 @@ async def get_redis_client():
         redis_port = int(os.getenv("REDIS_PORT", 6379))
         redis_db = int(os.getenv("REDIS_DB", 0))
 
-        _redis_client = redis.Redis(
+        # Comandos medidos em redis_command_duration_seconds (/metrics)
+        _redis_client = InstrumentedRedis(
             host=redis_host,
             port=redis_port,
             db=redis_db,
@@ -100,30 +153,139 @@ async def get_redis_client():
     yield _redis_client
 
 
+def _build_conversation_service(neo4j_driver, redis_client) -> HybridConversationService:
+    """
+    Monta o serviço de conversação (bloqueante: índices do Neo4j, histórico
+    de perguntas, treino do roteador e compilação do grafo). Roda numa thread.
+    """
+    # Cria o provedor LLM baseado no ambiente
+    llm_provider = LLMProviderFactory.create_from_env(redis_client)
+    logger.info(f"LLM Provider inicializado: {llm_provider.get_model_info()}")
+
+    # Cria o serviço RAG
+    redis_ttl = int(os.getenv("REDIS_TTL", 3600))
+    compression_threshold = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", 1024))
+    vector_index_path = os.getenv("RAG_VECTOR_INDEX_PATH", DEFAULT_INDEX_PATH)
+    vector_index = None
+    if VectorIndex.exists(vector_index_path):
+        vector_index = VectorIndex(vector_index_path, read_only=True)
+        logger.info(f"Índice vetorial carregado: {vector_index.count} vetores")
+    rag_service = RAGService(
+        neo4j_driver,
+        redis_client,
+        redis_ttl,
+        vector_index=vector_index,
+        local_cache_size=int(os.getenv("CONTEXT_LOCAL_CACHE_SIZE", 1024)),
+        local_cache_ttl=float(os.getenv("CONTEXT_LOCAL_CACHE_TTL", 30)),
+        negative_ttl=int(os.getenv("CONTEXT_NEGATIVE_TTL", 60)),
+        distributed_lock=os.getenv("CONTEXT_CACHE_REDIS_LOCK", "false").lower() == "true",
+        compression_threshold=compression_threshold,
+    )
+    rag_service.ensure_fulltext_indexes()
+
+    # Cria o cache de respostas (desligue com ANSWER_CACHE_ENABLED=false)
+    answer_cache = None
+    if os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true":
+        # Sem limiar, só perguntas idênticas (após normalização) reaproveitam respostas
+        similarity = os.getenv("ANSWER_CACHE_SIMILARITY", "")
+        answer_cache = AnswerCache(
+            redis_client,
+            ttl=int(os.getenv("ANSWER_CACHE_TTL", 900)),
+            similarity_threshold=float(similarity) if similarity else None,
+            codec=CacheCodec(compression_threshold=compression_threshold),
+        )
+
+    # Orçamento de tokens por prompt (limite total e reserva para a resposta)
+    prompt_budget = PromptBudget.for_provider(
+        llm_provider,
+        total_tokens=int(os.getenv("PROMPT_TOKEN_BUDGET", 8000)),
+        completion_reserve=int(os.getenv("PROMPT_COMPLETION_RESERVE", 1024)),
+    )
+
+    # Respostas por template para leituras simples (desligue com RESPONSE_TEMPLATES_ENABLED=false)
+    response_templates = None
+    if os.getenv("RESPONSE_TEMPLATES_ENABLED", "true").lower() == "true":
+        response_templates = ResponseTemplateRegistry.default()
+
+    # Intenções frequentes respondidas sem LLM (treinado com as perguntas do Neo4j)
+    intent_router = None
+    if response_templates and os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true":
+        questions = []
+        try:
+            questions = IntentRouter.load_questions(neo4j_driver)
+        except Exception as e:
+            logger.warning(f"Histórico de perguntas indisponível, treinando só com exemplos: {e}")
+        intent_router = IntentRouter.train(
+            questions,
+            threshold=float(os.getenv("INTENT_ROUTER_THRESHOLD", 0.9)),
+            allow_writes=os.getenv("INTENT_ROUTER_WRITES", "false").lower() == "true",
+        )
+
+    # Vincula ao LLM só as ferramentas da intenção detectada (desligue com TOOL_SUBSET_BINDING=false)
+    tool_selector = None
+    if os.getenv("TOOL_SUBSET_BINDING", "true").lower() == "true":
+        tool_selector = ToolSelector(
+            intent_router or IntentRouter.train(),
+            min_confidence=float(os.getenv("TOOL_SUBSET_MIN_CONFIDENCE", 0.6)),
+        )
+
+    # Checkpoints do LangGraph com descarte por LRU/TTL/memória (LANGGRAPH_CHECKPOINTER=sqlite grava em disco)
+    checkpointer = None
+    if LANGGRAPH_AVAILABLE:
+        from .multiagent.langgraph_implementation import create_checkpointer
+        checkpointer = create_checkpointer(
+            os.getenv("LANGGRAPH_CHECKPOINTER", "memory"),
+            path=os.getenv("LANGGRAPH_CHECKPOINT_PATH"),
+            max_threads=int(os.getenv("LANGGRAPH_CHECKPOINT_MAX_THREADS", 256)),
+            ttl_seconds=float(os.getenv("LANGGRAPH_CHECKPOINT_TTL", 900)),
+            max_bytes=int(float(os.getenv("LANGGRAPH_CHECKPOINT_MAX_MB", 32)) * 1024 * 1024),
+        )
+
+    # Escolha LangGraph x customizado pela latência medida, por bucket de ferramentas
+    strategy_selector = StrategySelector(
+        enabled=os.getenv("STRATEGY_SELECTOR_ENABLED", "true").lower() == "true",
+        epsilon=float(os.getenv("STRATEGY_SELECTOR_EPSILON", 0.1)),
+        min_samples=int(os.getenv("STRATEGY_SELECTOR_MIN_SAMPLES", 3)),
+    )
+
+    # Cria o serviço de conversação
+    # return ConversationService(llm_provider, rag_service, prompt_budget)
+    return HybridConversationService(
+        llm_provider=llm_provider,
+        rag_service=rag_service,
+        answer_cache=answer_cache,
+        prompt_budget=prompt_budget,
+        response_templates=response_templates,
+        intent_router=intent_router,
+        tool_selector=tool_selector,
+        checkpointer=checkpointer,
+        strategy_selector=strategy_selector,
+    )
+
+
+_conversation_service_lock = asyncio.Lock()
+
+
+async def _create_conversation_service(neo4j_driver, redis_client) -> HybridConversationService:
+    """Serviço de conversação do processo, montado fora do event loop na primeira chamada"""
+    global _conversation_service
+
+    async with _conversation_service_lock:
+        if _conversation_service is None:
+            service = await asyncio.to_thread(_build_conversation_service, neo4j_driver, redis_client)
+            # O listener de invalidações é uma task: precisa do event loop
+            service.rag_service.start_cache_listener()
+            _conversation_service = service
+            logger.info("Conversation Service inicializado")
+    return _conversation_service
+
+
 async def get_conversation_service(
     neo4j_driver: GraphDatabase.driver = Depends(get_neo4j_driver),
     redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """Dependency para obter serviço de conversação"""
-    global _conversation_service
-
-    if _conversation_service is None:
-        # Cria o provedor LLM baseado no ambiente
-        llm_provider = LLMProviderFactory.create_from_env()
-        logger.info(f"LLM Provider inicializado: {llm_provider.get_model_info()}")
-
-        # Cria o serviço RAG
-        redis_ttl = int(os.getenv("REDIS_TTL", 3600))
-        rag_service = RAGService(neo4j_driver, redis_client, redis_ttl)
-
-        # Cria o serviço de conversação
-        # _conversation_service = ConversationService(llm_provider, rag_service)
-        _conversation_service = HybridConversationService(
-            llm_provider=llm_provider, rag_service=rag_service
-        )
-        logger.info("Conversation Service inicializado")
-
-    yield _conversation_service
+    yield await _create_conversation_service(neo4j_driver, redis_client)
 
 
 # -----------------------------
@@ -166,20 +328,25 @@ async def chat_endpoint(
 
 
 @router.get("/health", response_model=HealthCheckResponse)
-async def health_check(
-    conversation_service: HybridConversationService = Depends(get_conversation_service),
-):
+async def health_check():
     """
     Endpoint para verificar a saúde do serviço de chat
+
+    Retorna o último resultado das verificações em segundo plano (LLM, Neo4j,
+    Redis, banco) com a idade de cada uma; nenhuma chamada externa por requisição.
     """
     try:
-        health_details = await conversation_service.health_check()
+        if not _health.probes:
+            configure_health_probes()
+        if not _health.running:
+            # HEALTH_PROBE_ENABLED=false: verifica sob demanda, respeitando o intervalo
+            await _health.check_due()
 
-        # Determina status geral
-        is_healthy = health_details.get("conversation_service") == "healthy"
-        status = "healthy" if is_healthy else "unhealthy"
+        health_details = _health.snapshot()
+        if _conversation_service is not None:
+            health_details["service"] = await _conversation_service.health_check()
 
-        return HealthCheckResponse(status=status, details=health_details)
+        return HealthCheckResponse(status=health_details["status"], details=health_details)
 
     except Exception as e:
         logger.error(f"Erro no health check: {str(e)}")
@@ -191,16 +358,30 @@ async def clear_cache(
     conversation_service: HybridConversationService = Depends(get_conversation_service),
 ):
     """
-    Endpoint para limpar o cache Redis
+    Endpoint para limpar o cache Redis (O(1); a remoção física é em segundo plano)
     """
     try:
-        await conversation_service.rag_service.clear_cache()
-        return {"message": "Cache limpo com sucesso"}
+        generation = await conversation_service.rag_service.clear_cache()
+        return {"message": "Cache limpo com sucesso", "generation": generation}
     except Exception as e:
         logger.error(f"Erro ao limpar cache: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/cache-stats")
+async def get_cache_stats(
+    conversation_service: HybridConversationService = Depends(get_conversation_service),
+):
+    """
+    Endpoint com hit ratios dos caches de contexto (por camada) e de respostas
+    """
+    answer_cache = conversation_service.answer_cache
+    return {
+        "context_cache": conversation_service.rag_service.get_cache_stats(),
+        "answer_cache": answer_cache.get_stats() if answer_cache else "disabled",
+    }
+
+
 @router.get("/provider-info")
 async def get_provider_info(
     conversation_service: HybridConversationService = Depends(get_conversation_service),
@@ -223,16 +404,205 @@ async def get_available_providers():
     }
 
 
+@router.get("/admin/strategy", tags=["admin"], dependencies=[Depends(JWTBearer())])
+async def get_strategy(
+    conversation_service: HybridConversationService = Depends(get_conversation_service),
+):
+    """
+    Endpoint com as decisões do seletor de estratégia e a latência por bucket e caminho
+    """
+    selector = conversation_service.strategy_selector
+    return selector.get_stats() if selector else {"enabled": False}
+
+
+@router.post("/admin/strategy", tags=["admin"], dependencies=[Depends(JWTBearer())])
+async def configure_strategy(
+    config: StrategyConfig,
+    conversation_service: HybridConversationService = Depends(get_conversation_service),
+):
+    """
+    Liga/desliga a seleção adaptativa (desligada, valem as regras estáticas)
+    """
+    conversation_service.configure_strategy(adaptive=config.adaptive)
+    selector = conversation_service.strategy_selector
+    return {"adaptive": bool(selector and selector.enabled)}
+
+
+# -----------------------------
+# BENCHMARK COMPARATIVO
+# -----------------------------
+
+
+_benchmark_lock = asyncio.Lock()
+
+
+@router.post("/admin/benchmark", tags=["admin"], dependencies=[Depends(JWTBearer())])
+async def run_benchmark(request: BenchmarkRequest = BenchmarkRequest()):
+    """
+    Endpoint para executar benchmark comparativo entre agentes (LangGraph x
+    orquestrador customizado) com LLM roteirizado e banco em memória.
+
+    Roda em outro processo, um por vez: não compartilha a sessão das
+    ferramentas nem o tracemalloc com o servidor.
+    """
+    if _benchmark_lock.locked():
+        raise HTTPException(status_code=409, detail="Já existe um benchmark em execução")
+
+    async with _benchmark_lock:
+        try:
+            return await run_benchmark_subprocess(
+                timeout=float(os.getenv("BENCHMARK_TIMEOUT", 600)),
+                iterations=request.iterations,
+                warmup=request.warmup,
+                llm_latency=request.llm_latency,
+                transactions=request.transactions,
+            )
+        except TimeoutError as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        except RuntimeError as e:
+            logger.error(str(e))
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+# -----------------------------
+# INICIALIZAÇÃO
+# -----------------------------
+
+
+def _ping_database():
+    """Abre a primeira conexão do pool do banco relacional"""
+    with SessionLocal() as db:
+        db.execute(text("SELECT 1"))
+
+
+async def _warm_neo4j():
+    """Conecta ao Neo4j e garante constraints e índices antes das primeiras conversas"""
+    neo4j_driver = await anext(get_neo4j_driver())
+    await asyncio.to_thread(neo4j_driver.verify_connectivity)
+    await asyncio.to_thread(Neo4jSchemaManager(neo4j_driver).ensure_schema)
+    return neo4j_driver
+
+
+async def _warm_redis():
+    redis_client = await anext(get_redis_client())
+    await redis_client.ping()
+    return redis_client
+
+
+async def _warm_caches(conversation_service: HybridConversationService):
+    """Geração do cache de contexto e páginas do índice vetorial já carregadas"""
+    rag_service = conversation_service.rag_service
+    await rag_service.context_namespace.current()
+    if rag_service.vector_index is not None:
+        await asyncio.to_thread(rag_service.vector_index.search, "saldo do mês", 1)
+
+
+async def warm_up():
+    """
+    Cria banco, Neo4j, Redis, provedor LLM, serviço de conversação e grafo
+    LangGraph antes da primeira requisição, com o tempo de cada componente
+    """
+    timeout = float(os.getenv("WARMUP_STEP_TIMEOUT", 30))
+    _warmup.start()
+    await _warmup.run_step("database", lambda: asyncio.to_thread(_ping_database), timeout=timeout)
+    neo4j_driver = await _warmup.run_step("neo4j", _warm_neo4j, timeout=timeout)
+    redis_client = await _warmup.run_step("redis", _warm_redis, timeout=timeout)
+
+    if neo4j_driver is not None and redis_client is not None:
+        # Provedor, RAG, roteador de intenções e grafo compilado (ver get_conversation_service)
+        conversation_service = await _warmup.run_step(
+            "conversation_service",
+            lambda: _create_conversation_service(neo4j_driver, redis_client),
+            timeout=float(os.getenv("WARMUP_SERVICE_TIMEOUT", 120)),
+        )
+        if conversation_service is not None:
+            await _warmup.run_step("caches", lambda: _warm_caches(conversation_service),
+                                   required=False, timeout=timeout)
+    _warmup.finish()
+
+
+async def _probe_neo4j():
+    neo4j_driver = await anext(get_neo4j_driver())
+    await asyncio.to_thread(neo4j_driver.verify_connectivity)
+
+
+async def _probe_redis():
+    redis_client = await anext(get_redis_client())
+    await redis_client.ping()
+
+
+async def _probe_llm():
+    """
+    Tráfego real recente conta como verificação; sem ele, um ping mínimo ao modelo.
+    Nunca cria o serviço (isso cabe ao aquecimento ou à primeira requisição).
+    """
+    conversation_service = _conversation_service
+    if conversation_service is None:
+        raise ProbeNotReady("serviço de conversação ainda não criado")
+    provider = conversation_service.llm_provider
+    last_success = provider.last_success_at
+    if last_success is not None and time.monotonic() - last_success < _health.probes["llm"]["interval"]:
+        return {"source": "traffic", "last_success_age": time.monotonic() - last_success}
+    await provider.ping()
+    return {"source": "ping"}
+
+
+def configure_health_probes():
+    """
+    Registra as dependências do health check; o LLM é verificado com menos
+    frequência para não gastar cota do provedor
+    """
+    _health.interval = float(os.getenv("HEALTH_PROBE_INTERVAL", 15))
+    _health.timeout = float(os.getenv("HEALTH_PROBE_TIMEOUT", 5))
+    _health.register("database", lambda: asyncio.to_thread(_ping_database))
+    _health.register("neo4j", _probe_neo4j)
+    _health.register("redis", _probe_redis)
+    _health.register(
+        "llm",
+        _probe_llm,
+        interval=float(os.getenv("HEALTH_LLM_INTERVAL", 300)),
+        timeout=float(os.getenv("HEALTH_LLM_TIMEOUT", 20)),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Aquecimento e health checks em segundo plano na subida e limpeza dos recursos na parada"""
+    warmup_task = None
+    if os.getenv("WARMUP_ENABLED", "true").lower() == "true":
+        warmup_task = asyncio.create_task(warm_up())
+    configure_health_probes()
+    if os.getenv("HEALTH_PROBE_ENABLED", "true").lower() == "true":
+        _health.start()
+    try:
+        yield
+    finally:
+        if warmup_task and not warmup_task.done():
+            warmup_task.cancel()
+        await _health.stop()
+        await shutdown_resources()
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    Endpoint de prontidão: 503 até o aquecimento terminar, com o cold start por componente
+    """
+    return JSONResponse(_warmup.to_dict(), status_code=200 if _warmup.ready else 503)
+
+
 # -----------------------------
 # LIMPEZA DE RECURSOS
 # -----------------------------
 
 
-@router.on_event("shutdown")
-async def shutdown_event():
+async def shutdown_resources():
     """Limpa recursos ao desligar"""
     global _neo4j_driver, _redis_client
 
+    if _conversation_service:
+        await _conversation_service.rag_service.stop_cache_listener()
+
     if _neo4j_driver:
         _neo4j_driver.close()
         logger.info("Neo4j driver fechado")
@@ -240,23 +610,3 @@ async def shutdown_event():
     if _redis_client:
         await _redis_client.close()
         logger.info("Redis client fechado")
-        # -----------------------------
-        # BENCHMARK COMPARATIVO
-        # -----------------------------
-
-
-        @router.post("/benchmark")
-        async def run_benchmark(
-            conversation_service: HybridConversationService = Depends(get_conversation_service),
-        ):
-            """
-            Endpoint para executar benchmark comparativo entre agentes
-            """
-            benchmark = MultiAgentBenchmark(conversation_service)
-            test_queries = [
-                "Calcule as métricas do portfolio ABC",
-                "Análise completa de risco e retorno da empresa XYZ",
-                "Comparativo de performance entre fundos A, B e C"
-            ]
-            results = await benchmark.run_benchmark(test_queries, iterations=3)
-            return {"recommendation": results.get("recommendation"), "details": results}
\ No newline at end of file
@@ -0,0 +1,162 @@
+# backend/app/api/llm/health.py
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeNotReady(Exception):
+    """A dependência ainda não foi criada (status "unknown" até ficar pronta)"""
+
+
+class HealthProber:
+    """
+    Verifica as dependências (LLM, Neo4j, Redis, banco) em segundo plano.
+
+    Cada dependência tem intervalo e timeout próprios e o último resultado
+    fica em cache: /health só lê o snapshot, sem disparar chamadas
+    externas por requisição.
+    """
+
+    def __init__(self, interval: float = 15.0, timeout: float = 5.0):
+        self.interval = interval
+        self.timeout = timeout
+        self.probes: Dict[str, Dict[str, Any]] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.stats = {"probes": 0, "failures": 0, "timeouts": 0}
+
+    def register(self,
+                 name: str,
+                 probe: Callable[[], Awaitable[Any]],
+                 interval: Optional[float] = None,
+                 timeout: Optional[float] = None,
+                 required: bool = True):
+        """
+        Registra uma dependência
+
+        Args:
+            name: Nome da dependência (aparece em /health)
+            probe: Função assíncrona que falha se a dependência estiver fora;
+                   um dict retornado entra nos detalhes
+            interval: Segundos entre verificações
+            timeout: Limite em segundos de cada verificação
+            required: Falha deixa o serviço unhealthy?
+        """
+        self.probes[name] = {
+            "probe": probe,
+            "interval": interval or self.interval,
+            "timeout": timeout or self.timeout,
+            "required": required,
+        }
+
+    async def check(self, name: str) -> Dict[str, Any]:
+        """Executa a verificação e guarda o resultado"""
+        config = self.probes[name]
+        started = time.perf_counter()
+        result = {"status": "healthy"}
+        try:
+            details = await asyncio.wait_for(config["probe"](), config["timeout"])
+            if isinstance(details, dict):
+                result["details"] = details
+        except ProbeNotReady as e:
+            result = {"status": "unknown", "reason": str(e)}
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            result = {"status": "unhealthy", "error": f"timeout após {config['timeout']}s"}
+        except Exception as e:
+            result = {"status": "unhealthy", "error": str(e) or type(e).__name__}
+
+        self.stats["probes"] += 1
+        if result["status"] == "unhealthy":
+            self.stats["failures"] += 1
+            previous = self.results.get(name, {}).get("status")
+            if previous != "unhealthy":
+                logger.warning(f"Health check: {name} indisponível: {result['error']}")
+
+        result.update({
+            "latency_seconds": time.perf_counter() - started,
+            "checked_at": datetime.now().isoformat(),
+            "_checked_monotonic": time.monotonic(),
+        })
+        self.results[name] = result
+        return result
+
+    async def check_all(self):
+        """Verifica todas as dependências em paralelo"""
+        await asyncio.gather(*(self.check(name) for name in self.probes))
+
+    async def check_due(self):
+        """Sem o laço em segundo plano: verifica só as dependências com resultado vencido"""
+        now = time.monotonic()
+        due = [
+            name for name, config in self.probes.items()
+            if name not in self.results or now - self.results[name]["_checked_monotonic"] >= self._interval(name)
+        ]
+        await asyncio.gather(*(self.check(name) for name in due))
+
+    def _interval(self, name: str) -> float:
+        """Intervalo até a próxima verificação (curto enquanto a dependência não existe)"""
+        interval = self.probes[name]["interval"]
+        if self.results.get(name, {}).get("status") == "unknown":
+            return min(interval, self.interval)
+        return interval
+
+    async def _loop(self, name: str):
+        while True:
+            await self.check(name)
+            await asyncio.sleep(self._interval(name))
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks.values())
+
+    def start(self):
+        """Inicia um laço por dependência (uma lenta não atrasa as demais)"""
+        for name in self.probes:
+            if name not in self._tasks or self._tasks[name].done():
+                self._tasks[name] = asyncio.create_task(self._loop(name))
+        logger.info(f"Health checks em segundo plano: {', '.join(self.probes)}")
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Último resultado de cada dependência com a idade da verificação
+
+        Returns:
+            Status geral ("healthy", "unhealthy" ou "starting" antes da
+            primeira verificação) e resultados por dependência
+        """
+        now = time.monotonic()
+        dependencies = {}
+        for name, config in self.probes.items():
+            result = self.results.get(name)
+            if result is None:
+                dependencies[name] = {"status": "unknown", "required": config["required"]}
+                continue
+            age = now - result["_checked_monotonic"]
+            entry = {key: value for key, value in result.items() if not key.startswith("_")}
+            entry.update({"required": config["required"], "age_seconds": age})
+            # Laço parado ou travado: o resultado antigo não vale mais
+            if age > 3 * config["interval"] + config["timeout"]:
+                entry["status"] = "stale"
+            dependencies[name] = entry
+
+        required = [entry["status"] for entry in dependencies.values() if entry["required"]]
+        if any(status not in ("healthy", "unknown") for status in required):
+            status = "unhealthy"
+        elif "unknown" in required:
+            status = "starting"
+        else:
+            status = "healthy"
+        return {"status": status, "dependencies": dependencies, "prober": dict(self.stats)}
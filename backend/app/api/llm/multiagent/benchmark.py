@@ -0,0 +1,536 @@
+# ==========================================
+# backend/app/api/llm/multiagent/benchmark.py
+# ==========================================
+"""
+Benchmark ponta a ponta dos dois caminhos do HybridConversationService
+(LangGraph e orquestrador customizado), sem rede:
+
+- LLM: provider roteirizado (ou ReplayProvider com um cassete gravado)
+- Banco: SQLite em memória com categorias e transações geradas com semente fixa
+- RAG: contexto estático, sem Neo4j/Redis
+
+Uso (a partir de backend/):
+    python -m app.api.llm.multiagent.benchmark --iterations 5 --output resultado.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.tools import BaseTool
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.data.models import Base, Category, Transaction
+from app.data.seed import seed_categories
+from ..providers.base_provider import BaseLLMProvider
+from ..providers.replay_provider import ReplayProvider
+from ..providers.tool_subset import active_tool_subset
+from ..services.intent_router import IntentRouter
+from ..services.tool_selector import ToolSelector
+from .strategy_selector import StrategySelector
+from ..services.response_templates import ResponseTemplateRegistry
+from .hybrid_conversation_service import ERROR_PREFIXES, HybridConversationService
+
+logger = logging.getLogger(__name__)
+
+# Diretório backend/ (de onde a CLI roda com python -m)
+BACKEND_DIR = Path(__file__).resolve().parents[4]
+
+# Perguntas do benchmark e as ferramentas que o LLM roteirizado pede para cada uma
+# (leituras do app, executadas pelos dois caminhos)
+DEFAULT_CORPUS: List[Dict[str, Any]] = [
+    {
+        "query": "Quais categorias existem?",
+        "tool_calls": [{"name": "get_categories", "args": {}}],
+    },
+    {
+        "query": "Mostre os detalhes da transação 3",
+        "tool_calls": [{"name": "get_transaction_by_id", "args": {"transaction_id": 3}}],
+    },
+    {
+        "query": "Qual categoria teve o maior gasto em 2024?",
+        "tool_calls": [{"name": "get_top_spending_category",
+                        "args": {"start_date": "2024-01-01", "end_date": "2024-12-31"}}],
+    },
+    {
+        "query": "Liste minhas receitas",
+        "tool_calls": [{"name": "get_transactions_by_type", "args": {"type": "income"}}],
+    },
+    {
+        "query": "Análise completa das despesas do primeiro trimestre por categoria e tipo",
+        "tool_calls": [
+            {"name": "get_categories", "args": {}},
+            {"name": "get_transactions_by_type_and_date_range",
+             "args": {"transaction_type": "expense", "start_date": "2024-01-01", "end_date": "2024-03-31"}},
+            {"name": "get_top_spending_category",
+             "args": {"start_date": "2024-01-01", "end_date": "2024-03-31"}},
+        ],
+    },
+    {
+        "query": "Qual foi meu saldo em 2024 e quais foram minhas receitas?",
+        "tool_calls": [
+            {"name": "get_balance", "args": {"start_date": "2024-01-01", "end_date": "2024-12-31"}},
+            {"name": "get_transactions_by_type", "args": {"type": "income"}},
+        ],
+    },
+    {
+        "query": "Olá, tudo bem?",
+        "tool_calls": [],
+    },
+]
+
+BENCHMARK_CONTEXT = "Transações financeiras pessoais categorizadas em receitas e despesas."
+
+
+class ScriptedLLMProvider(BaseLLMProvider):
+    """
+    Provider determinístico: pede as ferramentas roteirizadas para a
+    pergunta e, com os resultados em mãos, responde com um resumo.
+    """
+
+    def __init__(self,
+                 corpus: List[Dict[str, Any]] = None,
+                 latency: float = 0.0,
+                 model_name: str = "scripted",
+                 temperature: float = 0.0,
+                 **kwargs):
+        super().__init__(model_name, temperature, **kwargs)
+        self.scripts = {item["query"]: item["tool_calls"] for item in corpus or DEFAULT_CORPUS}
+        self.latency = latency
+
+    def _initialize_llm(self, tools: List[BaseTool]) -> Any:
+        return self
+
+    async def invoke(self, messages: List[BaseMessage]) -> Any:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        tool_results = [m for m in messages if isinstance(m, ToolMessage)]
+        if tool_results:
+            return AIMessage(content=f"Resumo baseado em {len(tool_results)} resultado(s) de ferramentas.")
+
+        # Como um modelo real, só pede ferramentas vinculadas nesta requisição
+        self._get_bound_llm()
+        subset = active_tool_subset()
+        query = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        tool_calls = [call for call in self.scripts.get(query, []) if subset is None or call["name"] in subset]
+        if not tool_calls:
+            return AIMessage(content="Olá! Como posso ajudar com suas finanças?")
+        return AIMessage(content="", tool_calls=[
+            {"name": call["name"], "args": call["args"], "id": f"call_{index}"}
+            for index, call in enumerate(tool_calls)
+        ])
+
+    @property
+    def provider_name(self) -> str:
+        return "scripted"
+
+
+class CallCountingProvider(BaseLLMProvider):
+    """Conta as invocações feitas ao provider envolvido"""
+
+    def __init__(self, provider: BaseLLMProvider):
+        super().__init__(provider.model_name, provider.temperature)
+        self.provider = provider
+        self.calls = 0
+
+    def _initialize_llm(self, tools: List[BaseTool]) -> Any:
+        return self.provider._initialize_llm(tools)
+
+    def bind_tools(self, tools: List[BaseTool]):
+        self.provider.bind_tools(tools)
+        self._llm_with_tools = self.provider._llm_with_tools
+        return self
+
+    async def invoke(self, messages: List[BaseMessage]) -> Any:
+        self.calls += 1
+        return await self.provider.invoke(messages)
+
+    @property
+    def provider_name(self) -> str:
+        return self.provider.provider_name
+
+    def get_model_info(self) -> Dict[str, Any]:
+        return self.provider.get_model_info()
+
+
+class StaticContextService:
+    """Substitui o RAGService no benchmark: contexto fixo e nada é gravado"""
+
+    def __init__(self, context: str = BENCHMARK_CONTEXT):
+        self.context = context
+
+    async def get_relevant_context(self, search_query: str) -> str:
+        return self.context
+
+    async def save_conversation(self, user_id: str, question: str, answer: str, context: str):
+        return None
+
+
+def create_seeded_session(transactions: int = 500, seed: int = 42) -> Session:
+    """
+    Cria um banco SQLite em memória com as categorias padrão e transações
+    aleatórias (reprodutíveis pela semente) ao longo de 2024
+    """
+    # StaticPool: as ferramentas rodam em threads do executor e precisam da mesma conexão
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    seed_categories(db)
+
+    categories = db.query(Category).all()
+    rng = np.random.default_rng(seed)
+    start = date(2024, 1, 1)
+    for index in range(transactions):
+        category = categories[int(rng.integers(len(categories)))]
+        db.add(Transaction(
+            amount=round(float(rng.lognormal(4.5, 1.0)), 2),
+            category_id=category.id,
+            date=start + timedelta(days=int(rng.integers(366))),
+            description=f"{category.name} #{index}",
+            type=category.type,
+        ))
+    db.commit()
+    return db
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "mean": float(np.mean(values))}
+
+
+class MultiAgentBenchmark:
+    """Benchmark entre as implementações LangGraph e customizada"""
+
+    PATHS = ("langgraph", "custom")
+
+    def __init__(self,
+                 hybrid_service: HybridConversationService,
+                 db_session: Session,
+                 llm_counter: Optional[CallCountingProvider] = None):
+        self.hybrid_service = hybrid_service
+        self.db_session = db_session
+        self.llm_counter = llm_counter
+        self.benchmark_results: Dict[str, List[Dict[str, Any]]] = {}
+        self.peak_memory: Dict[str, int] = {}
+
+    def _tool_calls_executed(self) -> int:
+        total = self.hybrid_service.custom_orchestrator.execution_stats["total_tasks_executed"]
+        if self.hybrid_service.langgraph_agent:
+            total += self.hybrid_service.langgraph_agent.stats["tool_calls"]
+        return total
+
+    async def _run_query(self, path: str, query: str, iteration: int) -> Dict[str, Any]:
+        llm_before = self.llm_counter.calls if self.llm_counter else 0
+        tools_before = self._tool_calls_executed()
+
+        started = time.perf_counter()
+        response, _ = await self.hybrid_service.process_conversation(
+            query, user_id="benchmark", db_session=self.db_session
+        )
+        latency = time.perf_counter() - started
+
+        return {
+            "path": path,
+            "query": query,
+            "iteration": iteration,
+            "latency": latency,
+            "success": bool(response) and not response.startswith(ERROR_PREFIXES),
+            "llm_calls": (self.llm_counter.calls - llm_before) if self.llm_counter else None,
+            "tool_calls": self._tool_calls_executed() - tools_before,
+        }
+
+    def available_paths(self) -> List[str]:
+        paths = [path for path in self.PATHS
+                 if path != "langgraph" or self.hybrid_service.langgraph_agent is not None]
+        # "adaptive": sem override, o seletor de estratégia escolhe o caminho
+        if self.hybrid_service.strategy_selector and len(paths) > 1:
+            paths.append("adaptive")
+        return paths
+
+    async def run_benchmark(self, test_queries: list, iterations: int = 3, warmup: int = 1) -> Dict[str, Any]:
+        """
+        Executa benchmark comparativo
+
+        Args:
+            test_queries: Perguntas a executar em cada caminho
+            iterations: Repetições medidas de cada pergunta
+            warmup: Repetições descartadas antes da medição
+
+        Returns:
+            Análise com distribuição de latência e contadores por caminho
+        """
+        original_override = self.hybrid_service.strategy_override
+        try:
+            for path in self.available_paths():
+                self.hybrid_service.strategy_override = None if path == "adaptive" else path
+                for _ in range(warmup):
+                    for query in test_queries:
+                        await self._run_query(path, query, 0)
+
+                runs = []
+                for iteration in range(1, iterations + 1):
+                    for query in test_queries:
+                        runs.append(await self._run_query(path, query, iteration))
+                self.benchmark_results[path] = runs
+
+                # Memória medida numa passada separada: tracemalloc distorce a latência
+                tracemalloc.start()
+                try:
+                    for query in test_queries:
+                        await self._run_query(path, query, 0)
+                    self.peak_memory[path] = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+        finally:
+            self.hybrid_service.strategy_override = original_override
+
+        return self.analyze_benchmark_results()
+
+    def analyze_benchmark_results(self) -> Dict[str, Any]:
+        """Analisa resultados do benchmark"""
+        if not self.benchmark_results:
+            return {"message": "Nenhum benchmark executado"}
+
+        # Perguntas em que algum caminho executou ferramentas: execuções sem
+        # nenhuma ferramenta nelas não responderam a pergunta e não entram na latência
+        tool_queries = {
+            run["query"] for runs in self.benchmark_results.values() for run in runs if run["tool_calls"]
+        }
+
+        analysis: Dict[str, Any] = {"paths": {}, "recommendation": ""}
+        for path, runs in self.benchmark_results.items():
+            without_tools = [run for run in runs if run["query"] in tool_queries and not run["tool_calls"]]
+            successes = [run for run in runs if run["success"] and run not in without_tools]
+            per_query = {}
+            for run in runs:
+                per_query.setdefault(run["query"], []).append(run["latency"])
+
+            llm_calls = [run["llm_calls"] for run in runs if run["llm_calls"] is not None]
+            analysis["paths"][path] = {
+                "executions": len(runs),
+                "success_rate": len(successes) / len(runs) * 100 if runs else 0.0,
+                "latency_seconds": _percentiles([run["latency"] for run in successes]),
+                "llm_calls_total": sum(llm_calls) if llm_calls else None,
+                "llm_calls_per_query": float(np.mean(llm_calls)) if llm_calls else None,
+                "tool_calls_total": sum(run["tool_calls"] for run in runs),
+                "tool_calls_per_query": float(np.mean([run["tool_calls"] for run in runs])),
+                "runs_without_tools": len(without_tools),
+                "comparable": not without_tools,
+                "peak_memory_bytes": self.peak_memory.get(path),
+                "per_query_p50_seconds": {
+                    query: float(np.percentile(latencies, 50)) for query, latencies in per_query.items()
+                },
+            }
+
+        paths = analysis["paths"]
+        excluded = [path for path in ("langgraph", "custom") if path in paths and not paths[path]["comparable"]]
+        if len(paths) < 2:
+            analysis["recommendation"] = "LangGraph indisponível - apenas o orquestrador customizado foi medido"
+        elif excluded:
+            # Latência de um caminho que não executou as ferramentas pedidas não é comparável
+            analysis["recommendation"] = (
+                f"Sem comparação - {', '.join(excluded)} não executou as ferramentas pedidas em "
+                f"{sum(paths[path]['runs_without_tools'] for path in excluded)} execução(ões)"
+            )
+        else:
+            lg, custom = paths["langgraph"], paths["custom"]
+            lg_p95, custom_p95 = lg["latency_seconds"]["p95"], custom["latency_seconds"]["p95"]
+            if lg["success_rate"] > custom["success_rate"] and lg_p95 < custom_p95 * 1.5:
+                analysis["recommendation"] = "LangGraph recomendado - melhor sucesso e p95 aceitável"
+            elif custom_p95 < lg_p95 * 0.7:
+                analysis["recommendation"] = "Implementação customizada recomendada - p95 significativamente menor"
+            else:
+                analysis["recommendation"] = "Estratégia híbrida recomendada - usar baseado na complexidade"
+        return analysis
+
+
+async def run_offline_benchmark(queries: List[str] = None,
+                                iterations: int = 3,
+                                warmup: int = 1,
+                                llm_latency: float = 0.0,
+                                cassette: Optional[str] = None,
+                                transactions: int = 500,
+                                seed: int = 42,
+                                response_templates: bool = False,
+                                intent_router: bool = False,
+                                tool_subsets: bool = False,
+                                adaptive_strategy: bool = False) -> Dict[str, Any]:
+    """
+    Monta o ambiente offline e executa o benchmark
+
+    Args:
+        queries: Perguntas (padrão: DEFAULT_CORPUS)
+        iterations: Repetições medidas por pergunta e caminho
+        warmup: Repetições descartadas
+        llm_latency: Latência simulada por chamada do provider roteirizado
+        cassette: Cassete do ReplayProvider (substitui o provider roteirizado)
+        transactions: Quantidade de transações no banco em memória
+        seed: Semente para gerar as transações
+        response_templates: Responde leituras simples por template (sem a segunda chamada ao LLM)
+        intent_router: Roteia intenções frequentes direto para a ferramenta (implica templates)
+        tool_subsets: Vincula ao LLM só as ferramentas da intenção detectada
+        adaptive_strategy: Mede também o caminho escolhido pelo seletor de estratégia
+
+    Returns:
+        Resultado JSON-serializável com a configuração usada
+    """
+    queries = queries or [item["query"] for item in DEFAULT_CORPUS]
+    if cassette:
+        provider = ReplayProvider(cassette_path=cassette, mode="replay", fixed_latency=llm_latency or None)
+    else:
+        provider = ScriptedLLMProvider(latency=llm_latency)
+
+    counter = CallCountingProvider(provider)
+    db_session = create_seeded_session(transactions, seed)
+    try:
+        service = HybridConversationService(
+            llm_provider=counter,
+            rag_service=StaticContextService(),
+            response_templates=ResponseTemplateRegistry.default() if response_templates or intent_router else None,
+            intent_router=IntentRouter.train() if intent_router else None,
+            tool_selector=ToolSelector(IntentRouter.train()) if tool_subsets else None,
+            strategy_selector=StrategySelector(seed=seed) if adaptive_strategy else None,
+        )
+        benchmark = MultiAgentBenchmark(service, db_session, llm_counter=counter)
+        results = await benchmark.run_benchmark(queries, iterations=iterations, warmup=warmup)
+    finally:
+        db_session.close()
+
+    results["config"] = {
+        "queries": len(queries),
+        "iterations": iterations,
+        "warmup": warmup,
+        "provider": provider.provider_name,
+        "llm_latency": llm_latency,
+        "transactions": transactions,
+        "seed": seed,
+        "response_templates": response_templates,
+        "intent_router": intent_router,
+        "tool_subsets": tool_subsets,
+        "adaptive_strategy": adaptive_strategy,
+    }
+    if service.response_templates:
+        results["response_templates"] = service.response_templates.get_stats()
+    if service.intent_router:
+        results["intent_router"] = service.intent_router.get_stats()
+    if service.langgraph_agent:
+        results["checkpointer"] = service.langgraph_agent.checkpointer.get_stats()
+    if service.strategy_selector:
+        results["strategy_selector"] = service.strategy_selector.get_stats()
+    if service.tool_selector:
+        results["tool_selector"] = service.tool_selector.get_stats()
+        results["tool_binding"] = provider.get_model_info().get("tool_binding")
+    return results
+
+
+async def run_benchmark_subprocess(timeout: float = 600.0, **options) -> Dict[str, Any]:
+    """
+    Executa o benchmark em outro processo (a CLI deste módulo)
+
+    O benchmark troca a sessão global das ferramentas (set_db_session), liga o
+    tracemalloc e semeia o banco de forma síncrona: dentro do servidor isso
+    afetaria as requisições em andamento.
+
+    Args:
+        timeout: Limite em segundos (o processo é encerrado ao estourar)
+        **options: Argumentos de run_offline_benchmark (viram opções da CLI)
+
+    Returns:
+        Resultado do benchmark
+
+    Raises:
+        TimeoutError: O benchmark não terminou dentro do limite
+        RuntimeError: O processo terminou com erro
+    """
+    args = []
+    for name, value in options.items():
+        flag = "--" + name.replace("_", "-")
+        if value is True:
+            args.append(flag)
+        elif value is not None and value is not False:
+            args += [flag, str(value)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "benchmark.json")
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "app.api.llm.multiagent.benchmark", *args, "--output", output,
+            cwd=BACKEND_DIR,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise TimeoutError(f"Benchmark não terminou em {timeout}s")
+
+        if process.returncode != 0:
+            detail = stderr.decode(errors="replace").strip()[-500:]
+            raise RuntimeError(f"Benchmark falhou (código {process.returncode}): {detail}")
+        with open(output, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.0,
+                        help="latência simulada por chamada ao LLM, em segundos")
+    parser.add_argument("--cassette", help="cassete gravado pelo ReplayProvider")
+    parser.add_argument("--transactions", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--response-templates", action="store_true",
+                        help="responde leituras simples por template, sem a segunda chamada ao LLM")
+    parser.add_argument("--intent-router", action="store_true",
+                        help="roteia intenções frequentes direto para a ferramenta, sem LLM")
+    parser.add_argument("--tool-subsets", action="store_true",
+                        help="vincula ao LLM só as ferramentas da intenção detectada")
+    parser.add_argument("--adaptive-strategy", action="store_true",
+                        help="mede também o caminho escolhido pelo seletor de estratégia")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run_offline_benchmark(
+        iterations=args.iterations,
+        warmup=args.warmup,
+        llm_latency=args.llm_latency,
+        cassette=args.cassette,
+        transactions=args.transactions,
+        seed=args.seed,
+        response_templates=args.response_templates,
+        intent_router=args.intent_router,
+        tool_subsets=args.tool_subsets,
+        adaptive_strategy=args.adaptive_strategy,
+    ))
+
+    payload = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
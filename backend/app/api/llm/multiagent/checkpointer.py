@@ -0,0 +1,208 @@
+# ==========================================
+# backend/app/api/llm/multiagent/checkpointer.py
+# ==========================================
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from langgraph.checkpoint.memory import MemorySaver
+
+try:
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    SQLITE_CHECKPOINTER_AVAILABLE = True
+except ImportError:
+    SQLITE_CHECKPOINTER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class _ThreadTracker:
+    """LRU de threads com instante do último acesso e bytes retidos"""
+
+    def __init__(self, max_threads: int, ttl_seconds: float):
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.threads: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self.stats = {"puts": 0, "evictions": {"lru": 0, "ttl": 0, "memory": 0}}
+
+    def touch(self, thread_id: str, added_bytes: int = 0):
+        _, size = self.threads.get(thread_id, (0.0, 0))
+        self.threads[thread_id] = (time.monotonic(), size + added_bytes)
+        self.threads.move_to_end(thread_id)
+
+    def forget(self, thread_id: str):
+        self.threads.pop(thread_id, None)
+
+    @property
+    def retained_bytes(self) -> int:
+        return sum(size for _, size in self.threads.values())
+
+    def victims(self, max_bytes: Optional[int] = None):
+        """
+        Threads a descartar, com o motivo. A thread usada por último nunca
+        sai: é a da execução em andamento.
+        """
+        now = time.monotonic()
+        candidates = list(self.threads.items())[:-1]
+        total = self.retained_bytes
+        count = len(self.threads)
+        for thread_id, (touched, size) in candidates:
+            if self.ttl_seconds and now - touched > self.ttl_seconds:
+                reason = "ttl"
+            elif count > self.max_threads:
+                reason = "lru"
+            elif max_bytes is not None and total > max_bytes:
+                reason = "memory"
+            else:
+                # Em ordem de uso: as demais são mais recentes e estão dentro dos limites
+                break
+            count -= 1
+            total -= size
+            self.stats["evictions"][reason] += 1
+            yield thread_id
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "evictions": dict(self.stats["evictions"]),
+            "retained_threads": len(self.threads),
+            "max_threads": self.max_threads,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    MemorySaver com limite de threads (LRU), expiração (TTL) e teto de memória.
+
+    Cada execução do grafo usa uma thread nova; sem descarte, o estado de
+    todas as execuções (com os dados consultados) ficaria no processo para
+    sempre. O checkpoint continua disponível enquanto a thread estiver
+    retida, para retomar uma execução interrompida.
+    """
+
+    def __init__(self,
+                 max_threads: int = 256,
+                 ttl_seconds: float = 900.0,
+                 max_bytes: int = 32 * 1024 * 1024,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+        self.tracker = _ThreadTracker(max_threads, ttl_seconds)
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        if thread_id in self.tracker.threads:
+            self.tracker.touch(thread_id)
+        return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+        size = len(saved[1]) + len(saved_metadata[1])
+        for channel, version in new_versions.items():
+            size += len(self.blobs[(thread_id, checkpoint_ns, channel, version)][1])
+
+        self.tracker.stats["puts"] += 1
+        self.tracker.touch(thread_id, size)
+        self._evict()
+        return result
+
+    def put_writes(self, config, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = ""):
+        super().put_writes(config, writes, task_id, task_path)
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        outer_key = (thread_id, configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"])
+        size = sum(
+            len(value[1]) for task, _, value, _ in self.writes.get(outer_key, {}).values() if task == task_id
+        )
+        self.tracker.touch(thread_id, size)
+        self._evict()
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self.tracker.forget(thread_id)
+
+    def thread_bytes(self, thread_id: str) -> int:
+        """Bytes serializados retidos para a thread"""
+        return self.tracker.threads.get(thread_id, (0.0, 0))[1]
+
+    def _evict(self):
+        for thread_id in list(self.tracker.victims(self.max_bytes)):
+            self.delete_thread(thread_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Threads e bytes retidos e descartes por motivo"""
+        return {
+            "backend": "memory",
+            **self.tracker.get_stats(),
+            "retained_bytes": self.tracker.retained_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+if SQLITE_CHECKPOINTER_AVAILABLE:
+
+    class SQLiteCheckpointer(AsyncSqliteSaver):
+        """
+        Checkpoints em disco (SQLite) com o mesmo descarte por LRU e TTL;
+        o teto de memória não se aplica, o tamanho do arquivo é reportado.
+        """
+
+        def __init__(self, path: str, max_threads: int = 1024, ttl_seconds: float = 3600.0, **kwargs):
+            super().__init__(aiosqlite.connect(path), **kwargs)
+            self.path = path
+            self.tracker = _ThreadTracker(max_threads, ttl_seconds)
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            result = await super().aput(config, checkpoint, metadata, new_versions)
+            self.tracker.stats["puts"] += 1
+            self.tracker.touch(config["configurable"]["thread_id"])
+            for thread_id in list(self.tracker.victims()):
+                await self.adelete_thread(thread_id)
+            return result
+
+        async def adelete_thread(self, thread_id: str) -> None:
+            await super().adelete_thread(thread_id)
+            self.tracker.forget(thread_id)
+
+        def get_stats(self) -> Dict[str, Any]:
+            """Threads retidas, descartes por motivo e tamanho do arquivo"""
+            return {
+                "backend": "sqlite",
+                **self.tracker.get_stats(),
+                "retained_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+                "path": self.path,
+            }
+
+
+def create_checkpointer(backend: str = "memory",
+                        path: Optional[str] = None,
+                        max_threads: int = 256,
+                        ttl_seconds: float = 900.0,
+                        max_bytes: int = 32 * 1024 * 1024):
+    """
+    Cria o checkpointer do grafo LangGraph
+
+    Args:
+        backend: "memory" ou "sqlite" (requer langgraph-checkpoint-sqlite)
+        path: Arquivo do SQLite
+        max_threads: Execuções retidas (as mais antigas são descartadas)
+        ttl_seconds: Tempo sem uso até a execução ser descartada
+        max_bytes: Teto de memória dos checkpoints (só backend "memory")
+
+    Returns:
+        Checkpointer com get_stats()
+    """
+    if backend == "sqlite":
+        if SQLITE_CHECKPOINTER_AVAILABLE:
+            return SQLiteCheckpointer(path or "langgraph_checkpoints.db",
+                                      max_threads=max_threads, ttl_seconds=ttl_seconds)
+        logger.warning("langgraph-checkpoint-sqlite não instalado. Usando checkpoints em memória.")
+    return BoundedMemorySaver(max_threads=max_threads, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
@@ -2,20 +2,40 @@
 # backend/app/api/llm/services/hybrid_conversation_service.py
 # ==========================================
 
+import importlib.util
 import logging
-from typing import Optional, Tuple, Dict, Any
+import time
+from typing import Optional, Tuple, Dict, Any, List
 from sqlalchemy.orm import Session
 from langchain_core.messages import HumanMessage
 
 from ..providers.base_provider import BaseLLMProvider
-from ..tools.functions import get_tools, set_db_session
+from ..providers.tool_subset import tool_subset
+from ..tools.functions import get_tools, set_db_session, get_categories, WRITE_TOOL_NAMES
 from ..services.rag_service import RAGService
+from ..services.answer_cache import AnswerCache
+from ..services.prompt_budget import (
+    PromptBudget,
+    PRIORITY_REQUIRED,
+    PRIORITY_TOOL_OUTPUT,
+    PRIORITY_CONTEXT,
+    PRIORITY_HISTORY,
+)
+from ..services.response_templates import ResponseTemplateRegistry
+from ..services.intent_router import IntentRouter
+from ..services.tool_selector import ToolSelector
 from ..multiagent.orchestrator import MultiAgentOrchestrator
 from ..multiagent.config import MultiAgentConfig
-from ..multiagent.langgraph_implementation import LangGraphFinancialMultiAgent, LANGGRAPH_AVAILABLE
+from ..multiagent.strategy_selector import StrategyDecision, StrategySelector, bucket_key
 
 logger = logging.getLogger(__name__)
 
+# A pilha do LangGraph só é importada ao criar o serviço (primeiro uso ou aquecimento)
+LANGGRAPH_AVAILABLE = importlib.util.find_spec("langgraph") is not None
+
+# Início das respostas de erro do serviço (ele não propaga exceções)
+ERROR_PREFIXES = ("Desculpe, ocorreu um erro", "Erro no processamento")
+
 
 class HybridConversationService:
     """
@@ -23,9 +43,30 @@ class HybridConversationService:
     ou fallback para implementação customizada
     """
     
-    def __init__(self, llm_provider: BaseLLMProvider, rag_service: RAGService):
+    # Prioridades das mensagens iniciais: system prompt, contexto RAG, pergunta
+    INITIAL_PRIORITIES = [PRIORITY_REQUIRED, PRIORITY_CONTEXT, PRIORITY_REQUIRED]
+    
+    def __init__(self, 
+                 llm_provider: BaseLLMProvider, 
+                 rag_service: RAGService,
+                 answer_cache: Optional[AnswerCache] = None,
+                 prompt_budget: Optional[PromptBudget] = None,
+                 response_templates: Optional[ResponseTemplateRegistry] = None,
+                 intent_router: Optional[IntentRouter] = None,
+                 tool_selector: Optional[ToolSelector] = None,
+                 checkpointer: Optional[Any] = None,
+                 strategy_selector: Optional[StrategySelector] = None):
+        if intent_router and response_templates is None:
+            raise ValueError("intent_router precisa de response_templates para montar as respostas")
+        
         self.llm_provider = llm_provider
         self.rag_service = rag_service
+        self.answer_cache = answer_cache
+        self.prompt_budget = prompt_budget or PromptBudget.for_provider(llm_provider)
+        self.response_templates = response_templates
+        self.intent_router = intent_router
+        self.tool_selector = tool_selector
+        self.strategy_selector = strategy_selector
         self._tools = get_tools()
         
         # Configuração multiagentes customizada
@@ -40,22 +81,77 @@ class HybridConversationService:
         self.langgraph_agent = None
         if LANGGRAPH_AVAILABLE:
             try:
-                self.langgraph_agent = LangGraphFinancialMultiAgent(llm_provider)
+                from .langgraph_implementation import LangGraphFinancialMultiAgent
+                self.langgraph_agent = LangGraphFinancialMultiAgent(llm_provider, checkpointer=checkpointer)
                 logger.info("LangGraph MultiAgent inicializado com sucesso")
             except Exception as e:
                 logger.warning(f"Falha ao inicializar LangGraph: {str(e)}. Usando implementação customizada.")
         
+        # O system prompt é estático: montado uma vez
+        self._system_prompt = self._create_hybrid_system_prompt()
+        
         # Vincula ferramentas ao LLM
         self.llm_provider.bind_tools(self._tools)
+        self.prompt_budget.measure_tools(self._tools)
+        
+        # Clientes com só as ferramentas de cada intenção, prontos antes da primeira requisição
+        if self.tool_selector:
+            self.tool_selector.measure(self._tools)
+            self.llm_provider.prebind_tool_subsets(self.tool_selector.subsets())
         
         # Estratégias de escolha de implementação
         self.complexity_threshold = 3  # Número de tool_calls para considerar "complexo"
         self.prefer_langgraph = True  # Preferir LangGraph quando disponível
+        self.strategy_override: Optional[str] = None  # "langgraph" ou "custom" (benchmark)
+    
+    def _choose_path(self, tool_calls: list, user_query: str) -> Tuple[str, Optional[StrategyDecision]]:
+        """
+        Escolhe entre "langgraph" e "custom"
+        
+        Returns:
+            (caminho, decisão do seletor adaptativo ou None se a escolha é fixa)
+        """
+        if self.strategy_override == "custom" or not self.langgraph_agent:
+            return "custom", None
+        
+        # Escritas nunca passam pelo grafo: ele só executa as ferramentas de leitura
+        tool_names = {call["name"] for call in tool_calls}
+        if tool_names & WRITE_TOOL_NAMES:
+            logger.info("Usando implementação customizada: ferramenta de escrita")
+            return "custom", None
+        if self.strategy_override == "langgraph":
+            return "langgraph", None
+        
+        # Nem regras fixas nem o seletor mandam ao grafo ferramentas que ele não sabe executar
+        missing = tool_names - self.langgraph_agent.executable_tools
+        if missing:
+            logger.info(f"Usando implementação customizada: LangGraph não executa {sorted(missing)}")
+            return "custom", None
+        
+        # Leituras simples com template não precisam do grafo
+        if self.response_templates and self.response_templates.supports(tool_calls):
+            logger.info("Usando implementação customizada: resposta por template")
+            return "custom", None
+        
+        static_path = "langgraph" if self._should_use_langgraph(tool_calls, user_query) else "custom"
+        if not self.strategy_selector:
+            return static_path, None
+        
+        decision = self.strategy_selector.choose(
+            bucket_key(tool_calls, self._classify_intent(user_query)), static_path
+        )
+        logger.info(f"Seletor de estratégia: {decision.path} ({decision.reason}, bucket {decision.bucket})")
+        return decision.path, decision
+    
+    def _classify_intent(self, message: str) -> Optional[str]:
+        """Intenção da pergunta, se houver classificador configurado"""
+        router = self.intent_router or (self.tool_selector.intent_router if self.tool_selector else None)
+        return router.classify(message)[0] if router else None
     
     def _should_use_langgraph(self, tool_calls: list, user_query: str) -> bool:
-        """Decide se deve usar LangGraph ou implementação customizada"""
+        """Regras estáticas: LangGraph ou implementação customizada"""
         
-        if not self.langgraph_agent or not self.prefer_langgraph:
+        if not self.prefer_langgraph:
             return False
         
         # Critérios para usar LangGraph:
@@ -78,9 +174,9 @@ class HybridConversationService:
         
         # 3. Dependências entre ferramentas detectadas
         dependency_patterns = [
-            ("get_financial_data", "calculate_metrics"),
-            ("calculate_metrics", "analyze_portfolio"),
-            ("analyze_portfolio", "risk_assessment")
+            ("get_categories", "get_transactions_by_category"),
+            ("get_transactions_by_type_and_date_range", "get_top_spending_category"),
+            ("get_transactions_by_date_range", "get_balance")
         ]
         
         tool_names = [call["name"] for call in tool_calls]
@@ -103,43 +199,33 @@ class HybridConversationService:
         Processa conversa usando estratégia híbrida
         """
         logger.info(f"Processando mensagem híbrida do usuário {user_id}: {message}")
+        start_time = time.perf_counter()
+        
+        # 0. Resposta já conhecida para esta pergunta e versão dos dados
+        if self.answer_cache:
+            cached = await self.answer_cache.get(user_id, message)
+            if cached:
+                return cached["response"], cached["context"]
         
         try:
             # 1. Configura sessão do banco
             set_db_session(db_session)
             
-            # 2. Busca contexto RAG
-            context = await self.rag_service.get_relevant_context(message)
-            logger.info(f"Contexto RAG: {len(context)} caracteres")
-            
-            # 3. Primeira invocação do LLM para identificar ferramentas necessárias
-            system_prompt = self._create_hybrid_system_prompt(context)
-            messages = [
-                HumanMessage(content=system_prompt),
-                HumanMessage(content=message),
-            ]
-            
-            response = await self.llm_provider.invoke(messages)
-            
-            final_response_text = ""
+            # 2. Perguntas frequentes: ferramenta chamada direto, sem LLM nem contexto RAG
+            routed = await self._process_with_intent_router(message) if self.intent_router else None
             
-            # 4. Processa baseado na presença de tool_calls
-            if hasattr(response, 'tool_calls') and response.tool_calls:
-                # Decide qual implementação usar
-                use_langgraph = self._should_use_langgraph(response.tool_calls, message)
-                
-                if use_langgraph:
-                    final_response_text = await self._process_with_langgraph(
-                        message, user_id, context, response, messages
-                    )
-                else:
-                    final_response_text = await self._process_with_custom_orchestrator(
-                        response, messages
-                    )
+            if routed is not None:
+                final_response_text, changed_data = routed
+                context = ""
             else:
-                # Resposta direta
-                final_response_text = response.content
-                logger.info("Resposta direta sem ferramentas")
+                # 3. Busca contexto RAG
+                context = await self.rag_service.get_relevant_context(message)
+                logger.info(f"Contexto RAG: {len(context)} caracteres")
+                
+                # 4. LLM escolhe as ferramentas (só as da intenção detectada) e redige a resposta
+                tools = self.tool_selector.select(message) if self.tool_selector else None
+                with tool_subset(tools):
+                    final_response_text, changed_data = await self._process_with_llm(message, user_id, context)
             
             # 5. Salva conversa
             await self.rag_service.save_conversation(
@@ -149,12 +235,102 @@ class HybridConversationService:
                 context=context
             )
             
+            # 6. Atualiza o cache de respostas (erros e respostas vazias não são guardados)
+            cacheable = bool(final_response_text.strip()) and not final_response_text.startswith(ERROR_PREFIXES)
+            if self.answer_cache:
+                if changed_data:
+                    # Transações criadas pelo chat não têm dono: invalida todos os tenants
+                    await self.answer_cache.invalidate()
+                elif cacheable:
+                    await self.answer_cache.set(
+                        user_id, message, final_response_text.strip(), context,
+                        latency=time.perf_counter() - start_time
+                    )
+            
             return final_response_text.strip(), context
             
         except Exception as e:
             logger.error(f"Erro no processamento híbrido: {str(e)}", exc_info=True)
             return "Desculpe, ocorreu um erro ao processar sua solicitação. Tente novamente.", ""
     
+    async def _process_with_llm(self, message: str, user_id: str, context: str) -> Tuple[str, bool]:
+        """Fluxo com LLM: escolha de ferramentas e resposta final (texto, alterou dados?)"""
+        
+        # Primeira invocação do LLM para identificar ferramentas necessárias
+        plan = self.prompt_budget.fit(
+            [
+                HumanMessage(content=self._system_prompt),
+                HumanMessage(content=self._create_context_prompt(context)),
+                HumanMessage(content=message),
+            ],
+            self.INITIAL_PRIORITIES,
+        )
+        messages = plan.messages
+        
+        response = await self.llm_provider.invoke(messages)
+        self.prompt_budget.record(plan, response, "inicial")
+        
+        # Processa baseado na presença de tool_calls
+        if not (hasattr(response, 'tool_calls') and response.tool_calls):
+            logger.info("Resposta direta sem ferramentas")
+            return response.content, False
+        
+        changed_data = any(call["name"] in WRITE_TOOL_NAMES for call in response.tool_calls)
+        
+        # Decide qual implementação usar
+        path, decision = self._choose_path(response.tool_calls, message)
+        started = time.perf_counter()
+        executed = True
+        if path == "langgraph":
+            final_response_text, executed = await self._process_with_langgraph(
+                message, user_id, context, response, messages
+            )
+        else:
+            final_response_text = await self._process_with_custom_orchestrator(
+                response, messages
+            )
+        
+        if decision:
+            # Resposta sem nenhuma das ferramentas pedidas também é falha
+            success = (executed and bool(final_response_text)
+                       and not final_response_text.startswith(ERROR_PREFIXES))
+            self.strategy_selector.record(decision, time.perf_counter() - started, success)
+        return final_response_text, changed_data
+    
+    async def _process_with_intent_router(self, message: str) -> Optional[Tuple[str, bool]]:
+        """Responde intenções frequentes chamando a ferramenta direto (None = seguir pelo LLM)"""
+        
+        match = self.intent_router.route(message, categories_loader=self._load_categories)
+        if match is None:
+            return None
+        
+        logger.info(f"Intenção '{match.intent}' ({match.source}, confiança {match.confidence:.2f}) - "
+                    f"chamando {match.tool_calls[0]['name']} sem LLM")
+        execution_summary = await self.custom_orchestrator.coordinate_agents(match.tool_calls)
+        changed_data = any(call["name"] in WRITE_TOOL_NAMES for call in match.tool_calls)
+        
+        rendered = self.response_templates.render(
+            match.tool_calls, execution_summary.results, llm_calls_saved=2
+        )
+        self.intent_router.record_result(match, rendered is not None)
+        if rendered is not None:
+            return rendered, changed_data
+        
+        if changed_data:
+            # Escrita já tentada: repetir pelo LLM poderia duplicar a transação
+            messages = [
+                r.result.get("message") for r in execution_summary.results
+                if isinstance(r.result, dict) and r.result.get("message")
+            ] + execution_summary.errors
+            detail = messages[0] if messages else "erro desconhecido"
+            return f"Não consegui registrar a despesa: {detail}", changed_data
+        return None
+    
+    def _load_categories(self) -> List[Dict[str, Any]]:
+        """Categorias cadastradas (para extrair a categoria citada na pergunta)"""
+        payload = get_categories.invoke({})
+        return payload.get("data", []) if payload.get("status") == "success" else []
+    
     async def _process_with_langgraph(
         self, 
         message: str, 
@@ -162,8 +338,8 @@ class HybridConversationService:
         context: str,
         response,
         messages
-    ) -> str:
-        """Processa usando LangGraph"""
+    ) -> Tuple[str, bool]:
+        """Processa usando LangGraph (texto, executou alguma das ferramentas pedidas?)"""
         
         logger.info("Processando com LangGraph")
         
@@ -171,11 +347,16 @@ class HybridConversationService:
             result = await self.langgraph_agent.process_financial_query(
                 user_query=message,
                 user_id=user_id,
-                context=context
+                context=context,
+                tool_calls=response.tool_calls
             )
             
-            response_text = result.get("response", "")
             execution_summary = result.get("execution_summary", {})
+            requested = {call["name"] for call in response.tool_calls}
+            executed = bool(requested & set(result.get("tools_executed", [])))
+            if not executed:
+                logger.warning(f"LangGraph não executou nenhuma das ferramentas pedidas: {sorted(requested)}")
+                return result.get("response", ""), False
             
             # Log de performance
             if execution_summary:
@@ -183,12 +364,19 @@ class HybridConversationService:
                 agents_used = len(result.get("agents_completed", []))
                 logger.info(f"LangGraph concluído - Agentes: {agents_used}, Sucesso: {success_rate}%")
             
-            return response_text
+            # O grafo executa as ferramentas; o texto ao usuário sai dos resultados reais
+            tool_messages = self._create_tool_messages_from_results(
+                result.get("tool_results", {}), response.tool_calls
+            )
+            report = None
+            if result.get("errors"):
+                report = "Falhas: " + "; ".join(result["errors"])
+            return await self._create_final_response(response, messages, tool_messages, report), executed
             
         except Exception as e:
             logger.error(f"Erro no LangGraph, fallback para implementação customizada: {str(e)}")
             # Fallback para implementação customizada
-            return await self._process_with_custom_orchestrator(response, messages)
+            return await self._process_with_custom_orchestrator(response, messages), True
     
     async def _process_with_custom_orchestrator(self, response, messages) -> str:
         """Processa usando orquestrador customizado"""
@@ -199,28 +387,53 @@ class HybridConversationService:
             # Usa a implementação original
             execution_summary = await self.custom_orchestrator.coordinate_agents(response.tool_calls)
             
+            # Leituras simples: resposta montada localmente, sem a segunda chamada ao LLM
+            if self.response_templates:
+                rendered = self.response_templates.render(response.tool_calls, execution_summary.results)
+                if rendered is not None:
+                    logger.info("Resposta montada por template - segunda chamada ao LLM evitada")
+                    return rendered
+            
             # Converte para tool messages
             tool_messages = self._create_tool_messages_from_summary(execution_summary, response.tool_calls)
             
-            # Atualiza mensagens e solicita resposta final
-            messages.extend([response] + tool_messages)
-            
+            execution_report = None
             if execution_summary.failed_tasks > 0:
                 execution_report = self._create_execution_report(execution_summary)
-                messages.append(HumanMessage(content=f"RELATÓRIO: {execution_report}"))
             
-            final_response = await self.llm_provider.invoke(messages)
+            final_response = await self._create_final_response(response, messages, tool_messages, execution_report)
             
             logger.info(f"Orquestrador customizado concluído - Sucesso: {execution_summary.success_rate:.1f}%")
             
-            return final_response.content
+            return final_response
             
         except Exception as e:
             logger.error(f"Erro no orquestrador customizado: {str(e)}")
             return f"Erro no processamento multiagentes: {str(e)}"
     
-    def _create_hybrid_system_prompt(self, context: str) -> str:
-        """Cria prompt otimizado para o sistema híbrido"""
+    async def _create_final_response(self, response, messages, tool_messages, report: Optional[str] = None) -> str:
+        """Segunda chamada ao LLM: redige a resposta a partir dos resultados das ferramentas"""
+        
+        # Atualiza mensagens e solicita resposta final
+        messages.extend([response] + tool_messages)
+        
+        priorities = (
+            self.INITIAL_PRIORITIES
+            + [PRIORITY_REQUIRED]
+            + [PRIORITY_TOOL_OUTPUT] * len(tool_messages)
+        )
+        
+        if report:
+            messages.append(HumanMessage(content=f"RELATÓRIO: {report}"))
+            priorities.append(PRIORITY_HISTORY)
+        
+        plan = self.prompt_budget.fit(messages, priorities)
+        final_response = await self.llm_provider.invoke(plan.messages)
+        self.prompt_budget.record(plan, final_response, "final")
+        return final_response.content
+    
+    def _create_hybrid_system_prompt(self) -> str:
+        """Cria prompt otimizado para o sistema híbrido (sem o contexto, que muda a cada pergunta)"""
         
         system_features = []
         
@@ -250,11 +463,12 @@ class HybridConversationService:
         - Validação automática de resultados
         - Retry automático em falhas transitórias
         - Seleção da estratégia mais eficiente
-
-        CONTEXTO:
-        {context or "Nenhum contexto específico disponível."}
         """
     
+    def _create_context_prompt(self, context: str) -> str:
+        """Bloco de contexto RAG (mensagem própria para poder ser cortado pelo orçamento)"""
+        return f"CONTEXTO:\n{context or 'Nenhum contexto específico disponível.'}"
+    
     def _create_tool_messages_from_summary(self, summary, tool_calls):
         """Converte sumário de execução para ToolMessages (implementação simplificada)"""
         # Reutiliza a lógica do ConversationService original
@@ -278,6 +492,20 @@ class HybridConversationService:
         
         return tool_messages
     
+    def _create_tool_messages_from_results(self, tool_results: Dict[str, Any], tool_calls):
+        """ToolMessages com os resultados do LangGraph (por id da chamada)"""
+        from langchain_core.messages import ToolMessage
+        import json
+        
+        tool_messages = []
+        for tool_call in tool_calls:
+            tool_call_id = tool_call.get("id") or tool_call["name"]
+            result = tool_results.get(tool_call_id, {"status": "error", "message": "ferramenta não executada"})
+            content = json.dumps(result, ensure_ascii=False, default=str)
+            tool_messages.append(ToolMessage(content=content, tool_call_id=tool_call.get("id", "unknown")))
+        
+        return tool_messages
+    
     def _create_execution_report(self, summary) -> str:
         """Cria relatório de execução"""
         return f"""
@@ -299,7 +527,14 @@ class HybridConversationService:
             "custom_orchestrator": True,
             "tools_count": len(self._tools),
             "complexity_threshold": self.complexity_threshold,
-            "prefer_langgraph": self.prefer_langgraph
+            "prefer_langgraph": self.prefer_langgraph,
+            "answer_cache": self.answer_cache.get_stats() if self.answer_cache else None,
+            "prompt_budget": self.prompt_budget.get_stats(),
+            "response_templates": self.response_templates.get_stats() if self.response_templates else None,
+            "intent_router": self.intent_router.get_stats() if self.intent_router else None,
+            "tool_selector": self.tool_selector.get_stats() if self.tool_selector else None,
+            "checkpointer": self.langgraph_agent.checkpointer.get_stats() if self.langgraph_agent else None,
+            "strategy_selector": self.strategy_selector.get_stats() if self.strategy_selector else None
         }
         
         if self.langgraph_agent:
@@ -322,7 +557,11 @@ class HybridConversationService:
         return info
     
     async def health_check(self) -> Dict[str, Any]:
-        """Health check do sistema híbrido"""
+        """
+        Health check do sistema híbrido, sem chamar o LLM (a conexão é
+        verificada em segundo plano pelo HealthProber)
+        """
+        last_success = self.llm_provider.last_success_at
         status = {
             "service": "hybrid_multiagent_conversation",
             "status": "healthy",
@@ -331,15 +570,11 @@ class HybridConversationService:
             "implementations": {
                 "custom_orchestrator": "available",
                 "langgraph": "available" if self.langgraph_agent else "unavailable"
-            }
+            },
+            "llm_last_success_age": None if last_success is None else time.monotonic() - last_success,
         }
         
         try:
-            # Testa LLM
-            test_messages = [HumanMessage(content="Health check")]
-            await self.llm_provider.invoke(test_messages)
-            status["llm_connection"] = "healthy"
-            
             # Testa orquestrador customizado
             custom_stats = self.custom_orchestrator.get_statistics()
             status["custom_orchestrator_stats"] = custom_stats
@@ -355,159 +590,21 @@ class HybridConversationService:
     
     def configure_strategy(self, 
                           complexity_threshold: int = None, 
-                          prefer_langgraph: bool = None):
-        """Permite configurar a estratégia de seleção"""
+                          prefer_langgraph: bool = None,
+                          adaptive: bool = None):
+        """Permite configurar a estratégia de seleção (adaptive=False volta às regras estáticas)"""
         if complexity_threshold is not None:
             self.complexity_threshold = complexity_threshold
             
         if prefer_langgraph is not None:
             self.prefer_langgraph = prefer_langgraph
         
-        logger.info(f"Estratégia atualizada - Threshold: {self.complexity_threshold}, "
-                   f"Preferir LangGraph: {self.prefer_langgraph}")
-
-
-# ==========================================
-# BENCHMARK E COMPARAÇÃO DE PERFORMANCE
-# ==========================================
-
-class MultiAgentBenchmark:
-    """Classe para benchmark entre diferentes implementações"""
-    
-    def __init__(self, hybrid_service: HybridConversationService):
-        self.hybrid_service = hybrid_service
-        self.benchmark_results = []
-    
-    async def run_benchmark(self, test_queries: list, iterations: int = 3):
-        """Executa benchmark comparativo"""
-        
-        for query in test_queries:
-            query_results = {
-                "query": query,
-                "langgraph_results": [],
-                "custom_results": []
-            }
-            
-            for i in range(iterations):
-                # Força uso do LangGraph
-                original_prefer = self.hybrid_service.prefer_langgraph
-                self.hybrid_service.prefer_langgraph = True
-                
-                try:
-                    import time
-                    start_time = time.time()
-                    
-                    # Simula processamento (sem salvar no banco)
-                    # Implementar lógica de benchmark aqui
-                    
-                    execution_time = time.time() - start_time
-                    query_results["langgraph_results"].append({
-                        "iteration": i + 1,
-                        "execution_time": execution_time,
-                        "success": True
-                    })
-                    
-                except Exception as e:
-                    query_results["langgraph_results"].append({
-                        "iteration": i + 1,
-                        "execution_time": 0,
-                        "success": False,
-                        "error": str(e)
-                    })
-                
-                # Força uso do customizado
-                self.hybrid_service.prefer_langgraph = False
-                
-                try:
-                    start_time = time.time()
-                    
-                    # Simula processamento customizado
-                    
-                    execution_time = time.time() - start_time
-                    query_results["custom_results"].append({
-                        "iteration": i + 1,
-                        "execution_time": execution_time,
-                        "success": True
-                    })
-                    
-                except Exception as e:
-                    query_results["custom_results"].append({
-                        "iteration": i + 1,
-                        "execution_time": 0,
-                        "success": False,
-                        "error": str(e)
-                    })
-                
-                # Restaura configuração original
-                self.hybrid_service.prefer_langgraph = original_prefer
-            
-            self.benchmark_results.append(query_results)
-        
-        return self.analyze_benchmark_results()
-    
-    def analyze_benchmark_results(self):
-        """Analisa resultados do benchmark"""
-        if not self.benchmark_results:
-            return {"message": "Nenhum benchmark executado"}
-        
-        analysis = {
-            "total_queries": len(self.benchmark_results),
-            "langgraph_performance": {
-                "average_time": 0,
-                "success_rate": 0,
-                "total_executions": 0
-            },
-            "custom_performance": {
-                "average_time": 0,
-                "success_rate": 0,
-                "total_executions": 0
-            },
-            "recommendation": ""
-        }
+        if adaptive is not None and self.strategy_selector:
+            self.strategy_selector.enabled = adaptive
         
-        # Calcula estatísticas
-        lg_times = []
-        lg_successes = 0
-        custom_times = []
-        custom_successes = 0
-        
-        for result in self.benchmark_results:
-            for lg_result in result["langgraph_results"]:
-                if lg_result["success"]:
-                    lg_times.append(lg_result["execution_time"])
-                    lg_successes += 1
-            
-            for custom_result in result["custom_results"]:
-                if custom_result["success"]:
-                    custom_times.append(custom_result["execution_time"])
-                    custom_successes += 1
-        
-        # Análise LangGraph
-        if lg_times:
-            analysis["langgraph_performance"]["average_time"] = sum(lg_times) / len(lg_times)
-        analysis["langgraph_performance"]["success_rate"] = (lg_successes / (len(self.benchmark_results) * 3)) * 100
-        analysis["langgraph_performance"]["total_executions"] = len(self.benchmark_results) * 3
-        
-        # Análise Custom
-        if custom_times:
-            analysis["custom_performance"]["average_time"] = sum(custom_times) / len(custom_times)
-        analysis["custom_performance"]["success_rate"] = (custom_successes / (len(self.benchmark_results) * 3)) * 100
-        analysis["custom_performance"]["total_executions"] = len(self.benchmark_results) * 3
-        
-        # Recomendação
-        lg_avg = analysis["langgraph_performance"]["average_time"]
-        custom_avg = analysis["custom_performance"]["average_time"]
-        lg_success = analysis["langgraph_performance"]["success_rate"]
-        custom_success = analysis["custom_performance"]["success_rate"]
-        
-        if lg_success > custom_success and lg_avg < custom_avg * 1.5:
-            analysis["recommendation"] = "LangGraph recomendado - melhor sucesso e performance aceitável"
-        elif custom_avg < lg_avg * 0.7:
-            analysis["recommendation"] = "Implementação customizada recomendada - significativamente mais rápida"
-        else:
-            analysis["recommendation"] = "Estratégia híbrida recomendada - usar baseado na complexidade"
-        
-        return analysis
+        logger.info(f"Estratégia atualizada - Threshold: {self.complexity_threshold}, "
+                   f"Preferir LangGraph: {self.prefer_langgraph}, "
+                   f"Adaptativa: {bool(self.strategy_selector and self.strategy_selector.enabled)}")
 
 
 # ==========================================
@@ -537,14 +634,7 @@ hybrid_service.configure_strategy(
     prefer_langgraph=True    # Preferir LangGraph quando disponível
 )
 
-# Benchmark comparativo
-benchmark = MultiAgentBenchmark(hybrid_service)
-test_queries = [
-    "Calcule as métricas do portfolio ABC",
-    "Análise completa de risco e retorno da empresa XYZ",
-    "Comparativo de performance entre fundos A, B e C"
-]
-
-results = await benchmark.run_benchmark(test_queries, iterations=3)
+# Benchmark comparativo (offline, ver multiagent/benchmark.py)
+results = await run_offline_benchmark(iterations=3)
 print(f"Recomendação: {results['recommendation']}")
 """
\ No newline at end of file
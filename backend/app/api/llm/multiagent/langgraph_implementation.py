@@ -4,14 +4,17 @@
 
 import json
 import logging
-from typing import Dict, List, Any, Optional, TypedDict, Annotated
+import operator
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Tuple, TypedDict, Annotated
 from datetime import datetime
 import asyncio
 
 try:
     from langgraph.graph import StateGraph, END, START
     from langgraph.prebuilt import create_react_agent
-    from langgraph.checkpoint.memory import MemorySaver
+    from .checkpointer import BoundedMemorySaver, create_checkpointer
     from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
     from langchain_core.tools import tool
     LANGGRAPH_AVAILABLE = True
@@ -19,69 +22,116 @@ except ImportError:
     LANGGRAPH_AVAILABLE = False
     logging.warning("LangGraph não disponível. Usando implementação customizada.")
 
+from ..cache.local import LocalTTLCache
 from ..providers.base_provider import BaseLLMProvider
 from ..tools.functions import get_tools
+from .config import MultiAgentConfig
 from .models import AgentRole, ExecutionSummary
+from .orchestrator import AGENT_TASKS, TOOL_CALL_SECONDS
+from .result_store import ResultStore
 
 logger = logging.getLogger(__name__)
 
+# Nó do grafo -> ferramentas de leitura do app que ele executa. As chamadas
+# pedidas pelo LLM vão para o nó da ferramenta; escritas nunca passam pelo grafo.
+NODE_TOOLS = {
+    "data_retriever": (
+        "get_categories",
+        "get_all_transactions",
+        "get_transaction_by_id",
+        "get_transactions_by_category",
+        "get_transactions_by_date_range",
+        "get_transactions_by_type",
+        "get_transactions_by_description",
+        "get_transactions_by_type_and_date_range",
+    ),
+    "calculator": (
+        "get_balance",
+        "get_top_spending_category",
+    ),
+}
+GRAPH_TOOL_NAMES = frozenset(name for names in NODE_TOOLS.values() for name in names)
+
+
+def merge_metadata(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer de execution_metadata: mescla as chaves e acumula node_timings"""
+    current, update = current or {}, update or {}
+    merged = {**current, **update}
+    merged["node_timings"] = current.get("node_timings", []) + update.get("node_timings", [])
+    return merged
+
+
+def merge_results(current: Dict[str, str], update: Dict[str, str]) -> Dict[str, str]:
+    """Reducer de tool_results: cada ramo acrescenta os handles das suas chamadas"""
+    return {**(current or {}), **(update or {})}
+
+
+def last_value(current: Any, update: Any) -> Any:
+    """Reducer que aceita escritas de ramos paralelos no mesmo passo"""
+    return update
+
 
 class FinancialAgentState(TypedDict):
-    """Estado compartilhado entre agentes financeiros"""
-    messages: List[Any]
+    """
+    Estado compartilhado entre agentes financeiros.
+    
+    Os resultados das ferramentas ficam no ResultStore da execução (run_id);
+    o estado, copiado a cada checkpoint, guarda só os handles.
+    """
+    messages: Annotated[List[Any], operator.add]
     user_query: str
     context: str
     user_id: str
+    run_id: str
     
-    # Dados coletados
-    financial_data: Optional[Dict[str, Any]]
-    market_data: Optional[Dict[str, Any]]
-    company_info: Optional[Dict[str, Any]]
+    # Chamadas de ferramenta pedidas pelo LLM (name, args, id)
+    tool_calls: List[Dict[str, Any]]
     
-    # Resultados de cálculos
-    calculated_metrics: Optional[Dict[str, Any]]
-    ratios: Optional[Dict[str, Any]]
-    returns: Optional[Dict[str, Any]]
-    
-    # Análises realizadas
-    portfolio_analysis: Optional[Dict[str, Any]]
-    risk_assessment: Optional[Dict[str, Any]]
-    performance_analysis: Optional[Dict[str, Any]]
+    # Resultados (handles) por id da chamada, acumulados entre ramos paralelos
+    tool_results: Annotated[Dict[str, str], merge_results]
     
     # Validações
     data_validation: Optional[Dict[str, Any]]
-    compliance_check: Optional[Dict[str, Any]]
     
-    # Controle de execução
-    agents_completed: List[str]
-    current_agent: str
-    execution_metadata: Dict[str, Any]
-    errors: List[str]
-    next_action: Optional[str]
+    # Controle de execução (acumulados entre ramos paralelos)
+    agents_completed: Annotated[List[str], operator.add]
+    current_agent: Annotated[str, last_value]
+    execution_metadata: Annotated[Dict[str, Any], merge_metadata]
+    errors: Annotated[List[str], operator.add]
+    tools_executed: Annotated[List[str], operator.add]
+    next_action: Optional[List[str]]
 
 
 class LangGraphFinancialMultiAgent:
     """Implementação de sistema multiagentes usando LangGraph"""
     
-    def __init__(self, llm_provider: BaseLLMProvider):
+    def __init__(self,
+                 llm_provider: BaseLLMProvider,
+                 checkpointer: Optional[Any] = None,
+                 max_concurrency: int = MultiAgentConfig.MAX_PARALLEL_TASKS,
+                 result_store_ttl: float = 900.0):
         if not LANGGRAPH_AVAILABLE:
             raise ImportError("LangGraph não disponível. Instale com: pip install langgraph")
         
         self.llm_provider = llm_provider
         self.tools = get_tools()
         self.tool_map = {tool.name: tool for tool in self.tools}
+        self.max_concurrency = max_concurrency  # Ferramentas simultâneas por nó
+        
+        # Checkpoints com descarte (LRU/TTL/memória): cada execução usa uma thread nova
+        self.checkpointer = checkpointer or BoundedMemorySaver()
         
-        # Configuração de checkpoint para persistência
-        self.checkpointer = MemorySaver()
+        # Resultados das ferramentas por execução, retidos tanto quanto os checkpoints
+        self.result_stores = LocalTTLCache(max_entries=256, ttl_seconds=result_store_ttl)
+        
+        # Ferramentas executadas pelos nós do grafo e bytes gravados em checkpoints
+        self.stats = {"tool_calls": 0, "runs": 0, "checkpoint_bytes": 0}
         
         # Cria o grafo
         self.graph = self._create_financial_graph()
         
         # Compila o grafo
-        self.compiled_graph = self.graph.compile(
-            checkpointer=self.checkpointer,
-            interrupt_before=["risk_assessor"]  # Permite intervenção manual se necessário
-        )
+        self.compiled_graph = self.graph.compile(checkpointer=self.checkpointer)
     
     def _create_financial_graph(self) -> StateGraph:
         """Cria o grafo de agentes financeiros"""
@@ -89,312 +139,224 @@ class LangGraphFinancialMultiAgent:
         # Define o grafo
         graph = StateGraph(FinancialAgentState)
         
-        # Adiciona nós (agentes)
-        graph.add_node("coordinator", self._coordinator_agent)
-        graph.add_node("data_retriever", self._data_retriever_agent)
-        graph.add_node("calculator", self._calculator_agent)
-        graph.add_node("financial_analyst", self._financial_analyst_agent)
-        graph.add_node("risk_assessor", self._risk_assessor_agent)
-        graph.add_node("validator", self._validator_agent)
-        graph.add_node("consolidator", self._consolidator_agent)
+        # Adiciona nós (agentes), com o tempo de cada execução em execution_metadata
+        graph.add_node("coordinator", self._timed("coordinator", self._coordinator_agent))
+        graph.add_node("data_retriever", self._timed("data_retriever", self._data_retriever_agent))
+        graph.add_node("calculator", self._timed("calculator", self._calculator_agent))
+        graph.add_node("validator", self._timed("validator", self._validator_agent))
+        graph.add_node("consolidator", self._timed("consolidator", self._consolidator_agent))
         
         # Define fluxo principal
         graph.add_edge(START, "coordinator")
         
-        # Rotas condicionais baseadas na decisão do coordinator
+        # O coordinator dispara, em paralelo, todos os agentes com chamadas pendentes
         graph.add_conditional_edges(
             "coordinator",
-            self._should_route_to_data_retriever,
+            self._route_from_coordinator,
             {
                 "data_retriever": "data_retriever",
                 "calculator": "calculator",
-                "analyst": "financial_analyst",
                 "validator": "validator",
                 "end": "consolidator"
             }
         )
         
-        # Fluxos de dados
-        graph.add_conditional_edges(
-            "data_retriever",
-            self._after_data_retrieval,
-            {
-                "calculator": "calculator",
-                "analyst": "financial_analyst",
-                "coordinator": "coordinator"
-            }
-        )
+        # Os ramos voltam ao coordinator, que só roda depois que todos terminam
+        for node in NODE_TOOLS:
+            graph.add_edge(node, "coordinator")
         
-        graph.add_conditional_edges(
-            "calculator",
-            self._after_calculation,
-            {
-                "analyst": "financial_analyst",
-                "risk_assessor": "risk_assessor",
-                "coordinator": "coordinator"
-            }
-        )
-        
-        graph.add_conditional_edges(
-            "financial_analyst",
-            self._after_analysis,
-            {
-                "risk_assessor": "risk_assessor",
-                "validator": "validator",
-                "coordinator": "coordinator"
-            }
-        )
-        
-        graph.add_conditional_edges(
-            "risk_assessor",
-            self._after_risk_assessment,
-            {
-                "validator": "validator",
-                "coordinator": "coordinator"
-            }
-        )
+        graph.add_edge("validator", "consolidator")
+        graph.add_edge("consolidator", END)
         
-        graph.add_conditional_edges(
-            "validator",
-            self._after_validation,
-            {
-                "consolidator": "consolidator",
-                "data_retriever": "data_retriever",  # Re-executar se dados inválidos
-                "coordinator": "coordinator"
+        return graph
+    
+    @property
+    def executable_tools(self) -> frozenset:
+        """Ferramentas que os nós sabem executar e que existem em get_tools()"""
+        return frozenset(name for name in GRAPH_TOOL_NAMES if name in self.tool_map)
+    
+    def _timed(self, node: str, agent: Callable[[FinancialAgentState], Awaitable[Dict[str, Any]]]):
+        """Registra a duração do nó em execution_metadata["node_timings"]"""
+        
+        async def run(state: FinancialAgentState) -> Dict[str, Any]:
+            started_at = datetime.now().isoformat()
+            started = time.perf_counter()
+            update = await agent(state)
+            timing = {
+                "node": node,
+                "seconds": time.perf_counter() - started,
+                "started_at": started_at
             }
+            metadata = update.get("execution_metadata", {})
+            update["execution_metadata"] = {**metadata, "node_timings": [timing]}
+            return update
+        
+        return run
+    
+    async def _run_tools(
+        self,
+        calls: List[Dict[str, Any]],
+        state: FinancialAgentState,
+        error_prefix: str
+    ) -> Tuple[Dict[str, str], List[str], List[str]]:
+        """
+        Executa em paralelo as chamadas independentes de um nó
+        
+        Args:
+            calls: Chamadas pedidas pelo LLM (name, args, id)
+            state: Estado atual
+            error_prefix: Início da mensagem de erro ("Falha no cálculo")
+            
+        Returns:
+            (handles dos resultados no ResultStore por id da chamada, erros, ferramentas executadas)
+        """
+        missing = [call for call in calls if call["name"] not in self.tool_map]
+        calls = [call for call in calls if call["name"] in self.tool_map]
+        if missing:
+            logger.warning(f"Ferramentas indisponíveis para o grafo: {sorted(call['name'] for call in missing)}")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        store = self._result_store(state)
+        
+        async def execute_with_semaphore(call: Dict[str, Any]):
+            AGENT_TASKS.inc(implementation="langgraph", state="queued")
+            try:
+                await semaphore.acquire()
+            finally:
+                AGENT_TASKS.dec(implementation="langgraph", state="queued")
+            AGENT_TASKS.inc(implementation="langgraph", state="running")
+            try:
+                return await self._execute_tool_async(call["name"], call.get("args") or {})
+            finally:
+                AGENT_TASKS.dec(implementation="langgraph", state="running")
+                semaphore.release()
+        
+        outcomes = await asyncio.gather(
+            *[execute_with_semaphore(call) for call in calls],
+            return_exceptions=True
         )
         
-        graph.add_edge("consolidator", END)
-        
-        return graph
+        results, executed = {}, []
+        errors = [f"{error_prefix} {call['name']}: ferramenta indisponível" for call in missing]
+        for call, outcome in zip(calls, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Erro em {call['name']}: {str(outcome)}")
+                errors.append(f"{error_prefix} {call['name']}: {str(outcome)}")
+                continue
+            if isinstance(outcome, dict) and outcome.get("status") == "error":
+                errors.append(f"{error_prefix} {call['name']}: {outcome.get('message', 'erro')}")
+            results[self._call_id(call)] = store.put(outcome, call["name"])
+            executed.append(call["name"])
+        return results, errors, executed
+    
+    @staticmethod
+    def _call_id(call: Dict[str, Any]) -> str:
+        return call.get("id") or call["name"]
+    
+    def _pending_calls(self, node: str, state: FinancialAgentState) -> List[Dict[str, Any]]:
+        """Chamadas pedidas pelo LLM que cabem ao nó"""
+        return [call for call in state.get("tool_calls") or [] if call["name"] in NODE_TOOLS[node]]
+    
+    def _result_store(self, state: FinancialAgentState) -> ResultStore:
+        """ResultStore da execução (recriado vazio se expirou)"""
+        store = self.result_stores.get(state["run_id"])
+        if store is None:
+            logger.warning(f"Resultados da execução {state['run_id']} expiraram")
+            store = ResultStore(state["run_id"])
+            self.result_stores.set(state["run_id"], store)
+        return store
     
     # ==========================================
     # AGENTES ESPECIALIZADOS
     # ==========================================
+    # Cada agente devolve só as chaves que alterou: ramos paralelos não podem
+    # reescrever o estado inteiro. Listas, resultados e metadados são
+    # acumulados pelos reducers de FinancialAgentState.
     
-    async def _coordinator_agent(self, state: FinancialAgentState) -> FinancialAgentState:
-        """Agente coordenador que decide próximos passos"""
+    async def _coordinator_agent(self, state: FinancialAgentState) -> Dict[str, Any]:
+        """Agente coordenador que decide os próximos passos"""
         
         logger.info("Executando agente coordenador")
         
-        # Analisa o estado atual e decide próxima ação
         completed_agents = state.get("agents_completed", [])
-        query = state.get("user_query", "")
-        
-        # Lógica de decisão baseada no estado atual
-        if "data_retriever" not in completed_agents and self._needs_data_retrieval(query):
-            next_action = "data_retriever"
-        elif "calculator" not in completed_agents and self._needs_calculations(query, state):
-            next_action = "calculator"
-        elif "financial_analyst" not in completed_agents and self._needs_analysis(query, state):
-            next_action = "analyst"
-        elif "risk_assessor" not in completed_agents and self._needs_risk_assessment(query, state):
-            next_action = "risk_assessor"
-        elif "validator" not in completed_agents:
-            next_action = "validator"
-        else:
-            next_action = "end"
-        
-        state["next_action"] = next_action
-        state["current_agent"] = "coordinator"
-        
-        if "coordinator" not in completed_agents:
-            state["agents_completed"].append("coordinator")
         
-        logger.info(f"Coordenador decidiu próxima ação: {next_action}")
+        # As ferramentas de leitura são independentes entre si: os nós com chamadas rodam juntos
+        next_action = [
+            node for node in NODE_TOOLS
+            if node not in completed_agents and self._pending_calls(node, state)
+        ]
         
-        return state
-    
-    async def _data_retriever_agent(self, state: FinancialAgentState) -> FinancialAgentState:
-        """Agente especializado em recuperação de dados"""
+        if not next_action:
+            next_action = ["validator"] if "validator" not in completed_agents else ["end"]
         
-        logger.info("Executando agente recuperador de dados")
+        update = {"next_action": next_action, "current_agent": "coordinator"}
+        if "coordinator" not in completed_agents:
+            update["agents_completed"] = ["coordinator"]
         
-        try:
-            # Identifica quais dados são necessários
-            needed_data = self._identify_needed_data(state["user_query"])
-            
-            results = {}
-            
-            # Executa ferramentas de dados em paralelo
-            data_tasks = []
-            for data_type, tool_name in needed_data.items():
-                if tool_name in self.tool_map:
-                    task = self._execute_tool_async(tool_name, self._extract_args_for_tool(tool_name, state))
-                    data_tasks.append((data_type, task))
-            
-            # Aguarda todos os resultados
-            for data_type, task in data_tasks:
-                try:
-                    result = await task
-                    results[data_type] = result
-                except Exception as e:
-                    logger.error(f"Erro ao buscar {data_type}: {str(e)}")
-                    state["errors"].append(f"Falha na busca de {data_type}: {str(e)}")
-            
-            # Atualiza estado com os dados
-            state["financial_data"] = results.get("financial_data")
-            state["market_data"] = results.get("market_data")
-            state["company_info"] = results.get("company_info")
-            
-            state["agents_completed"].append("data_retriever")
-            state["current_agent"] = "data_retriever"
-            
-            logger.info(f"Dados recuperados: {list(results.keys())}")
-            
-        except Exception as e:
-            logger.error(f"Erro no agente de dados: {str(e)}")
-            state["errors"].append(f"Erro no recuperador de dados: {str(e)}")
+        logger.info(f"Coordenador decidiu próxima ação: {next_action}")
         
-        return state
+        return update
     
-    async def _calculator_agent(self, state: FinancialAgentState) -> FinancialAgentState:
-        """Agente especializado em cálculos financeiros"""
-        
-        logger.info("Executando agente calculadora")
+    async def _tool_agent(self, node: str, state: FinancialAgentState, error_prefix: str) -> Dict[str, Any]:
+        """Executa as chamadas do nó e guarda os handles dos resultados"""
+        update = {"agents_completed": [node], "current_agent": node, "errors": []}
         
         try:
-            # Identifica cálculos necessários
-            needed_calculations = self._identify_needed_calculations(state["user_query"], state)
-            
-            results = {}
-            
-            # Executa cálculos
-            for calc_type, tool_name in needed_calculations.items():
-                if tool_name in self.tool_map:
-                    try:
-                        args = self._extract_args_for_tool(tool_name, state)
-                        result = await self._execute_tool_async(tool_name, args)
-                        results[calc_type] = result
-                    except Exception as e:
-                        logger.error(f"Erro no cálculo {calc_type}: {str(e)}")
-                        state["errors"].append(f"Falha no cálculo {calc_type}: {str(e)}")
-            
-            # Atualiza estado
-            state["calculated_metrics"] = results.get("metrics")
-            state["ratios"] = results.get("ratios")
-            state["returns"] = results.get("returns")
-            
-            state["agents_completed"].append("calculator")
-            state["current_agent"] = "calculator"
+            results, errors, executed = await self._run_tools(
+                self._pending_calls(node, state), state, error_prefix
+            )
+            update["tool_results"] = results
+            update["errors"] = errors
+            update["tools_executed"] = executed
             
-            logger.info(f"Cálculos realizados: {list(results.keys())}")
+            logger.info(f"{node}: {len(executed)} ferramenta(s) executada(s)")
             
         except Exception as e:
-            logger.error(f"Erro no agente calculadora: {str(e)}")
-            state["errors"].append(f"Erro na calculadora: {str(e)}")
+            logger.error(f"Erro no agente {node}: {str(e)}")
+            update["errors"] = [f"Erro no agente {node}: {str(e)}"]
         
-        return state
+        return update
     
-    async def _financial_analyst_agent(self, state: FinancialAgentState) -> FinancialAgentState:
-        """Agente especializado em análises financeiras"""
-        
-        logger.info("Executando agente analista financeiro")
-        
-        try:
-            # Identifica análises necessárias
-            needed_analyses = self._identify_needed_analyses(state["user_query"], state)
-            
-            results = {}
-            
-            # Executa análises
-            for analysis_type, tool_name in needed_analyses.items():
-                if tool_name in self.tool_map:
-                    try:
-                        args = self._extract_args_for_tool(tool_name, state)
-                        result = await self._execute_tool_async(tool_name, args)
-                        results[analysis_type] = result
-                    except Exception as e:
-                        logger.error(f"Erro na análise {analysis_type}: {str(e)}")
-                        state["errors"].append(f"Falha na análise {analysis_type}: {str(e)}")
-            
-            # Atualiza estado
-            state["portfolio_analysis"] = results.get("portfolio")
-            state["performance_analysis"] = results.get("performance")
-            
-            state["agents_completed"].append("financial_analyst")
-            state["current_agent"] = "financial_analyst"
-            
-            logger.info(f"Análises realizadas: {list(results.keys())}")
-            
-        except Exception as e:
-            logger.error(f"Erro no agente analista: {str(e)}")
-            state["errors"].append(f"Erro no analista: {str(e)}")
-        
-        return state
+    async def _data_retriever_agent(self, state: FinancialAgentState) -> Dict[str, Any]:
+        """Agente especializado em recuperação de dados (transações e categorias)"""
+        logger.info("Executando agente recuperador de dados")
+        return await self._tool_agent("data_retriever", state, "Falha na busca de")
     
-    async def _risk_assessor_agent(self, state: FinancialAgentState) -> FinancialAgentState:
-        """Agente especializado em avaliação de riscos"""
-        
-        logger.info("Executando agente avaliador de riscos")
-        
-        try:
-            # Avaliações de risco
-            risk_tools = ["risk_assessment", "calculate_var", "stress_testing"]
-            
-            results = {}
-            
-            for tool_name in risk_tools:
-                if tool_name in self.tool_map:
-                    try:
-                        args = self._extract_args_for_tool(tool_name, state)
-                        result = await self._execute_tool_async(tool_name, args)
-                        results[tool_name] = result
-                    except Exception as e:
-                        logger.error(f"Erro na avaliação {tool_name}: {str(e)}")
-                        state["errors"].append(f"Falha em {tool_name}: {str(e)}")
-            
-            # Consolida avaliação de risco
-            state["risk_assessment"] = {
-                "overall_assessment": results.get("risk_assessment"),
-                "var_analysis": results.get("calculate_var"),
-                "stress_test": results.get("stress_testing")
-            }
-            
-            state["agents_completed"].append("risk_assessor")
-            state["current_agent"] = "risk_assessor"
-            
-            logger.info("Avaliação de riscos concluída")
-            
-        except Exception as e:
-            logger.error(f"Erro no agente de riscos: {str(e)}")
-            state["errors"].append(f"Erro no avaliador de riscos: {str(e)}")
-        
-        return state
+    async def _calculator_agent(self, state: FinancialAgentState) -> Dict[str, Any]:
+        """Agente especializado em cálculos financeiros (saldo e agregações)"""
+        logger.info("Executando agente calculadora")
+        return await self._tool_agent("calculator", state, "Falha no cálculo de")
     
-    async def _validator_agent(self, state: FinancialAgentState) -> FinancialAgentState:
+    async def _validator_agent(self, state: FinancialAgentState) -> Dict[str, Any]:
         """Agente especializado em validação"""
         
         logger.info("Executando agente validador")
+        update = {"agents_completed": ["validator"], "current_agent": "validator"}
         
         try:
-            validation_results = {}
-            
-            # Valida dados
-            if state.get("financial_data"):
-                validation_results["data_quality"] = self._validate_data_quality(state["financial_data"])
-            
-            # Valida cálculos
-            if state.get("calculated_metrics"):
-                validation_results["calculation_validity"] = self._validate_calculations(state["calculated_metrics"])
-            
-            # Valida consistência
-            validation_results["cross_validation"] = self._cross_validate_results(state)
-            
-            state["data_validation"] = validation_results
-            
-            state["agents_completed"].append("validator")
-            state["current_agent"] = "validator"
+            store = self._result_store(state)
+            results = state.get("tool_results") or {}
+            
+            # Toda chamada pedida precisa de um resultado com sucesso
+            failed = []
+            for call in state.get("tool_calls") or []:
+                result = store.get(results.get(self._call_id(call)))
+                if not isinstance(result, dict) or result.get("status") != "success":
+                    failed.append(call["name"])
+            
+            update["data_validation"] = {
+                "status": "invalid" if failed else "valid",
+                "failed_calls": failed,
+            }
             
             logger.info("Validação concluída")
             
         except Exception as e:
             logger.error(f"Erro no agente validador: {str(e)}")
-            state["errors"].append(f"Erro no validador: {str(e)}")
+            update["errors"] = [f"Erro no validador: {str(e)}"]
         
-        return state
+        return update
     
-    async def _consolidator_agent(self, state: FinancialAgentState) -> FinancialAgentState:
+    async def _consolidator_agent(self, state: FinancialAgentState) -> Dict[str, Any]:
         """Agente que consolida todos os resultados"""
         
         logger.info("Executando agente consolidador")
@@ -402,230 +364,56 @@ class LangGraphFinancialMultiAgent:
         # Cria resposta consolidada
         consolidated_response = self._create_consolidated_response(state)
         
-        # Adiciona resposta final às mensagens
-        state["messages"].append(AIMessage(content=consolidated_response))
-        
-        state["agents_completed"].append("consolidator")
-        state["current_agent"] = "consolidator"
-        
-        # Atualiza metadados de execução
-        state["execution_metadata"]["completed_at"] = datetime.now().isoformat()
-        state["execution_metadata"]["total_agents"] = len(state["agents_completed"])
-        
         logger.info("Consolidação concluída")
         
-        return state
+        return {
+            "messages": [AIMessage(content=consolidated_response)],
+            "agents_completed": ["consolidator"],
+            "current_agent": "consolidator",
+            "execution_metadata": {
+                "completed_at": datetime.now().isoformat(),
+                "total_agents": len(state.get("agents_completed", [])) + 1
+            }
+        }
     
     # ==========================================
     # FUNÇÕES DE ROTEAMENTO CONDICIONAL
     # ==========================================
     
-    def _should_route_to_data_retriever(self, state: FinancialAgentState) -> str:
-        """Decide se deve ir para recuperação de dados"""
-        next_action = state.get("next_action", "")
-        if next_action == "data_retriever":
-            return "data_retriever"
-        elif next_action == "calculator":
-            return "calculator"
-        elif next_action == "analyst":
-            return "analyst"
-        elif next_action == "validator":
-            return "validator"
-        else:
-            return "end"
-    
-    def _after_data_retrieval(self, state: FinancialAgentState) -> str:
-        """Decide próximo passo após recuperação de dados"""
-        query = state.get("user_query", "").lower()
-        
-        if "calcul" in query or "métrica" in query or "ratio" in query:
-            return "calculator"
-        elif "analis" in query or "insight" in query:
-            return "analyst"
-        else:
-            return "coordinator"
-    
-    def _after_calculation(self, state: FinancialAgentState) -> str:
-        """Decide próximo passo após cálculos"""
-        query = state.get("user_query", "").lower()
-        
-        if "risco" in query or "var" in query:
-            return "risk_assessor"
-        elif "analis" in query:
-            return "analyst"
-        else:
-            return "coordinator"
-    
-    def _after_analysis(self, state: FinancialAgentState) -> str:
-        """Decide próximo passo após análise"""
-        query = state.get("user_query", "").lower()
-        
-        if "risco" in query and "risk_assessor" not in state.get("agents_completed", []):
-            return "risk_assessor"
-        else:
-            return "validator"
-    
-    def _after_risk_assessment(self, state: FinancialAgentState) -> str:
-        """Decide próximo passo após avaliação de risco"""
-        return "validator"
-    
-    def _after_validation(self, state: FinancialAgentState) -> str:
-        """Decide próximo passo após validação"""
-        validation_results = state.get("data_validation", {})
-        
-        # Se validação falhou, pode ser necessário re-executar
-        if validation_results.get("data_quality", {}).get("status") == "invalid":
-            return "data_retriever"
-        
-        return "consolidator"
+    def _route_from_coordinator(self, state: FinancialAgentState) -> List[str]:
+        """Nós disparados pelo coordinator (mais de um = ramos paralelos)"""
+        return state.get("next_action") or ["end"]
     
     # ==========================================
     # FUNÇÕES AUXILIARES
     # ==========================================
     
-    def _needs_data_retrieval(self, query: str) -> bool:
-        """Verifica se a query precisa de recuperação de dados"""
-        data_keywords = ["dados", "informações", "empresa", "mercado", "ação", "preço"]
-        return any(keyword in query.lower() for keyword in data_keywords)
-    
-    def _needs_calculations(self, query: str, state: FinancialAgentState) -> bool:
-        """Verifica se precisa de cálculos"""
-        calc_keywords = ["calcul", "métrica", "ratio", "retorno", "performance"]
-        has_data = state.get("financial_data") is not None
-        return any(keyword in query.lower() for keyword in calc_keywords) and has_data
-    
-    def _needs_analysis(self, query: str, state: FinancialAgentState) -> bool:
-        """Verifica se precisa de análises"""
-        analysis_keywords = ["analis", "insight", "recomendação", "estratégia"]
-        has_prerequisites = (
-            state.get("financial_data") is not None or 
-            state.get("calculated_metrics") is not None
-        )
-        return any(keyword in query.lower() for keyword in analysis_keywords) and has_prerequisites
-    
-    def _needs_risk_assessment(self, query: str, state: FinancialAgentState) -> bool:
-        """Verifica se precisa de avaliação de risco"""
-        risk_keywords = ["risco", "var", "volatilidade", "stress"]
-        has_analysis = state.get("portfolio_analysis") is not None
-        return any(keyword in query.lower() for keyword in risk_keywords) and has_analysis
-    
     async def _execute_tool_async(self, tool_name: str, args: Dict[str, Any]) -> Any:
-        """Executa ferramenta de forma assíncrona"""
+        """Executa ferramenta de forma assíncrona com os argumentos pedidos pelo LLM"""
         tool = self.tool_map[tool_name]
+        self.stats["tool_calls"] += 1
         
-        if asyncio.iscoroutinefunction(tool.invoke):
-            return await tool.invoke(args)
-        else:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, tool.invoke, args)
-    
-    def _identify_needed_data(self, query: str) -> Dict[str, str]:
-        """Identifica que tipos de dados são necessários"""
-        needed = {}
-        
-        if any(word in query.lower() for word in ["empresa", "companhia", "ação"]):
-            needed["financial_data"] = "get_financial_data"
-        
-        if any(word in query.lower() for word in ["mercado", "índice", "benchmark"]):
-            needed["market_data"] = "get_market_data"
-        
-        if any(word in query.lower() for word in ["informações", "dados", "perfil"]):
-            needed["company_info"] = "get_company_info"
-        
-        return needed
-    
-    def _identify_needed_calculations(self, query: str, state: FinancialAgentState) -> Dict[str, str]:
-        """Identifica cálculos necessários"""
-        needed = {}
-        
-        if any(word in query.lower() for word in ["métrica", "indicador"]):
-            needed["metrics"] = "calculate_metrics"
-        
-        if any(word in query.lower() for word in ["ratio", "índice"]):
-            needed["ratios"] = "calculate_ratios"
-        
-        if any(word in query.lower() for word in ["retorno", "performance"]):
-            needed["returns"] = "calculate_returns"
-        
-        return needed
-    
-    def _identify_needed_analyses(self, query: str, state: FinancialAgentState) -> Dict[str, str]:
-        """Identifica análises necessárias"""
-        needed = {}
-        
-        if any(word in query.lower() for word in ["portfolio", "carteira"]):
-            needed["portfolio"] = "analyze_portfolio"
-        
-        if any(word in query.lower() for word in ["performance", "desempenho"]):
-            needed["performance"] = "analyze_performance"
-        
-        return needed
-    
-    def _extract_args_for_tool(self, tool_name: str, state: FinancialAgentState) -> Dict[str, Any]:
-        """Extrai argumentos necessários para uma ferramenta baseado no estado"""
-        base_args = {"user_id": state.get("user_id", "")}
-        
-        # Adiciona dados relevantes do estado como contexto
-        if state.get("financial_data"):
-            base_args["financial_data"] = state["financial_data"]
-        
-        if state.get("market_data"):
-            base_args["market_data"] = state["market_data"]
-        
-        if state.get("calculated_metrics"):
-            base_args["calculated_metrics"] = state["calculated_metrics"]
-        
-        # Argumentos específicos baseados na query
-        # (Esta lógica pode ser mais sofisticada baseada nas suas ferramentas específicas)
-        
-        return base_args
-    
-    def _validate_data_quality(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Valida qualidade dos dados"""
-        if not data:
-            return {"status": "invalid", "reason": "Dados vazios"}
-        
-        # Implementar validações específicas
-        return {"status": "valid"}
-    
-    def _validate_calculations(self, calculations: Dict[str, Any]) -> Dict[str, Any]:
-        """Valida cálculos"""
-        if not calculations:
-            return {"status": "invalid", "reason": "Cálculos vazios"}
-        
-        # Implementar validações específicas
-        return {"status": "valid"}
-    
-    def _cross_validate_results(self, state: FinancialAgentState) -> Dict[str, Any]:
-        """Validação cruzada de resultados"""
-        # Implementar validações cruzadas entre diferentes resultados
-        return {"status": "consistent"}
+        with TOOL_CALL_SECONDS.time(tool=tool_name, implementation="langgraph"):
+            if asyncio.iscoroutinefunction(tool.invoke):
+                return await tool.invoke(args)
+            else:
+                loop = asyncio.get_event_loop()
+                return await loop.run_in_executor(None, tool.invoke, args)
     
     def _create_consolidated_response(self, state: FinancialAgentState) -> str:
-        """Cria resposta final consolidada"""
+        """Cria resposta final consolidada (o texto final ao usuário é redigido pelo LLM)"""
+        
+        # Sem nenhuma ferramenta executada não há análise a relatar
+        if not state.get("tools_executed"):
+            errors = state.get("errors") or ["nenhum agente encontrou ferramentas para a consulta"]
+            return "Erro no processamento: nenhuma ferramenta executada (" + "; ".join(errors) + ")"
         
         response_parts = []
         
         # Resumo da execução
         completed_agents = state.get("agents_completed", [])
         response_parts.append(f"✅ Análise concluída com {len(completed_agents)} agentes especializados:")
-        
-        # Resultados por seção
-        if state.get("financial_data"):
-            response_parts.append("\n📊 **Dados Financeiros Coletados**")
-            # Adicionar resumo dos dados
-        
-        if state.get("calculated_metrics"):
-            response_parts.append("\n🧮 **Métricas Calculadas**")
-            # Adicionar resumo dos cálculos
-        
-        if state.get("portfolio_analysis"):
-            response_parts.append("\n📈 **Análise de Portfolio**")
-            # Adicionar insights da análise
-        
-        if state.get("risk_assessment"):
-            response_parts.append("\n⚠️ **Avaliação de Riscos**")
-            # Adicionar avaliação de riscos
+        response_parts.append(f"\n📊 **Ferramentas executadas**: {', '.join(state['tools_executed'])}")
         
         # Erros, se houver
         if state.get("errors"):
@@ -633,6 +421,33 @@ class LangGraphFinancialMultiAgent:
         
         return "\n".join(response_parts)
     
+    def _agents_used(self, node_timings: List[Dict[str, Any]]) -> Dict[AgentRole, int]:
+        """Execuções por agente (o consolidador não é um papel de AgentRole)"""
+        roles = {role.value: role for role in AgentRole}
+        used: Dict[AgentRole, int] = {}
+        for timing in node_timings:
+            role = roles.get(timing["node"])
+            if role:
+                used[role] = used.get(role, 0) + 1
+        return used
+    
+    def _checkpoint_bytes(self, thread_id: str) -> Optional[int]:
+        """Bytes gravados em checkpoints pela execução (None se o checkpointer não mede)"""
+        thread_bytes = getattr(self.checkpointer, "thread_bytes", None)
+        if thread_bytes is None:
+            return None
+        size = thread_bytes(thread_id)
+        self.stats["runs"] += 1
+        self.stats["checkpoint_bytes"] += size
+        return size
+    
+    def _node_seconds(self, node_timings: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Tempo total por nó"""
+        seconds: Dict[str, float] = {}
+        for timing in node_timings:
+            seconds[timing["node"]] = seconds.get(timing["node"], 0.0) + timing["seconds"]
+        return seconds
+    
     # ==========================================
     # INTERFACE PÚBLICA
     # ==========================================
@@ -641,9 +456,25 @@ class LangGraphFinancialMultiAgent:
         self, 
         user_query: str, 
         user_id: str, 
-        context: str = ""
+        context: str = "",
+        tool_calls: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
-        """Processa uma consulta financeira usando o sistema LangGraph"""
+        """
+        Processa uma consulta financeira usando o sistema LangGraph
+        
+        Args:
+            user_query: Pergunta do usuário
+            user_id: Usuário (thread do checkpoint)
+            context: Contexto RAG
+            tool_calls: Chamadas de ferramenta pedidas pelo LLM
+            
+        Returns:
+            Resposta consolidada, sumário, estado final e resultados por id da chamada
+        """
+        
+        # Resultados da execução ficam fora do estado (e dos checkpoints)
+        run_id = uuid.uuid4().hex[:12]
+        self.result_stores.set(run_id, ResultStore(run_id))
         
         # Estado inicial
         initial_state = FinancialAgentState(
@@ -651,17 +482,10 @@ class LangGraphFinancialMultiAgent:
             user_query=user_query,
             context=context,
             user_id=user_id,
-            financial_data=None,
-            market_data=None,
-            company_info=None,
-            calculated_metrics=None,
-            ratios=None,
-            returns=None,
-            portfolio_analysis=None,
-            risk_assessment=None,
-            performance_analysis=None,
+            run_id=run_id,
+            tool_calls=list(tool_calls or []),
+            tool_results={},
             data_validation=None,
-            compliance_check=None,
             agents_completed=[],
             current_agent="",
             execution_metadata={
@@ -670,14 +494,20 @@ class LangGraphFinancialMultiAgent:
                 "user_id": user_id
             },
             errors=[],
+            tools_executed=[],
             next_action=None
         )
         
         try:
-            # Executa o grafo
-            config = {"configurable": {"thread_id": f"user_{user_id}_{int(datetime.now().timestamp())}"}}
+            # Executa o grafo (thread nova por execução: os reducers acumulariam o estado de outra)
+            thread_id = f"user_{user_id}_{run_id}"
+            config = {"configurable": {"thread_id": thread_id}}
             
+            started = time.perf_counter()
             final_state = await self.compiled_graph.ainvoke(initial_state, config)
+            total_execution_time = time.perf_counter() - started
+            node_timings = final_state.get("execution_metadata", {}).get("node_timings", [])
+            checkpoint_bytes = self._checkpoint_bytes(thread_id)
             
             # Extrai resposta final
             final_messages = final_state.get("messages", [])
@@ -688,14 +518,27 @@ class LangGraphFinancialMultiAgent:
                     final_response = msg.content
                     break
             
+            # Resultados lidos do ResultStore (o estado só tem os handles)
+            store = self._result_store(final_state)
+            tool_results = {
+                call_id: store.get(handle) for call_id, handle in (final_state.get("tool_results") or {}).items()
+            }
+            
             # Cria sumário de execução
+            errors = final_state.get("errors", [])
             execution_summary = ExecutionSummary(
-                total_tasks=len(final_state.get("agents_completed", [])),
-                successful_tasks=len([a for a in final_state.get("agents_completed", []) if a != "coordinator"]),
-                failed_tasks=len(final_state.get("errors", [])),
-                total_execution_time=0.0,  # LangGraph gerencia isso internamente
-                agents_used={},  # Pode ser extraído do estado
-                errors=final_state.get("errors", [])
+                total_tasks=len(final_state.get("tool_calls") or []),
+                successful_tasks=len(final_state.get("tools_executed", [])),
+                failed_tasks=len(errors),
+                total_execution_time=total_execution_time,
+                agents_used=self._agents_used(node_timings),
+                errors=errors,
+                performance_metrics={
+                    "node_seconds": self._node_seconds(node_timings),
+                    "graph_steps": len(node_timings),
+                    "checkpoint_bytes": checkpoint_bytes,
+                    "stored_results": len(store)
+                }
             )
             
             return {
@@ -703,7 +546,9 @@ class LangGraphFinancialMultiAgent:
                 "execution_summary": execution_summary.to_dict(),
                 "agents_completed": final_state.get("agents_completed", []),
                 "state": final_state,
-                "errors": final_state.get("errors", [])
+                "errors": errors,
+                "tools_executed": final_state.get("tools_executed", []),
+                "tool_results": tool_results
             }
             
         except Exception as e:
@@ -713,5 +558,7 @@ class LangGraphFinancialMultiAgent:
                 "execution_summary": {"error": str(e)},
                 "agents_completed": [],
                 "state": initial_state,
-                "errors": [str(e)]
+                "errors": [str(e)],
+                "tools_executed": [],
+                "tool_results": {}
             }
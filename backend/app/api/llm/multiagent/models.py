@@ -105,6 +105,7 @@ class ExecutionSummary:
     agents_used: Dict[AgentRole, int]
     errors: List[str] = field(default_factory=list)
     performance_metrics: Dict[str, Any] = field(default_factory=dict)
+    results: List[AgentResult] = field(default_factory=list)  # fora do to_dict
     
     @property
     def success_rate(self) -> float:
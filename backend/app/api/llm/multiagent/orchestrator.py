@@ -9,6 +9,7 @@ import time
 from typing import List, Dict, Any, Set
 from sqlalchemy.orm import Session
 
+from app.utils.metrics import REGISTRY
 from .models import (
     AgentTask, AgentResult, ExecutionPlan, ExecutionSummary,
     TaskStatus, AgentRole
@@ -20,6 +21,15 @@ from ..providers.base_provider import BaseLLMProvider
 
 logger = logging.getLogger(__name__)
 
+# Compartilhadas com o LangGraph (label implementation)
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "tool_call_duration_seconds", "Latência das ferramentas por nome", ["tool", "implementation"]
+)
+AGENT_TASKS = REGISTRY.gauge(
+    "multiagent_tasks", "Tarefas de agentes aguardando vaga (queued) ou executando (running)",
+    ["implementation", "state"]
+)
+
 
 class MultiAgentOrchestrator:
     """Orquestrador principal do sistema multiagentes"""
@@ -134,8 +144,17 @@ class MultiAgentOrchestrator:
         semaphore = asyncio.Semaphore(self.config.MAX_PARALLEL_TASKS)
         
         async def execute_with_semaphore(task: AgentTask):
-            async with semaphore:
+            AGENT_TASKS.inc(implementation="custom", state="queued")
+            try:
+                await semaphore.acquire()
+            finally:
+                AGENT_TASKS.dec(implementation="custom", state="queued")
+            AGENT_TASKS.inc(implementation="custom", state="running")
+            try:
                 return await self._execute_single_task(task, previous_results)
+            finally:
+                AGENT_TASKS.dec(implementation="custom", state="running")
+                semaphore.release()
         
         # Executa tarefas
         results = await asyncio.gather(
@@ -268,13 +287,14 @@ class MultiAgentOrchestrator:
     
     async def _invoke_tool_async(self, tool, args):
         """Invoca ferramenta de forma assíncrona"""
-        # Se a ferramenta for assíncrona, chama diretamente
-        if asyncio.iscoroutinefunction(tool.invoke):
-            return await tool.invoke(args)
-        else:
-            # Executa em thread pool para não bloquear
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, tool.invoke, args)
+        with TOOL_CALL_SECONDS.time(tool=tool.name, implementation="custom"):
+            # Se a ferramenta for assíncrona, chama diretamente
+            if asyncio.iscoroutinefunction(tool.invoke):
+                return await tool.invoke(args)
+            else:
+                # Executa em thread pool para não bloquear
+                loop = asyncio.get_event_loop()
+                return await loop.run_in_executor(None, tool.invoke, args)
     
     def _enrich_task_arguments(
         self, 
@@ -363,7 +383,8 @@ class MultiAgentOrchestrator:
             total_execution_time=total_time,
             agents_used=agents_used,
             errors=errors,
-            performance_metrics=performance_metrics
+            performance_metrics=performance_metrics,
+            results=results
         )
     
     def _update_stats(self, summary: ExecutionSummary, execution_time: float):
@@ -0,0 +1,53 @@
+# ==========================================
+# backend/app/api/llm/multiagent/result_store.py
+# ==========================================
+
+from typing import Any, Dict, Optional
+
+HANDLE_PREFIX = "result://"
+
+
+def is_handle(value: Any) -> bool:
+    """O valor é uma referência ao ResultStore?"""
+    return isinstance(value, str) and value.startswith(HANDLE_PREFIX)
+
+
+class ResultStore:
+    """
+    Resultados das ferramentas de uma execução do grafo, fora do estado.
+
+    O estado do LangGraph guarda só as referências (handles) por chamada;
+    os dados não são serializados em cada checkpoint e só são lidos pelo
+    validador e ao montar a resposta.
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self._results: Dict[str, Any] = {}
+        self.stats = {"puts": 0, "resolves": 0}
+
+    def put(self, value: Any, name: str) -> str:
+        """
+        Guarda um resultado
+
+        Args:
+            value: Resultado da ferramenta
+            name: Nome legível (ex.: "get_balance")
+
+        Returns:
+            Handle para o estado do grafo
+        """
+        handle = f"{HANDLE_PREFIX}{self.run_id}/{name}/{len(self._results)}"
+        self._results[handle] = value
+        self.stats["puts"] += 1
+        return handle
+
+    def get(self, handle: Optional[str]) -> Any:
+        """Resultado do handle (None se ausente)"""
+        if not handle:
+            return None
+        self.stats["resolves"] += 1
+        return self._results.get(handle)
+
+    def __len__(self) -> int:
+        return len(self._results)
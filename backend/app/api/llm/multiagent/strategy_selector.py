@@ -0,0 +1,164 @@
+# ==========================================
+# backend/app/api/llm/multiagent/strategy_selector.py
+# ==========================================
+
+import logging
+import random
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PATHS = ("langgraph", "custom")
+
+
+def bucket_key(tool_calls: List[Dict], intent: Optional[str] = None) -> str:
+    """Atributos da pergunta que definem o bucket: nº de ferramentas, conjunto e intenção"""
+    names = sorted({call["name"] for call in tool_calls})
+    count = len(tool_calls)
+    count_bucket = str(count) if count < 3 else "3+"
+    return f"n={count_bucket}|tools={','.join(names)}|intent={intent or 'unknown'}"
+
+
+@dataclass
+class PathStats:
+    """Latência (média móvel) e sucesso de um caminho num bucket"""
+    executions: int = 0
+    successes: int = 0
+    latency_ewma: Optional[float] = None
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=50))
+
+    def record(self, latency: float, success: bool, smoothing: float):
+        self.executions += 1
+        if success:
+            self.successes += 1
+            self.latencies.append(latency)
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += smoothing * (latency - self.latency_ewma)
+
+    @property
+    def success_rate(self) -> float:
+        # Prior otimista (1 sucesso em 1 tentativa) para não descartar um caminho cedo
+        return (self.successes + 1) / (self.executions + 1)
+
+    def cost(self, failure_penalty: float) -> float:
+        """Latência esperada por resposta bem-sucedida"""
+        latency = self.latency_ewma if self.latency_ewma is not None else failure_penalty
+        return latency / max(self.success_rate, 0.05)
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "executions": self.executions,
+            "success_rate": (self.successes / self.executions * 100) if self.executions else 0.0,
+            "latency_ewma": self.latency_ewma,
+            "latency_p50": ordered[len(ordered) // 2] if ordered else None,
+        }
+
+
+@dataclass
+class StrategyDecision:
+    """Escolha feita para uma pergunta (exposta em get_stats)"""
+    bucket: str
+    path: str
+    reason: str  # "static", "warmup", "explore" ou "exploit"
+    static_path: str
+    at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bucket": self.bucket,
+            "path": self.path,
+            "reason": self.reason,
+            "static_path": self.static_path,
+            "at": self.at,
+        }
+
+
+class StrategySelector:
+    """
+    Escolhe online entre LangGraph e o orquestrador customizado (bandit
+    epsilon-greedy por bucket).
+
+    Cada caminho é experimentado `min_samples` vezes por bucket; depois vence
+    o de menor latência esperada por sucesso, com exploração `epsilon`.
+    Desligado (`enabled=False`) volta às regras estáticas do serviço.
+    """
+
+    def __init__(self,
+                 enabled: bool = True,
+                 epsilon: float = 0.1,
+                 min_samples: int = 3,
+                 smoothing: float = 0.3,
+                 failure_penalty: float = 30.0,
+                 history: int = 100,
+                 seed: Optional[int] = None):
+        self.enabled = enabled
+        self.epsilon = epsilon
+        self.min_samples = min_samples
+        self.smoothing = smoothing
+        self.failure_penalty = failure_penalty
+        self._random = random.Random(seed)
+
+        self.buckets: Dict[str, Dict[str, PathStats]] = defaultdict(lambda: {path: PathStats() for path in PATHS})
+        self.decisions: Deque[StrategyDecision] = deque(maxlen=history)
+        self.stats = {"decisions": defaultdict(int), "paths": defaultdict(int)}
+
+    def choose(self, bucket: str, static_path: str, available: List[str] = PATHS) -> StrategyDecision:
+        """
+        Escolhe o caminho para o bucket
+
+        Args:
+            bucket: Chave de bucket_key()
+            static_path: Caminho das regras estáticas (usado desligado e como primeira tentativa)
+            available: Caminhos possíveis (sem LangGraph instalado, só "custom")
+
+        Returns:
+            Decisão com caminho e motivo
+        """
+        if not self.enabled or len(available) < 2:
+            path = static_path if static_path in available else available[0]
+            return self._decide(bucket, path, "static", static_path)
+
+        stats = self.buckets[bucket]
+        # Aquecimento: o caminho estático primeiro, depois o menos experimentado
+        pending = [path for path in available if stats[path].executions < self.min_samples]
+        if pending:
+            path = static_path if static_path in pending else min(pending, key=lambda p: stats[p].executions)
+            return self._decide(bucket, path, "warmup", static_path)
+
+        if self._random.random() < self.epsilon:
+            return self._decide(bucket, self._random.choice(list(available)), "explore", static_path)
+
+        path = min(available, key=lambda p: stats[p].cost(self.failure_penalty))
+        return self._decide(bucket, path, "exploit", static_path)
+
+    def _decide(self, bucket: str, path: str, reason: str, static_path: str) -> StrategyDecision:
+        decision = StrategyDecision(bucket=bucket, path=path, reason=reason, static_path=static_path)
+        self.decisions.append(decision)
+        self.stats["decisions"][reason] += 1
+        self.stats["paths"][path] += 1
+        return decision
+
+    def record(self, decision: StrategyDecision, latency: float, success: bool):
+        """Registra o resultado da execução escolhida"""
+        self.buckets[decision.bucket][decision.path].record(latency, success, self.smoothing)
+
+    def get_stats(self, recent: int = 20) -> Dict[str, Any]:
+        """Decisões por motivo e caminho, estatísticas por bucket e últimas escolhas"""
+        return {
+            "enabled": self.enabled,
+            "epsilon": self.epsilon,
+            "min_samples": self.min_samples,
+            "decisions": dict(self.stats["decisions"]),
+            "paths": dict(self.stats["paths"]),
+            "buckets": {
+                bucket: {path: stats.to_dict() for path, stats in paths.items()}
+                for bucket, paths in self.buckets.items()
+            },
+            "recent_decisions": [decision.to_dict() for decision in list(self.decisions)[-recent:]],
+        }
@@ -1,11 +1,29 @@
 # backend/app/api/llm/providers/__init__.py
 
+import importlib
+
 from .factory import LLMProviderFactory
 from .base_provider import BaseLLMProvider
-from .gemini_provider import GeminiProvider
-from .openai_provider import OpenAIProvider
-from .lmstudio_provider import LMStudioProvider
-from .groq_provider import GroqProvider
+from .cached_provider import CachingProvider
+from .hedged_provider import HedgedProvider
+from .replay_provider import ReplayProvider
+
+# Provedores com SDK próprio (langchain_google_genai, langchain_openai,
+# langchain_groq): importados só quando acessados
+_LAZY_PROVIDERS = {
+    "GeminiProvider": "gemini_provider",
+    "OpenAIProvider": "openai_provider",
+    "GroqProvider": "groq_provider",
+    "LMStudioProvider": "lmstudio_provider",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_PROVIDERS:
+        module = importlib.import_module(f".{_LAZY_PROVIDERS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "LLMProviderFactory",
@@ -13,6 +31,8 @@ __all__ = [
     "GeminiProvider",
     "OpenAIProvider",
     "GroqProvider",    
-    "LMStudioProvider"
+    "LMStudioProvider",
+    "CachingProvider",
+    "HedgedProvider",
+    "ReplayProvider"
 ]
-
@@ -1,19 +1,54 @@
 # backend/app/api/llm/providers/base_provider.py
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from langchain_core.messages import BaseMessage
+from collections import OrderedDict
+from typing import Awaitable, Callable, FrozenSet, Iterable, List, Dict, Any, Optional
+from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_core.tools import BaseTool
+from app.utils.metrics import REGISTRY
+from .rate_limiter import RateLimiter, estimate_tokens, parse_retry_after
+from .tool_subset import active_tool_subset
+
+PING_MESSAGES = [HumanMessage(content="ping")]
+
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_duration_seconds", "Latência das chamadas ao modelo por provedor",
+    ["provider", "model", "outcome"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens consumidos por provedor (usage_metadata)", ["provider", "model", "type"]
+)
 
 
 class BaseLLMProvider(ABC):
     """Classe base abstrata para provedores de LLM"""
     
-    def __init__(self, model_name: str, temperature: float = 0.7, **kwargs):
+    # Clientes vinculados a subconjuntos de ferramentas mantidos em cache (LRU)
+    MAX_BOUND_CLIENTS = 32
+    
+    def __init__(self,
+                 model_name: str,
+                 temperature: float = 0.7,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 **kwargs):
         self.model_name = model_name
         self.temperature = temperature
+        self.rate_limiter = None
+        if requests_per_minute or tokens_per_minute:
+            self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+            # O limitador faz as retentativas de 429; as do SDK só pioram a cauda
+            kwargs.setdefault("max_retries", 0)
         self.extra_params = kwargs
         self._llm_with_tools = None
+        self._tools: Dict[str, BaseTool] = {}
+        self._bound_clients: "OrderedDict[FrozenSet[str], Any]" = OrderedDict()
+        self.binding_stats = {"subset_hits": 0, "subset_misses": 0, "evictions": 0}
+        self.last_queue_wait = 0.0
+        self._last_success_at: Optional[float] = None
+        self._ping_client = None
     
     @abstractmethod
     def _initialize_llm(self, tools: List[BaseTool]) -> Any:
@@ -31,11 +66,151 @@ class BaseLLMProvider(ABC):
         """
         pass
     
+    async def _invoke_with_limits(self,
+                                  messages: List[BaseMessage],
+                                  call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa a chamada ao modelo respeitando o limite de requisições/tokens.
+        
+        Args:
+            messages: Mensagens enviadas (usadas para estimar tokens)
+            call: Função que dispara a chamada ao SDK (pode ser repetida após 429)
+        
+        Returns:
+            Resposta do modelo, com `queue_wait_seconds` em response_metadata
+        """
+        if self.rate_limiter is None:
+            return await self._timed_call(call)
+        
+        estimated = estimate_tokens(messages) + self.rate_limiter.completion_reserve
+        attempt = 0
+        while True:
+            self.last_queue_wait = await self.rate_limiter.acquire(estimated)
+            try:
+                response = await self._timed_call(call)
+                break
+            except Exception as e:
+                retry_after = parse_retry_after(e)
+                if retry_after is None or attempt >= self.rate_limiter.max_retries:
+                    raise
+                # Sem dica do provedor: backoff exponencial a partir de 1s
+                self.rate_limiter.penalize(retry_after or 2.0 ** attempt)
+                attempt += 1
+        
+        usage = getattr(response, "usage_metadata", None) or {}
+        self.rate_limiter.reconcile(estimated, usage.get("total_tokens", 0))
+        metadata = getattr(response, "response_metadata", None)
+        if isinstance(metadata, dict):
+            metadata["queue_wait_seconds"] = self.last_queue_wait
+        return response
+    
+    async def _timed_call(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Uma chamada ao SDK, com latência e tokens registrados em /metrics"""
+        labels = {"provider": self.provider_name, "model": self.model_name}
+        started = time.perf_counter()
+        try:
+            response = await call()
+        except Exception:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome="error", **labels)
+            raise
+        
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome="ok", **labels)
+        self._last_success_at = time.monotonic()
+        usage = getattr(response, "usage_metadata", None) or {}
+        for token_type in ("input_tokens", "output_tokens"):
+            if usage.get(token_type):
+                LLM_TOKENS.inc(usage[token_type], type=token_type.replace("_tokens", ""), **labels)
+        return response
+    
     def bind_tools(self, tools: List[BaseTool]):
         """Vincula as ferramentas ao modelo LLM"""
         self._llm_with_tools = self._initialize_llm(tools)
+        self._tools = {tool.name: tool for tool in tools or []}
+        self._bound_clients.clear()
         return self
     
+    def _get_bound_llm(self) -> Any:
+        """
+        Cliente para o subconjunto de ferramentas ativo (ver tool_subset).
+        
+        Sem subconjunto, ou com todas as ferramentas, é o cliente de
+        bind_tools; os demais são criados uma vez e reaproveitados.
+        """
+        subset = active_tool_subset()
+        if subset is None or not self._tools:
+            return self._llm_with_tools
+        key = frozenset(name for name in subset if name in self._tools)
+        if len(key) == len(self._tools):
+            return self._llm_with_tools
+        
+        client = self._bound_clients.get(key)
+        if client is not None:
+            self._bound_clients.move_to_end(key)
+            self.binding_stats["subset_hits"] += 1
+            return client
+        
+        self.binding_stats["subset_misses"] += 1
+        return self._bind_subset(key)
+    
+    def _bind_subset(self, key: FrozenSet[str]) -> Any:
+        tools = [tool for name, tool in self._tools.items() if name in key]
+        client = self._initialize_llm(tools)
+        self._bound_clients[key] = client
+        if len(self._bound_clients) > self.MAX_BOUND_CLIENTS:
+            self._bound_clients.popitem(last=False)
+            self.binding_stats["evictions"] += 1
+        return client
+    
+    def prebind_tool_subsets(self, subsets: Iterable[Iterable[str]]):
+        """
+        Cria antecipadamente os clientes dos subconjuntos conhecidos,
+        tirando a construção do cliente do caminho da primeira requisição.
+        Decoradores (atributos `provider`/`providers`) repassam aos internos.
+        """
+        subsets = [frozenset(subset) for subset in subsets]
+        inner = self._inner_providers()
+        if inner:
+            for provider in inner:
+                provider.prebind_tool_subsets(subsets)
+            return
+        
+        for subset in subsets:
+            key = frozenset(name for name in subset if name in self._tools)
+            if key and len(key) < len(self._tools) and key not in self._bound_clients:
+                self._bind_subset(key)
+    
+    def _inner_providers(self) -> List["BaseLLMProvider"]:
+        """Providers envolvidos por um decorador (atributos `provider`/`providers`)"""
+        inner = getattr(self, "providers", None) or [getattr(self, "provider", None)]
+        return [provider for provider in inner if isinstance(provider, BaseLLMProvider)]
+    
+    @property
+    def last_success_at(self) -> Optional[float]:
+        """Instante (time.monotonic) da última resposta bem-sucedida do modelo"""
+        inner = self._inner_providers()
+        if inner:
+            return max((provider.last_success_at for provider in inner
+                        if provider.last_success_at is not None), default=None)
+        return self._last_success_at
+    
+    async def ping(self):
+        """
+        Chamada mínima ao modelo para o health check: sem ferramentas (o
+        schema não entra no prompt) e sem passar pelo cache de respostas.
+        Decoradores pingam os internos; basta um responder.
+        """
+        inner = self._inner_providers()
+        if inner:
+            results = await asyncio.gather(*(provider.ping() for provider in inner), return_exceptions=True)
+            errors = [result for result in results if isinstance(result, Exception)]
+            if len(errors) == len(results):
+                raise errors[0]
+            return
+        
+        if self._ping_client is None:
+            self._ping_client = self._initialize_llm([])
+        await self._invoke_with_limits(PING_MESSAGES, lambda: self._ping_client.ainvoke(PING_MESSAGES))
+    
     @property
     def provider_name(self) -> str:
         """Retorna o nome do provider"""
@@ -47,5 +222,7 @@ class BaseLLMProvider(ABC):
             "provider": self.provider_name,
             "model": self.model_name,
             "temperature": self.temperature,
-            "extra_params": self.extra_params
+            "extra_params": self.extra_params,
+            "rate_limit": self.rate_limiter.get_stats() if self.rate_limiter else None,
+            "tool_binding": {**self.binding_stats, "bound_clients": len(self._bound_clients)}
         }
\ No newline at end of file
@@ -0,0 +1,178 @@
+# backend/app/api/llm/providers/cached_provider.py
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import redis.asyncio as redis
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from ..cache.codec import CacheCodec
+from ..cache.local import LocalTTLCache
+from .base_provider import BaseLLMProvider
+from .tool_subset import active_tool_subset
+
+logger = logging.getLogger(__name__)
+
+
+def message_fingerprint(message: BaseMessage) -> Dict[str, Any]:
+    """
+    Partes de uma mensagem que influenciam a resposta. Ids e metadados
+    gerados pelo provedor ficam de fora, senão o histórico nunca repetiria.
+    """
+    fingerprint = {"type": message.type, "content": message.content}
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        fingerprint["tool_calls"] = [
+            {"name": call["name"], "args": call["args"]} for call in tool_calls
+        ]
+    tool_call_id = getattr(message, "tool_call_id", None)
+    if tool_call_id:
+        fingerprint["tool_call_id"] = tool_call_id
+    return fingerprint
+
+
+def tool_fingerprint(tool: BaseTool) -> Dict[str, Any]:
+    """Nome, descrição e schema dos argumentos de uma ferramenta"""
+    try:
+        return convert_to_openai_tool(tool)
+    except Exception:
+        return {"name": getattr(tool, "name", str(tool))}
+
+
+class InMemoryResponseCache:
+    """Backend em memória do processo (LRU com TTL)"""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600.0):
+        self.local = LocalTTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    async def get(self, key: str) -> Optional[List[dict]]:
+        return self.local.get(key)
+
+    async def set(self, key: str, value: List[dict], ttl: int):
+        self.local.set(key, value, ttl_seconds=ttl)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self.local.get_stats()}
+
+
+class RedisResponseCache:
+    """Backend no Redis, compartilhado entre workers"""
+
+    KEY_PREFIX = "llm_response"
+
+    def __init__(self, redis_client: redis.Redis, codec: CacheCodec = None):
+        self.redis_client = redis_client
+        self.codec = codec or CacheCodec()
+
+    async def get(self, key: str) -> Optional[List[dict]]:
+        payload = await self.redis_client.get(f"{self.KEY_PREFIX}:{key}")
+        return self.codec.decode(payload) if payload is not None else None
+
+    async def set(self, key: str, value: List[dict], ttl: int):
+        await self.redis_client.set(f"{self.KEY_PREFIX}:{key}", self.codec.encode(value), ex=ttl)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "codec": self.codec.get_stats()}
+
+
+class CachingProvider(BaseLLMProvider):
+    """
+    Decorador que cacheia respostas idênticas de outro provider.
+
+    A chave é o hash de (provider, modelo, temperatura, ferramentas vinculadas,
+    mensagens). Só faz sentido com temperatura baixa: acima de
+    `max_temperature` as chamadas passam direto para o provider.
+    """
+
+    def __init__(self,
+                 provider: BaseLLMProvider,
+                 backend=None,
+                 ttl: int = 3600,
+                 max_temperature: float = 0.3):
+        super().__init__(provider.model_name, provider.temperature)
+        self.provider = provider
+        self.backend = backend or InMemoryResponseCache(ttl_seconds=ttl)
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self._tools_fingerprint: Dict[str, Dict[str, Any]] = {}
+
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "errors": 0}
+
+    def _initialize_llm(self, tools: List[BaseTool]) -> Any:
+        return self.provider._initialize_llm(tools)
+
+    def bind_tools(self, tools: List[BaseTool]):
+        """Vincula as ferramentas no provider interno e registra sua assinatura"""
+        self.provider.bind_tools(tools)
+        self._llm_with_tools = self.provider._llm_with_tools
+        self._tools_fingerprint = {getattr(tool, "name", str(tool)): tool_fingerprint(tool) for tool in tools or []}
+        return self
+
+    @property
+    def provider_name(self) -> str:
+        return self.provider.provider_name
+
+    def cache_key(self, messages: List[BaseMessage]) -> str:
+        """Hash estável da requisição (só as ferramentas ativas entram na chave)"""
+        subset = active_tool_subset()
+        tools = [fingerprint for name, fingerprint in self._tools_fingerprint.items()
+                 if subset is None or name in subset]
+        payload = json.dumps(
+            {
+                "provider": self.provider.provider_name,
+                "model": self.provider.model_name,
+                "temperature": self.provider.temperature,
+                "tools": tools,
+                "messages": [message_fingerprint(message) for message in messages],
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def invoke(self, messages: List[BaseMessage]) -> Any:
+        """Serve do cache ou invoca o provider interno"""
+        if self.provider.temperature > self.max_temperature:
+            self.stats["bypassed"] += 1
+            return await self.provider.invoke(messages)
+
+        key = self.cache_key(messages)
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Erro ao consultar cache de respostas do LLM: {e}")
+            cached = None
+
+        if cached is not None:
+            self.stats["hits"] += 1
+            return messages_from_dict(cached)[0]
+
+        self.stats["misses"] += 1
+        response = await self.provider.invoke(messages)
+
+        if isinstance(response, BaseMessage):
+            try:
+                await self.backend.set(key, messages_to_dict([response]), self.ttl)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Erro ao salvar resposta do LLM no cache: {e}")
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate e estatísticas do backend"""
+        stats = self.stats.copy()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] / lookups * 100) if lookups else 0.0
+        stats["backend"] = self.backend.get_stats()
+        return stats
+
+    def get_model_info(self) -> Dict[str, Any]:
+        info = self.provider.get_model_info()
+        info["response_cache"] = self.get_stats()
+        return info
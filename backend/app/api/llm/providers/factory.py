@@ -1,24 +1,51 @@
 # backend/app/api/llm/providers/factory.py
 
 import os
-from typing import Dict, Type
+import logging
+import importlib
+from typing import Dict, List, Type, Union
 from .base_provider import BaseLLMProvider
-from .gemini_provider import GeminiProvider
-from .openai_provider import OpenAIProvider
-from .lmstudio_provider import LMStudioProvider
-from .groq_provider import GroqProvider
+from .cached_provider import CachingProvider, InMemoryResponseCache, RedisResponseCache
+from .hedged_provider import HedgedProvider
+
+logger = logging.getLogger(__name__)
 
 
 class LLMProviderFactory:
     """Factory para criar instâncias de provedores de LLM"""
     
-    _providers: Dict[str, Type[BaseLLMProvider]] = {
-        "gemini": GeminiProvider,
-        "openai": OpenAIProvider,
-        "lmstudio": LMStudioProvider,
-        "groq": GroqProvider
+    # Resolvidos por nome no primeiro uso: só o SDK do provedor escolhido é importado
+    _providers: Dict[str, Union[str, Type[BaseLLMProvider]]] = {
+        "gemini": "gemini_provider.GeminiProvider",
+        "openai": "openai_provider.OpenAIProvider",
+        "lmstudio": "lmstudio_provider.LMStudioProvider",
+        "groq": "groq_provider.GroqProvider"
     }
     
+    @classmethod
+    def get_provider_class(cls, provider_name: str) -> Type[BaseLLMProvider]:
+        """
+        Importa (na primeira vez) e retorna a classe do provedor.
+        
+        Args:
+            provider_name: Nome registrado do provedor
+        
+        Returns:
+            Classe do provedor
+        
+        Raises:
+            ValueError: Se o pacote do SDK do provedor não estiver instalado
+        """
+        provider_class = cls._providers[provider_name]
+        if isinstance(provider_class, str):
+            module_name, class_name = provider_class.rsplit(".", 1)
+            try:
+                module = importlib.import_module(f".{module_name}", __package__)
+            except ImportError as e:
+                raise ValueError(f"Provedor '{provider_name}' indisponível: {e}") from e
+            provider_class = cls._providers[provider_name] = getattr(module, class_name)
+        return provider_class
+    
     @classmethod
     def create_provider(cls, provider_name: str = None, **kwargs) -> BaseLLMProvider:
         """
@@ -53,7 +80,13 @@ class LLMProviderFactory:
         if "temperature" not in kwargs:
             kwargs["temperature"] = float(os.getenv("LLM_TEMPERATURE", "0.7"))
         
-        provider_class = cls._providers[provider_name]
+        # Limites por provedor, ex.: GROQ_REQUESTS_PER_MINUTE=30, GROQ_TOKENS_PER_MINUTE=6000
+        for limit in ("requests_per_minute", "tokens_per_minute"):
+            env_value = os.getenv(f"{provider_name.upper()}_{limit.upper()}")
+            if limit not in kwargs and env_value:
+                kwargs[limit] = float(env_value)
+        
+        provider_class = cls.get_provider_class(provider_name)
         return provider_class(**kwargs)
     
     @classmethod
@@ -76,9 +109,89 @@ class LLMProviderFactory:
         return list(cls._providers.keys())
     
     @classmethod
-    def create_from_env(cls) -> BaseLLMProvider:
+    def create_chain(cls, provider_names: List[str], **hedge_kwargs) -> BaseLLMProvider:
+        """
+        Cria uma cadeia de provedores com hedging e fallback.
+        
+        Args:
+            provider_names: Nomes dos provedores em ordem de preferência
+            **hedge_kwargs: Argumentos repassados ao HedgedProvider
+        
+        Returns:
+            HedgedProvider, ou o próprio provedor se só um estiver disponível
+        """
+        providers = []
+        for name in provider_names:
+            try:
+                providers.append(cls.create_provider(name))
+            except ValueError as e:
+                # Ex.: chave de API ausente — a cadeia segue com os demais
+                logger.warning(f"Provedor '{name}' ignorado na cadeia: {e}")
+        
+        if not providers:
+            raise ValueError(f"Nenhum provedor da cadeia pôde ser criado: {provider_names}")
+        if len(providers) == 1:
+            return providers[0]
+        return HedgedProvider(providers, **hedge_kwargs)
+    
+    @classmethod
+    def wrap_with_cache(cls,
+                        provider: BaseLLMProvider,
+                        backend: str = "memory",
+                        redis_client=None,
+                        ttl: int = 3600,
+                        max_temperature: float = 0.3) -> BaseLLMProvider:
+        """
+        Envolve um provedor com o cache de respostas idênticas.
+        
+        Args:
+            provider: Provedor a ser envolvido
+            backend: "memory" (LRU do processo) ou "redis"
+            redis_client: Cliente Redis assíncrono (obrigatório para "redis")
+            ttl: Tempo de vida das respostas em segundos
+            max_temperature: Acima dessa temperatura o cache é ignorado
+        
+        Returns:
+            Provedor com cache
+        """
+        if backend == "redis":
+            if redis_client is None:
+                raise ValueError("Cache de respostas no Redis requer redis_client")
+            cache_backend = RedisResponseCache(redis_client)
+        elif backend == "memory":
+            cache_backend = InMemoryResponseCache(ttl_seconds=ttl)
+        else:
+            raise ValueError(f"Backend de cache '{backend}' inválido. Use 'memory' ou 'redis'")
+        
+        return CachingProvider(provider, cache_backend, ttl=ttl, max_temperature=max_temperature)
+    
+    @classmethod
+    def create_from_env(cls, redis_client=None) -> BaseLLMProvider:
         """
         Cria um provedor baseado inteiramente nas variáveis de ambiente.
         Conveniente para usar em produção.
+        
+        LLM_PROVIDER_CHAIN=groq,gemini ativa hedging/fallback entre provedores e
+        LLM_RESPONSE_CACHE=memory|redis ativa o cache de respostas idênticas.
         """
-        return cls.create_provider()
\ No newline at end of file
+        chain = [name.strip() for name in os.getenv("LLM_PROVIDER_CHAIN", "").split(",") if name.strip()]
+        if chain:
+            provider = cls.create_chain(
+                chain,
+                default_hedge_delay=float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "2.0")),
+                hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+            )
+        else:
+            provider = cls.create_provider()
+        
+        cache_backend = os.getenv("LLM_RESPONSE_CACHE", "").lower()
+        if cache_backend and cache_backend != "off":
+            provider = cls.wrap_with_cache(
+                provider,
+                backend=cache_backend,
+                redis_client=redis_client,
+                ttl=int(os.getenv("LLM_RESPONSE_CACHE_TTL", 3600)),
+                max_temperature=float(os.getenv("LLM_RESPONSE_CACHE_MAX_TEMPERATURE", "0.3")),
+            )
+        
+        return provider
\ No newline at end of file
@@ -46,7 +46,9 @@ class GeminiProvider(BaseLLMProvider):
         if not self._llm_with_tools:
             raise RuntimeError("LLM não foi inicializado. Chame bind_tools() primeiro.")
         
-        return await self._llm_with_tools.ainvoke(messages)
+        return await self._invoke_with_limits(
+            messages, lambda: self._get_bound_llm().ainvoke(messages)
+        )
     
     @property
     def provider_name(self) -> str:
@@ -0,0 +1,167 @@
+# backend/app/api/llm/providers/hedged_provider.py
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.messages import BaseMessage
+from langchain_core.tools import BaseTool
+
+from .base_provider import BaseLLMProvider
+
+logger = logging.getLogger(__name__)
+
+
+class HedgedProvider(BaseLLMProvider):
+    """
+    Cadeia ordenada de providers com requisições "hedged" e fallback.
+
+    A chamada vai para o primeiro provider; se ele passar do p95 recente de
+    latência, uma segunda requisição é disparada para o próximo da lista e
+    vale a resposta que chegar primeiro (a outra é cancelada). Em caso de
+    erro a chamada cai imediatamente para o próximo provider.
+    """
+
+    def __init__(self,
+                 providers: List[BaseLLMProvider],
+                 default_hedge_delay: float = 2.0,
+                 min_hedge_delay: float = 0.05,
+                 max_hedge_delay: float = 10.0,
+                 hedge_percentile: float = 95.0,
+                 min_samples: int = 20,
+                 window_size: int = 200,
+                 max_parallel: int = 2):
+        if not providers:
+            raise ValueError("HedgedProvider precisa de pelo menos um provider")
+
+        primary = providers[0]
+        super().__init__(primary.model_name, primary.temperature)
+        self.providers = providers
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.max_parallel = max_parallel
+
+        self._latencies = [deque(maxlen=window_size) for _ in providers]
+        self.stats = {"requests": 0, "hedges": 0, "fallbacks": 0, "failures": 0}
+        self.provider_stats = [
+            {"calls": 0, "wins": 0, "errors": 0, "cancelled": 0, "censored": 0} for _ in providers
+        ]
+
+    def _initialize_llm(self, tools: List[BaseTool]) -> Any:
+        return self.providers[0]._initialize_llm(tools)
+
+    def bind_tools(self, tools: List[BaseTool]):
+        """Vincula as ferramentas em todos os providers da cadeia"""
+        for provider in self.providers:
+            provider.bind_tools(tools)
+        self._llm_with_tools = self.providers[0]._llm_with_tools
+        return self
+
+    @property
+    def provider_name(self) -> str:
+        return "hedged"
+
+    def hedge_delay(self, index: int) -> float:
+        """Tempo de espera antes de disparar a próxima requisição"""
+        latencies = self._latencies[index]
+        if len(latencies) < self.min_samples:
+            return self.default_hedge_delay
+        delay = float(np.percentile(latencies, self.hedge_percentile))
+        return min(max(delay, self.min_hedge_delay), self.max_hedge_delay)
+
+    async def _call(self, index: int, messages: List[BaseMessage]) -> Any:
+        self.provider_stats[index]["calls"] += 1
+        started = time.perf_counter()
+        try:
+            response = await self.providers[index].invoke(messages)
+        except asyncio.CancelledError:
+            # Amostra censurada: a latência real é pelo menos o tempo decorrido.
+            # Sem ela, só as respostas rápidas entrariam na janela e o p95 cairia.
+            self._latencies[index].append(time.perf_counter() - started)
+            self.provider_stats[index]["censored"] += 1
+            raise
+        self._latencies[index].append(time.perf_counter() - started)
+        return response
+
+    async def invoke(self, messages: List[BaseMessage]) -> Any:
+        """Invoca a cadeia e retorna a primeira resposta bem-sucedida"""
+        self.stats["requests"] += 1
+        pending: Dict[asyncio.Task, int] = {}
+        next_index = 0
+        last_error: Optional[Exception] = None
+
+        def launch():
+            nonlocal next_index
+            task = asyncio.create_task(self._call(next_index, messages))
+            pending[task] = next_index
+            next_index += 1
+
+        launch()
+        try:
+            while pending:
+                can_hedge = next_index < len(self.providers) and len(pending) < self.max_parallel
+                timeout = self.hedge_delay(next_index - 1) if can_hedge else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    self.stats["hedges"] += 1
+                    logger.info(f"Hedge: {self.providers[next_index - 1].provider_name} passou de "
+                                f"{timeout:.2f}s, disparando {self.providers[next_index].provider_name}")
+                    launch()
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        self.provider_stats[index]["wins"] += 1
+                        return task.result()
+
+                    last_error = error
+                    self.provider_stats[index]["errors"] += 1
+                    logger.warning(f"Provider {self.providers[index].provider_name} falhou: {error}")
+
+                if not pending and next_index < len(self.providers):
+                    self.stats["fallbacks"] += 1
+                    launch()
+        finally:
+            # Cancela a requisição perdedora (ou todas, se o chamador foi cancelado)
+            for task, index in pending.items():
+                task.cancel()
+                self.provider_stats[index]["cancelled"] += 1
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        self.stats["failures"] += 1
+        raise last_error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Vitórias, erros e latência por provider"""
+        providers = []
+        for index, provider in enumerate(self.providers):
+            latencies = self._latencies[index]
+            stats = {"provider": provider.provider_name, "model": provider.model_name,
+                     **self.provider_stats[index]}
+            if latencies:
+                p50, p95 = np.percentile(latencies, [50, 95])
+                stats.update({"latency_p50": float(p50), "latency_p95": float(p95)})
+            stats["hedge_delay"] = self.hedge_delay(index)
+            providers.append(stats)
+        return {**self.stats, "providers": providers}
+
+    def get_model_info(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider_name,
+            "model": self.model_name,
+            "temperature": self.temperature,
+            "chain": [provider.get_model_info() for provider in self.providers],
+            "hedging": self.get_stats(),
+        }
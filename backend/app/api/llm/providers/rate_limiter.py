@@ -0,0 +1,211 @@
+# backend/app/api/llm/providers/rate_limiter.py
+
+import asyncio
+import email.utils
+import logging
+import re
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.messages import BaseMessage
+
+logger = logging.getLogger(__name__)
+
+# "Please retry in 12.5s" (Gemini/Groq) e "retry_delay { seconds: 12 }" (google.api_core)
+_RETRY_IN_RE = re.compile(r"retry (?:again )?in ([\d.]+)\s*(ms|s)", re.IGNORECASE)
+_RETRY_DELAY_RE = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE)
+_STATUS_429_RE = re.compile(r"\b429\b")
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """Estimativa rápida de tokens do prompt (~4 caracteres por token)"""
+    chars = sum(len(str(message.content)) for message in messages)
+    return chars // 4 + 4 * len(messages)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    for candidate in (error, getattr(error, "response", None)):
+        code = getattr(candidate, "status_code", None) or getattr(candidate, "code", None)
+        if isinstance(code, int):
+            return code
+        if callable(code):
+            try:
+                return int(code())
+            except Exception:
+                pass
+    return None
+
+
+def parse_retry_after(error: Exception) -> Optional[float]:
+    """
+    Identifica um erro 429 e extrai o tempo de espera sugerido
+
+    Args:
+        error: Exceção levantada pelo SDK do provedor
+
+    Returns:
+        Segundos a esperar (0.0 se o 429 não trouxer dica) ou None se não for 429
+    """
+    message = str(error)
+    is_rate_limit = (
+        _status_code(error) == 429
+        or "RateLimit" in type(error).__name__
+        or "ResourceExhausted" in type(error).__name__
+        or _STATUS_429_RE.search(message) is not None
+        or "RESOURCE_EXHAUSTED" in message
+    )
+    if not is_rate_limit:
+        return None
+
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if headers.get("retry-after"):
+        value = headers["retry-after"]
+        try:
+            return float(value)
+        except ValueError:
+            parsed = email.utils.parsedate_to_datetime(value)
+            if parsed is not None:
+                return max(0.0, parsed.timestamp() - time.time())
+
+    match = _RETRY_IN_RE.search(message)
+    if match:
+        seconds = float(match.group(1))
+        return seconds / 1000 if match.group(2).lower() == "ms" else seconds
+    match = _RETRY_DELAY_RE.search(message)
+    if match:
+        return float(match.group(1))
+    return 0.0
+
+
+class TokenBucket:
+    """Balde de tokens com reposição contínua (capacidade = limite por minuto)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.refill_per_second = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Segundos até haver `amount` tokens disponíveis"""
+        self._refill(now)
+        deficit = min(amount, self.capacity) - self.tokens
+        return max(0.0, deficit / self.refill_per_second)
+
+    def consume(self, amount: float):
+        # Pode ficar negativo ao corrigir pelo uso real: atrasa as próximas chamadas
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    Limite de requisições/min e tokens/min no lado do cliente.
+
+    As chamadas esperam numa fila FIFO (asyncio.Lock atende em ordem de
+    chegada) até os dois baldes terem saldo, então uma rajada é espalhada
+    no tempo em vez de gerar 429 em cascata. Um 429 bloqueia a fila pelo
+    tempo indicado pelo provedor.
+    """
+
+    def __init__(self,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 completion_reserve: int = 256,
+                 max_retries: int = 2,
+                 window_size: int = 500):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.completion_reserve = completion_reserve
+        self.max_retries = max_retries
+
+        self._lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self._waits = deque(maxlen=window_size)
+
+        self.stats = {
+            "requests": 0,
+            "queued": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "max_queue_depth": 0,
+            "rate_limited_429": 0,
+            "retry_after_seconds": 0.0,
+        }
+
+    async def acquire(self, tokens: int) -> float:
+        """
+        Aguarda a vez na fila e debita os baldes
+
+        Args:
+            tokens: Tokens estimados da chamada (prompt + reserva da resposta)
+
+        Returns:
+            Tempo de espera na fila, em segundos
+        """
+        started = time.monotonic()
+        self._waiting += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._waiting)
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    wait = self._blocked_until - now
+                    if self.requests:
+                        wait = max(wait, self.requests.time_until(1, now))
+                    if self.tokens:
+                        wait = max(wait, self.tokens.time_until(tokens, now))
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+
+                if self.requests:
+                    self.requests.consume(1)
+                if self.tokens:
+                    self.tokens.consume(tokens)
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - started
+        self.stats["requests"] += 1
+        if waited > 0.001:
+            self.stats["queued"] += 1
+        self.stats["total_wait_seconds"] += waited
+        self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+        self._waits.append(waited)
+        return waited
+
+    def reconcile(self, estimated: int, actual: int):
+        """Corrige o balde de tokens com o uso real informado pelo provedor"""
+        if self.tokens and actual:
+            self.tokens.consume(actual - estimated)
+
+    def penalize(self, retry_after: float):
+        """Bloqueia a fila após um 429"""
+        self.stats["rate_limited_429"] += 1
+        self.stats["retry_after_seconds"] += retry_after
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        logger.warning(f"429 recebido; fila bloqueada por {retry_after:.2f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tempo de espera na fila (médio, p95, máximo) e 429 recebidos"""
+        stats = self.stats.copy()
+        stats["queue_depth"] = self._waiting
+        stats["requests_per_minute"] = self.requests.capacity if self.requests else None
+        stats["tokens_per_minute"] = self.tokens.capacity if self.tokens else None
+        stats["avg_wait_seconds"] = (
+            stats["total_wait_seconds"] / stats["requests"] if stats["requests"] else 0.0
+        )
+        stats["p95_wait_seconds"] = float(np.percentile(self._waits, 95)) if self._waits else 0.0
+        return stats
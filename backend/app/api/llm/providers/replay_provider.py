@@ -0,0 +1,278 @@
+# backend/app/api/llm/providers/replay_provider.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.messages import (
+    AIMessageChunk,
+    BaseMessage,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.tools import BaseTool
+
+from .base_provider import BaseLLMProvider
+from .tool_subset import active_tool_subset
+from .cached_provider import message_fingerprint
+from .factory import LLMProviderFactory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CASSETTE_PATH = "data/cassettes/chat.json"
+
+
+class ReplayProvider(BaseLLMProvider):
+    """
+    Provider de gravação/reprodução para testes de performance offline.
+
+    Em modo "record" envolve um provider real e grava mensagens, tool calls,
+    respostas e latência num cassete JSON. Em modo "replay" serve as
+    respostas gravadas sem rede, com latência simulada opcional
+    (`latency_scale` x latência gravada, ou `fixed_latency`).
+
+    A chave de cada interação é o hash das mensagens (tipo, conteúdo e tool
+    calls) e dos nomes das ferramentas vinculadas; a mesma chave gravada
+    várias vezes é reproduzida na ordem de gravação.
+    """
+
+    CASSETTE_VERSION = 1
+
+    def __init__(self,
+                 model_name: str = None,
+                 temperature: float = 0.0,
+                 cassette_path: str = None,
+                 mode: str = None,
+                 provider: Optional[BaseLLMProvider] = None,
+                 latency_scale: float = None,
+                 fixed_latency: float = None,
+                 **kwargs):
+        self.cassette_path = cassette_path or os.getenv("REPLAY_CASSETTE", DEFAULT_CASSETTE_PATH)
+        self.mode = (mode or os.getenv("REPLAY_MODE", "replay")).lower()
+        if self.mode not in ("record", "replay"):
+            raise ValueError(f"Modo '{self.mode}' inválido. Use 'record' ou 'replay'")
+
+        if latency_scale is None:
+            latency_scale = float(os.getenv("REPLAY_LATENCY_SCALE", "0"))
+        self.latency_scale = latency_scale
+        self.fixed_latency = fixed_latency
+
+        self.provider = provider
+        if self.mode == "record" and self.provider is None:
+            target = os.getenv("REPLAY_TARGET_PROVIDER")
+            if not target or target.lower() == "replay":
+                raise ValueError("REPLAY_TARGET_PROVIDER deve indicar o provider real a ser gravado")
+            self.provider = LLMProviderFactory.create_provider(target, temperature=temperature)
+
+        self._interactions: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self._tool_names: List[str] = []
+        self._load()
+
+        if self.provider is not None:
+            model_name = model_name or self.provider.model_name
+        super().__init__(model_name or self._meta.get("model", "replay"), temperature, **kwargs)
+
+        self.stats = {"replayed": 0, "recorded": 0, "misses": 0, "simulated_latency_seconds": 0.0}
+
+    # ------------------------------------------
+    # Cassete
+    # ------------------------------------------
+
+    def _load(self):
+        self._meta: Dict[str, Any] = {}
+        if not os.path.exists(self.cassette_path):
+            if self.mode == "replay":
+                raise FileNotFoundError(f"Cassete não encontrado: {self.cassette_path}")
+            return
+
+        with open(self.cassette_path, encoding="utf-8") as f:
+            cassette = json.load(f)
+        self._meta = cassette.get("meta", {})
+        for interaction in cassette.get("interactions", []):
+            self._add(interaction)
+        logger.info(f"Cassete carregado: {len(self._interactions)} interações de {self.cassette_path}")
+
+    def _add(self, interaction: Dict[str, Any]):
+        self._interactions.append(interaction)
+        self._by_key[interaction["key"]].append(interaction)
+
+    def _save(self):
+        """Grava o cassete de forma atômica"""
+        directory = os.path.dirname(self.cassette_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        meta = {
+            "version": self.CASSETTE_VERSION,
+            "provider": self.provider.provider_name if self.provider else self._meta.get("provider"),
+            "model": self.model_name,
+        }
+        tmp_path = self.cassette_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "interactions": self._interactions}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.cassette_path)
+
+    def _active_tool_names(self) -> List[str]:
+        subset = active_tool_subset()
+        if subset is None:
+            return self._tool_names
+        return [name for name in self._tool_names if name in subset]
+
+    def interaction_key(self, messages: List[BaseMessage]) -> str:
+        payload = json.dumps(
+            {"tools": self._active_tool_names(), "messages": [message_fingerprint(m) for m in messages]},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _next_interaction(self, messages: List[BaseMessage]) -> Dict[str, Any]:
+        key = self.interaction_key(messages)
+        recorded = self._by_key.get(key)
+        if not recorded:
+            self.stats["misses"] += 1
+            last = messages[-1].content if messages else ""
+            raise RuntimeError(
+                f"Interação não gravada no cassete {self.cassette_path} "
+                f"(última mensagem: {str(last)[:80]!r}). Grave de novo com REPLAY_MODE=record."
+            )
+        # Repetições da mesma chave seguem a ordem de gravação; depois, a última se repete
+        index = min(self._cursor[key], len(recorded) - 1)
+        self._cursor[key] += 1
+        return recorded[index]
+
+    async def _simulate_latency(self, recorded_seconds: float):
+        delay = self.fixed_latency if self.fixed_latency is not None else recorded_seconds * self.latency_scale
+        if delay > 0:
+            self.stats["simulated_latency_seconds"] += delay
+            await asyncio.sleep(delay)
+
+    def _record(self, messages: List[BaseMessage], response: BaseMessage,
+                latency: float, chunks: Optional[List[Dict[str, Any]]] = None):
+        interaction = {
+            "key": self.interaction_key(messages),
+            "tools": self._active_tool_names(),
+            "messages": [message_fingerprint(m) for m in messages],
+            "response": message_to_dict(response),
+            "latency": latency,
+        }
+        if chunks is not None:
+            interaction["chunks"] = chunks
+        self._add(interaction)
+        self._save()
+        self.stats["recorded"] += 1
+
+    # ------------------------------------------
+    # Interface do provider
+    # ------------------------------------------
+
+    def _initialize_llm(self, tools: List[BaseTool]) -> Any:
+        if self.provider is not None:
+            return self.provider._initialize_llm(tools)
+        return self
+
+    def bind_tools(self, tools: List[BaseTool]):
+        """Registra as ferramentas (e as vincula no provider real ao gravar)"""
+        self._tool_names = sorted(getattr(tool, "name", str(tool)) for tool in tools or [])
+        if self.provider is not None:
+            self.provider.bind_tools(tools)
+            self._llm_with_tools = self.provider._llm_with_tools
+        else:
+            self._llm_with_tools = self
+        return self
+
+    async def invoke(self, messages: List[BaseMessage]) -> Any:
+        """Reproduz a resposta gravada ou grava a resposta do provider real"""
+        if self.mode == "record":
+            started = time.perf_counter()
+            response = await self.provider.invoke(messages)
+            self._record(messages, response, time.perf_counter() - started)
+            return response
+
+        interaction = self._next_interaction(messages)
+        await self._simulate_latency(interaction.get("latency", 0.0))
+        self.stats["replayed"] += 1
+        return messages_from_dict([interaction["response"]])[0]
+
+    async def ping(self):
+        """Reprodução não usa rede; gravando, pinga o provider real"""
+        if self.mode == "record":
+            await super().ping()
+
+    async def astream(self, messages: List[BaseMessage]) -> AsyncIterator[AIMessageChunk]:
+        """
+        Streaming: grava os chunks do provider real (se o modelo suportar) e
+        os reproduz com os intervalos gravados. Interações gravadas sem
+        streaming são entregues como um único chunk.
+        """
+        if self.mode == "record":
+            llm = self.provider._get_bound_llm()
+            if llm is None or not hasattr(llm, "astream"):
+                response = await self.invoke(messages)
+                yield AIMessageChunk(content=response.content,
+                                     tool_call_chunks=self._tool_call_chunks(response))
+                return
+
+            started = time.perf_counter()
+            chunks, final = [], None
+            async for chunk in llm.astream(messages):
+                chunks.append({"content": chunk.content, "offset": time.perf_counter() - started})
+                final = chunk if final is None else final + chunk
+                yield chunk
+            if final is not None:
+                self._record(messages, final, time.perf_counter() - started, chunks)
+            return
+
+        interaction = self._next_interaction(messages)
+        self.stats["replayed"] += 1
+        response = messages_from_dict([interaction["response"]])[0]
+        chunks = interaction.get("chunks")
+        if not chunks:
+            await self._simulate_latency(interaction.get("latency", 0.0))
+            yield AIMessageChunk(content=response.content,
+                                 tool_call_chunks=self._tool_call_chunks(response))
+            return
+
+        previous = 0.0
+        for index, chunk in enumerate(chunks):
+            await self._simulate_latency(chunk["offset"] - previous)
+            previous = chunk["offset"]
+            is_last = index == len(chunks) - 1
+            yield AIMessageChunk(
+                content=chunk["content"],
+                tool_call_chunks=self._tool_call_chunks(response) if is_last else [],
+            )
+
+    @staticmethod
+    def _tool_call_chunks(response: BaseMessage) -> List[Dict[str, Any]]:
+        return [
+            {"name": call["name"], "args": json.dumps(call["args"]), "id": call.get("id"), "index": index}
+            for index, call in enumerate(getattr(response, "tool_calls", None) or [])
+        ]
+
+    @property
+    def provider_name(self) -> str:
+        return "replay"
+
+    def get_model_info(self) -> Dict[str, Any]:
+        info = super().get_model_info()
+        info.update({
+            "mode": self.mode,
+            "cassette": self.cassette_path,
+            "interactions": len(self._interactions),
+            "recorded_provider": self._meta.get("provider") or (
+                self.provider.provider_name if self.provider else None
+            ),
+            "replay_stats": self.stats.copy(),
+        })
+        return info
+
+
+LLMProviderFactory.register_provider("replay", ReplayProvider)
@@ -0,0 +1,30 @@
+# backend/app/api/llm/providers/tool_subset.py
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import FrozenSet, Iterable, Iterator, Optional
+
+# Subconjunto de ferramentas da requisição atual (None = todas as vinculadas).
+# Fica num ContextVar para valer só na task da requisição, inclusive dentro
+# de decoradores (cache, hedge, replay) que repassam a chamada.
+_active_tools: ContextVar[Optional[FrozenSet[str]]] = ContextVar("active_tools", default=None)
+
+
+def active_tool_subset() -> Optional[FrozenSet[str]]:
+    """Nomes das ferramentas ativas nesta requisição (None = todas)"""
+    return _active_tools.get()
+
+
+@contextmanager
+def tool_subset(names: Optional[Iterable[str]]) -> Iterator[None]:
+    """
+    Restringe as ferramentas enviadas ao modelo dentro do bloco
+
+    Args:
+        names: Nomes das ferramentas; None mantém todas
+    """
+    token = _active_tools.set(frozenset(names) if names is not None else None)
+    try:
+        yield
+    finally:
+        _active_tools.reset(token)
@@ -2,8 +2,21 @@
 
 from .rag_service import RAGService
 from .conversation_service import ConversationService
+from .answer_cache import AnswerCache
+from .neo4j_schema import Neo4jSchemaManager
+from .prompt_budget import PromptBudget, TokenEstimator
+from .response_templates import ResponseTemplateRegistry
+from .intent_router import IntentRouter
+from .tool_selector import ToolSelector
 
 __all__ = [
     "RAGService",
-    "ConversationService"
+    "ConversationService",
+    "AnswerCache",
+    "Neo4jSchemaManager",
+    "PromptBudget",
+    "TokenEstimator",
+    "ResponseTemplateRegistry",
+    "IntentRouter",
+    "ToolSelector"
 ]
\ No newline at end of file
@@ -0,0 +1,216 @@
+# backend/app/api/llm/services/answer_cache.py
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+import numpy as np
+import redis.asyncio as redis
+
+from app.utils.embeddings import HashingEmbedder, TOKEN_RE, normalize_text
+from ..cache.codec import CacheCodec
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_TENANT = "global"
+DATA_VERSION_PREFIX = "data_version"
+
+# Palavras que podem diferir entre perguntas quase idênticas. Qualquer outra
+# (números, datas, meses, ids, categorias) tem de ser igual: "transação 12" e
+# "transação 13" têm embeddings parecidos e respostas diferentes.
+FILLER_WORDS = frozenset({
+    "a", "o", "as", "os", "um", "uma", "de", "do", "da", "dos", "das", "no", "na", "nos", "nas",
+    "em", "com", "para", "pra", "por", "e", "que", "qual", "quais", "foi", "foram", "eh", "sao",
+    "eu", "meu", "minha", "meus", "minhas", "me", "este", "esta", "deste", "desta", "neste", "nesta",
+    "esse", "essa", "desse", "dessa", "nesse", "nessa", "favor", "voce", "ai", "entao",
+})
+
+
+async def bump_data_version(redis_client: redis.Redis, tenant_id: Optional[str] = None):
+    """
+    Invalida as respostas em cache de um tenant incrementando sua versão de dados
+
+    Args:
+        redis_client: Cliente Redis assíncrono
+        tenant_id: Tenant cujos dados mudaram. Sem tenant (dados sem dono),
+                   invalida todos os tenants através da versão global.
+    """
+    tenant = str(tenant_id) if tenant_id is not None else GLOBAL_TENANT
+    try:
+        await redis_client.incr(f"{DATA_VERSION_PREFIX}:{tenant}")
+        logger.info(f"Versão de dados incrementada para o tenant '{tenant}'")
+    except Exception as e:
+        logger.warning(f"Erro ao invalidar cache de respostas: {e}")
+
+
+class AnswerCache:
+    """
+    Cache de respostas do chat por tenant.
+
+    A chave combina a pergunta normalizada com a versão dos dados do tenant
+    (e a versão global), então qualquer alteração de transações torna as
+    entradas antigas inalcançáveis sem precisar apagá-las. Opcionalmente,
+    perguntas quase idênticas são resolvidas por similaridade de embeddings.
+    """
+
+    KEY_PREFIX = "answer"
+
+    def __init__(self,
+                 redis_client: redis.Redis,
+                 ttl: int = 900,
+                 similarity_threshold: Optional[float] = None,
+                 embedder: HashingEmbedder = None,
+                 max_recent_per_tenant: int = 200,
+                 codec: CacheCodec = None):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder or HashingEmbedder()
+        self.max_recent_per_tenant = max_recent_per_tenant
+        self.codec = codec or CacheCodec()
+
+        # Perguntas recentes por tenant: chave de cache -> (embedding, palavras de conteúdo)
+        self._recent: Dict[str, "OrderedDict[str, Tuple[np.ndarray, FrozenSet[str]]]"] = {}
+
+        self.stats = {
+            "hits": 0,
+            "near_duplicate_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "errors": 0,
+            "saved_latency_seconds": 0.0,
+        }
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """Normaliza a pergunta (caixa, acentos, pontuação e espaços)"""
+        return " ".join(TOKEN_RE.findall(normalize_text(question)))
+
+    async def _data_version(self, tenant_id: str) -> str:
+        """Versão dos dados visível para o tenant ("global.tenant")"""
+        global_version, tenant_version = await self.redis_client.mget(
+            f"{DATA_VERSION_PREFIX}:{GLOBAL_TENANT}",
+            f"{DATA_VERSION_PREFIX}:{tenant_id}",
+        )
+        return f"{int(global_version or 0)}.{int(tenant_version or 0)}"
+
+    @staticmethod
+    def content_words(normalized: str) -> FrozenSet[str]:
+        """Palavras que precisam coincidir para aceitar uma pergunta similar"""
+        return frozenset(normalized.split()) - FILLER_WORDS
+
+    def _key(self, tenant_id: str, version: str, normalized: str) -> str:
+        digest = hashlib.sha256(normalized.encode()).hexdigest()
+        return f"{self.KEY_PREFIX}:{tenant_id}:{version}:{digest}"
+
+    def _find_near_duplicate(self, tenant_id: str, version: str, normalized: str) -> Optional[str]:
+        """Procura a pergunta recente mais parecida, com a mesma versão de dados e as mesmas palavras de conteúdo"""
+        recent = self._recent.get(tenant_id)
+        if not recent or self.similarity_threshold is None:
+            return None
+        vector = self.embedder.embed(normalized)
+        if not np.any(vector):
+            return None
+
+        prefix = f"{self.KEY_PREFIX}:{tenant_id}:{version}:"
+        words = self.content_words(normalized)
+        best_key, best_score = None, self.similarity_threshold
+        for key, (cached_vector, cached_words) in recent.items():
+            if not key.startswith(prefix) or cached_words != words:
+                continue
+            score = float(cached_vector @ vector)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def _remember(self, tenant_id: str, key: str, normalized: str):
+        recent = self._recent.setdefault(tenant_id, OrderedDict())
+        recent[key] = (self.embedder.embed(normalized), self.content_words(normalized))
+        recent.move_to_end(key)
+        while len(recent) > self.max_recent_per_tenant:
+            recent.popitem(last=False)
+
+    async def get(self, tenant_id: str, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca uma resposta em cache
+
+        Args:
+            tenant_id: Tenant (usuário) dono da conversa
+            question: Pergunta original
+
+        Returns:
+            Dicionário com response/context ou None em caso de miss
+        """
+        tenant_id = str(tenant_id)
+        normalized = self.normalize_question(question)
+        try:
+            version = await self._data_version(tenant_id)
+            key = self._key(tenant_id, version, normalized)
+            payload = await self.redis_client.get(key)
+            near_duplicate = False
+
+            if payload is None and self.similarity_threshold is not None:
+                similar_key = self._find_near_duplicate(tenant_id, version, normalized)
+                if similar_key:
+                    payload = await self.redis_client.get(similar_key)
+                    near_duplicate = payload is not None
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Erro ao consultar cache de respostas: {e}")
+            return None
+
+        if payload is None:
+            self.stats["misses"] += 1
+            return None
+
+        entry = self.codec.decode(payload)
+        self.stats["hits"] += 1
+        if near_duplicate:
+            self.stats["near_duplicate_hits"] += 1
+        self.stats["saved_latency_seconds"] += entry.get("latency", 0.0)
+        logger.info(f"Resposta servida do cache ({'similar' if near_duplicate else 'exata'}) "
+                    f"para o tenant {tenant_id}")
+        return entry
+
+    async def set(self, tenant_id: str, question: str, response: str, context: str, latency: float):
+        """
+        Armazena a resposta gerada pelo pipeline completo
+
+        Args:
+            tenant_id: Tenant (usuário) dono da conversa
+            question: Pergunta original
+            response: Resposta final
+            context: Contexto RAG usado
+            latency: Tempo gasto pelo pipeline (contabilizado como economia nos hits)
+        """
+        tenant_id = str(tenant_id)
+        normalized = self.normalize_question(question)
+        try:
+            version = await self._data_version(tenant_id)
+            key = self._key(tenant_id, version, normalized)
+            payload = self.codec.encode(
+                {"response": response, "context": context, "latency": latency}
+            )
+            await self.redis_client.set(key, payload, ex=self.ttl)
+            self.stats["stores"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Erro ao salvar no cache de respostas: {e}")
+            return
+
+        if self.similarity_threshold is not None:
+            self._remember(tenant_id, key, normalized)
+
+    async def invalidate(self, tenant_id: Optional[str] = None):
+        """Invalida as respostas de um tenant (ou de todos, sem tenant)"""
+        await bump_data_version(self.redis_client, tenant_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna hit rate e latência economizada"""
+        stats = self.stats.copy()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] / lookups * 100) if lookups else 0.0
+        stats["similarity_threshold"] = self.similarity_threshold
+        stats["codec"] = self.codec.get_stats()
+        return stats
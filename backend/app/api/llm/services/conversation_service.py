@@ -4,6 +4,7 @@
 
 import json
 import logging
+import time
 from typing import Optional, Tuple, List
 from sqlalchemy.orm import Session
 from langchain_core.messages import HumanMessage, ToolMessage, AIMessage
@@ -11,6 +12,13 @@ from langchain_core.messages import HumanMessage, ToolMessage, AIMessage
 from ..providers.base_provider import BaseLLMProvider
 from ..tools.functions import get_tools, set_db_session
 from .rag_service import RAGService
+from .prompt_budget import (
+    PromptBudget,
+    PRIORITY_REQUIRED,
+    PRIORITY_TOOL_OUTPUT,
+    PRIORITY_CONTEXT,
+    PRIORITY_HISTORY,
+)
 from ..multiagent.orchestrator import MultiAgentOrchestrator
 from ..multiagent.config import MultiAgentConfig
 from ..multiagent.models import ExecutionSummary
@@ -21,9 +29,16 @@ logger = logging.getLogger(__name__)
 class ConversationService:
     """Serviço principal para processamento de conversas com sistema multiagentes avançado"""
     
-    def __init__(self, llm_provider: BaseLLMProvider, rag_service: RAGService):
+    # Prioridades das mensagens iniciais: system prompt, contexto RAG, pergunta
+    INITIAL_PRIORITIES = [PRIORITY_REQUIRED, PRIORITY_CONTEXT, PRIORITY_REQUIRED]
+    
+    def __init__(self, 
+                 llm_provider: BaseLLMProvider, 
+                 rag_service: RAGService,
+                 prompt_budget: Optional[PromptBudget] = None):
         self.llm_provider = llm_provider
         self.rag_service = rag_service
+        self.prompt_budget = prompt_budget or PromptBudget.for_provider(llm_provider)
         self._tools = get_tools()
         
         # Configura sistema multiagentes
@@ -36,6 +51,10 @@ class ConversationService:
         
         # Vincula as ferramentas ao provedor LLM
         self.llm_provider.bind_tools(self._tools)
+        self.prompt_budget.measure_tools(self._tools)
+        
+        # O system prompt é estático: montado uma vez
+        self._system_prompt = self._create_system_prompt()
         
         logger.info(f"ConversationService inicializado com {len(self._tools)} ferramentas")
     
@@ -46,12 +65,9 @@ class ConversationService:
                 return tool
         return None
     
-    def _create_system_prompt(self, context: str) -> str:
-        """Cria o prompt do sistema com o contexto e informações sobre agentes"""
-        available_agents = list(self.multiagent_config.TOOL_TO_AGENT.values())
-        unique_agents = list(set(agent.value for agent in available_agents))
-        
-        return f"""
+    def _create_system_prompt(self) -> str:
+        """Cria o prompt do sistema com informações sobre agentes (o contexto vai à parte)"""
+        return """
         Você é um assistente financeiro inteligente com acesso a um sistema multiagentes especializado.
 
         SISTEMA MULTIAGENTES DISPONÍVEL:
@@ -76,11 +92,12 @@ class ConversationService:
         - Se detectar inconsistências nos resultados, mencione-as explicitamente
         - Forneça recomendações acionáveis baseadas nas análises realizadas
         - Para análises complexas, explique a metodologia utilizada pelos agentes
-
-        CONTEXTO DISPONÍVEL:
-        {context or "Nenhum contexto específico encontrado na base de conhecimento."}
         """
     
+    def _create_context_prompt(self, context: str) -> str:
+        """Bloco de contexto RAG (mensagem própria para poder ser cortado pelo orçamento)"""
+        return f"CONTEXTO DISPONÍVEL:\n{context or 'Nenhum contexto específico encontrado na base de conhecimento.'}"
+    
     async def process_conversation(
         self, 
         message: str, 
@@ -100,16 +117,21 @@ class ConversationService:
             context = await self.rag_service.get_relevant_context(message)
             logger.info(f"Contexto RAG encontrado: {len(context)} caracteres")
             
-            # 3. Cria as mensagens iniciais
-            system_prompt = self._create_system_prompt(context)
-            messages = [
-                HumanMessage(content=system_prompt),
-                HumanMessage(content=message),
-            ]
+            # 3. Cria as mensagens iniciais dentro do orçamento de tokens
+            plan = self.prompt_budget.fit(
+                [
+                    HumanMessage(content=self._system_prompt),
+                    HumanMessage(content=self._create_context_prompt(context)),
+                    HumanMessage(content=message),
+                ],
+                self.INITIAL_PRIORITIES,
+            )
+            messages = plan.messages
             
             # 4. Invoca o LLM para primeira resposta
             logger.info(f"Invocando LLM ({self.llm_provider.provider_name})")
             response = await self.llm_provider.invoke(messages)
+            self.prompt_budget.record(plan, response, "inicial")
             logger.info(f"Resposta inicial recebida: {type(response)}")
             
             final_response_text = ""
@@ -157,16 +179,24 @@ class ConversationService:
             
             # 4. Atualiza histórico de mensagens
             messages.extend([response] + tool_messages)
+            priorities = (
+                self.INITIAL_PRIORITIES
+                + [PRIORITY_REQUIRED]
+                + [PRIORITY_TOOL_OUTPUT] * len(tool_messages)
+            )
             
             # 5. Adiciona relatório de execução se relevante
             if execution_summary.failed_tasks > 0 or len(execution_summary.agents_used) > 1:
                 messages.append(
                     HumanMessage(content=f"RELATÓRIO DE EXECUÇÃO DO SISTEMA MULTIAGENTES:\n{execution_report}")
                 )
+                priorities.append(PRIORITY_HISTORY)
             
-            # 6. Solicita resposta final consolidada
+            # 6. Solicita resposta final consolidada, cortando o que passar do orçamento
             logger.info("Solicitando resposta final do LLM")
-            final_response = await self.llm_provider.invoke(messages)
+            plan = self.prompt_budget.fit(messages, priorities)
+            final_response = await self.llm_provider.invoke(plan.messages)
+            self.prompt_budget.record(plan, final_response, "final")
             
             logger.info(f"Sistema multiagentes concluído - Sucesso: {execution_summary.success_rate:.1f}%")
             
@@ -256,10 +286,16 @@ class ConversationService:
         """Retorna estatísticas do sistema multiagentes"""
         return self.orchestrator.get_statistics()
     
+    def get_prompt_stats(self) -> dict:
+        """Retorna tokens estimados/reais e cortes do orçamento de prompt"""
+        return self.prompt_budget.get_stats()
+    
     async def health_check(self) -> dict:
         """
         Verifica a saúde do serviço de conversação e sistema multiagentes
+        (sem chamar o LLM: a conexão é verificada pelo HealthProber)
         """
+        last_success = self.llm_provider.last_success_at
         status = {
             "conversation_service": "healthy",
             "llm_provider": self.llm_provider.get_model_info(),
@@ -271,20 +307,16 @@ class ConversationService:
                 "default_timeout": self.multiagent_config.DEFAULT_TIMEOUT,
                 "max_retries": self.multiagent_config.MAX_RETRIES,
                 "supported_agents": list(set(role.value for role in self.multiagent_config.TOOL_TO_AGENT.values()))
-            }
+            },
+            "llm_last_success_age": None if last_success is None else time.monotonic() - last_success,
         }
         
         try:
-            # Testa conexão LLM
-            test_messages = [HumanMessage(content="Health check test.")]
-            await self.llm_provider.invoke(test_messages)
-            status["llm_connection"] = "healthy"
-            
             # Adiciona estatísticas do multiagente
             status["multiagent_stats"] = self.get_multiagent_stats()
             
         except Exception as e:
-            status["llm_connection"] = f"error: {str(e)}"
+            status["error"] = str(e)
             status["conversation_service"] = "unhealthy"
         
         return status
\ No newline at end of file
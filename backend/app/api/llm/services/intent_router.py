@@ -0,0 +1,640 @@
+# backend/app/api/llm/services/intent_router.py
+"""
+Roteamento local das intenções mais frequentes do chat.
+
+Um conjunto de padrões compilados e um naive Bayes (NumPy) treinado com as
+perguntas históricas do Neo4j classificam a pergunta; com confiança alta e
+todos os parâmetros extraídos, a ferramenta correspondente de
+tools/functions.py é chamada direto, sem as duas idas ao LLM.
+
+Avaliação offline (acurácia de roteamento e tempo de classificação):
+
+    python -m app.api.llm.services.intent_router
+"""
+
+import argparse
+import calendar
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OTHER = "other"
+
+# Intenção -> ferramenta de tools/functions.py
+INTENT_TOOLS = {
+    "top_spending": "get_top_spending_category",
+    "balance": "get_balance",
+    "expenses_by_category": "get_transactions_by_category",
+    "add_expense": "create_transaction",
+}
+WRITE_INTENTS = frozenset({"add_expense"})
+
+MONTHS = {
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "abril": 4, "maio": 5, "junho": 6,
+    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+}
+
+# Padrões sobre o texto normalizado (minúsculo, sem acentos). A ordem importa:
+# "registre um gasto" é inclusão, não listagem. Inclusão só no imperativo (ou
+# "gastei N ...") no início da frase: "como registro uma despesa?" é pergunta.
+INTENT_PATTERNS = [
+    ("add_expense", re.compile(
+        r"^(?:por favor,?\s+)?(adicion[ae]r?|registr[ae]r?|lanc[ae]r?|lance|anot[ae]r?|inclu[ai]r?|cadastr[ae]r?"
+        r"|insir[ae]|inserir)\b.*\b(despesa|gasto)\b"
+        r"|^gastei\s+(r\$\s*)?\d")),
+    ("top_spending", re.compile(
+        r"\b(maior(es)?|mais)\s+(gasto|gastos|despesa|despesas)\b"
+        r"|\b(gastei|gastamos|gasto)\s+mais\b|\bmais\s+gastei\b")),
+    ("balance", re.compile(
+        r"\bsaldo\b|\bquanto\s+(me\s+)?sobrou\b|\bbalanco\s+(do|de|deste|desse)\b")),
+    ("expenses_by_category", re.compile(
+        r"\b(list\w*|mostr\w*|quais|ver|exib\w*)\b.*\b(despesas|gastos)\b.*\b(de|em|com|da|do|na|no|categoria)\b")),
+]
+
+# Pedidos que não são inclusão: apagar/corrigir, perguntas e negações. Com
+# qualquer um deles a escrita nunca é disparada sem o LLM.
+EDIT_VERBS_RE = re.compile(
+    r"\b(apag\w*|remov\w*|exclu\w*|delet\w*|elimin\w*|cancel\w*|corrig\w*|corrij\w*|atualiz\w*"
+    r"|alter\w*|edit\w*|mud\w*|modific\w*|troc\w*|estorn\w*)\b")
+_NOT_A_WRITE_RE = re.compile(
+    r"\?|\b(nao|nunca|jamais|se|como|ja|quanto|quando|sera|devo|posso|pode)\b")
+
+_MONTH_NAME_RE = re.compile(r"\b(" + "|".join(MONTHS) + r")\b(?:\s+(?:de\s+)?(\d{4}))?")
+_MONTH_NUMBER_RE = re.compile(r"\b(\d{1,2})/(\d{4})\b")
+_CURRENT_MONTH_RE = re.compile(r"\b(n?est[ea]|n?ess[ea]|d[ea]st[ea]|d[ea]ss[ea])\s+mes\b|\bmes\s+atual\b")
+_PREVIOUS_MONTH_RE = re.compile(r"\bmes\s+(passado|anterior)\b|\bultimo\s+mes\b")
+_CURRENT_YEAR_RE = re.compile(r"\b(n?est[ea]|n?ess[ea])\s+ano\b|\bano\s+atual\b")
+_YEAR_RE = re.compile(r"\b(?:em|de|no ano de|durante)\s+(\d{4})\b")
+_AMOUNT_RE = re.compile(
+    r"r\$\s*(\d[\d.,]*)|\b(\d[\d.,]*)\s*(?:reais|real)\b|\bgastei\s+(\d[\d.,]*)")
+_THOUSANDS_RE = re.compile(r"^\d{1,3}(\.\d{3})+$")
+_DESCRIPTION_RE = re.compile(
+    r"\bcom\s+(?:o\s+|a\s+|os\s+|as\s+)?([^\d,.;!?$]+?)(?=\s+(?:na|no|em|de|hoje|ontem|categoria)\b|[,.;!?]|$)",
+    re.IGNORECASE)
+_QUOTED_RE = re.compile(r"[\"“']([^\"”']{2,60})[\"”']")
+
+# Exemplos rotulados para treinar o modelo mesmo sem histórico no Neo4j
+SEED_EXAMPLES = [
+    ("top_spending", "Qual foi meu maior gasto em março?"),
+    ("top_spending", "Em que categoria gastei mais este mês?"),
+    ("top_spending", "Qual a categoria com maior despesa em 2024?"),
+    ("top_spending", "Onde eu mais gastei no mês passado?"),
+    ("top_spending", "Maior despesa de janeiro"),
+    ("top_spending", "Com o que eu gastei mais dinheiro em abril?"),
+    ("top_spending", "Qual categoria pesou mais no orçamento de maio?"),
+    ("balance", "Qual é o meu saldo deste mês?"),
+    ("balance", "Quanto sobrou em fevereiro?"),
+    ("balance", "Saldo de junho de 2024"),
+    ("balance", "Fiquei no positivo ou no negativo em março?"),
+    ("balance", "Balanço do mês passado"),
+    ("balance", "Quanto entrou e quanto saiu neste mês?"),
+    ("balance", "Minhas receitas menos despesas em julho"),
+    ("expenses_by_category", "Liste minhas despesas de alimentação"),
+    ("expenses_by_category", "Mostre os gastos com transporte em março"),
+    ("expenses_by_category", "Quais foram as despesas da categoria lazer?"),
+    ("expenses_by_category", "Ver gastos de saúde deste mês"),
+    ("expenses_by_category", "Quero ver tudo que gastei com moradia"),
+    ("expenses_by_category", "Despesas de educação no mês passado"),
+    ("add_expense", "Adicione uma despesa de R$ 50 em alimentação"),
+    ("add_expense", "Registre um gasto de 120 reais com transporte"),
+    ("add_expense", "Gastei 35,90 com almoço na categoria alimentação"),
+    ("add_expense", "Lance uma despesa de R$ 1.200 em moradia"),
+    ("add_expense", "Anota aí: paguei 80 reais de conta de luz em contas"),
+    ("add_expense", "Inclua um gasto de 15 reais em lazer"),
+    ("add_expense", "Paguei 200 reais na farmácia, coloca em saúde"),
+    (OTHER, "Olá, tudo bem?"),
+    (OTHER, "Quais categorias existem?"),
+    (OTHER, "Mostre os detalhes da transação 3"),
+    (OTHER, "Liste minhas receitas"),
+    (OTHER, "Análise completa das despesas do primeiro trimestre por categoria e tipo"),
+    (OTHER, "Apague a transação 10"),
+    (OTHER, "Atualize o valor da transação 7 para 30 reais"),
+    # Citam despesa, valor e categoria, mas não pedem uma inclusão
+    (OTHER, "Exclua a despesa de 30 reais em saúde"),
+    (OTHER, "Delete o gasto de 45 reais com mercado"),
+    (OTHER, "Altere a despesa de 80 reais em contas para 90"),
+    (OTHER, "Atualize o gasto de 12 reais em alimentação para 15 reais"),
+    (OTHER, "Como faço para lançar um gasto de 10 reais em transporte?"),
+    (OTHER, "Já anotei a despesa de 25 reais em saúde?"),
+    (OTHER, "Não registre o gasto de 60 reais em educação"),
+    (OTHER, "Se eu gastar 300 reais em moradia, quanto fica o saldo?"),
+    (OTHER, "Me dê dicas para economizar"),
+    (OTHER, "Como funciona o cartão de crédito?"),
+    (OTHER, "Adicione uma receita de 3000 de salário"),
+    (OTHER, "Quanto recebi de freelance este ano?"),
+    (OTHER, "Obrigado!"),
+    (OTHER, "Compare meus gastos de janeiro e fevereiro"),
+    (OTHER, "Mostre todas as transações"),
+    (OTHER, "Procure transações com a palavra uber"),
+    (OTHER, "Qual foi a maior receita do ano?"),
+    (OTHER, "Qual minha maior fonte de renda em março?"),
+    (OTHER, "Quanto ganhei com investimentos em 2024?"),
+]
+
+# Conjunto separado para avaliação offline: (pergunta, intenção esperada, argumentos esperados)
+EVALUATION_SET = [
+    ("Qual foi o meu maior gasto em agosto de 2024?", "top_spending",
+     {"start_date": "2024-08-01", "end_date": "2024-08-31"}),
+    ("Onde gastei mais no mês passado?", "top_spending", None),
+    ("Qual a categoria de maior despesa em 2023?", "top_spending",
+     {"start_date": "2023-01-01", "end_date": "2023-12-31"}),
+    ("Em que eu mais gastei em 03/2024?", "top_spending",
+     {"start_date": "2024-03-01", "end_date": "2024-03-31"}),
+    ("Qual meu saldo em setembro de 2024?", "balance",
+     {"start_date": "2024-09-01", "end_date": "2024-09-30"}),
+    ("Quanto me sobrou neste mês?", "balance", None),
+    ("Saldo de fevereiro de 2024", "balance", {"start_date": "2024-02-01", "end_date": "2024-02-29"}),
+    ("Fechei o mês passado no positivo?", "balance", None),
+    ("Liste os gastos com alimentação", "expenses_by_category", None),
+    ("Mostre minhas despesas de transporte em janeiro de 2024", "expenses_by_category",
+     {"start_date": "2024-01-01", "end_date": "2024-01-31"}),
+    ("Quais despesas tive na categoria saúde?", "expenses_by_category", None),
+    ("Registre uma despesa de R$ 42,50 em lazer", "add_expense", {"amount": 42.5, "type": "expense"}),
+    ("Gastei 18 reais com café em alimentação", "add_expense", {"amount": 18.0, "description": "café"}),
+    ("Adicionar gasto de R$ 1.500,00 com aluguel em moradia", "add_expense", {"amount": 1500.0}),
+    ("Oi, boa tarde", OTHER, None),
+    ("Quais são as minhas categorias?", OTHER, None),
+    ("Detalhes da transação 12", OTHER, None),
+    ("Apague a transação 4", OTHER, None),
+    ("Remova a despesa de 20 reais em transporte", OTHER, None),
+    ("Como registro um gasto de 50 reais em lazer?", OTHER, None),
+    ("Adicione uma receita de 500 reais", OTHER, None),
+    ("Faça um relatório detalhado de riscos", OTHER, None),
+    ("Quanto ganhei de salário em 2024?", OTHER, None),
+    ("Busque transações com a palavra mercado", OTHER, None),
+    ("Qual foi minha maior receita em 2024?", OTHER, None),
+    # Maior gasto dentro de uma categoria não é a categoria de maior gasto
+    ("Quais os maiores gastos de transporte em março?", OTHER, None),
+]
+
+# Categorias do seed (app/data/seed.py) para avaliar sem banco
+EVALUATION_CATEGORIES = [
+    {"id": i + 1, "name": name, "type": kind}
+    for i, (kind, name) in enumerate(
+        [("income", n) for n in ["Salário", "Freelance", "Investimentos", "Outros"]]
+        + [("expense", n) for n in ["Alimentação", "Moradia", "Transporte", "Lazer", "Saúde",
+                                    "Educação", "Contas", "Mercearia", "Outros"]]
+    )
+]
+
+
+def normalize(text: str) -> str:
+    """Minúsculo e sem acentos"""
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def features(text: str) -> List[str]:
+    """Unigramas e bigramas, com meses, anos e números generalizados"""
+    tokens = []
+    for token in re.findall(r"[a-z]+|\d+", normalize(text)):
+        if token in MONTHS:
+            token = "<mes>"
+        elif token.isdigit():
+            token = "<ano>" if len(token) == 4 and token[:2] in ("19", "20") else "<num>"
+        tokens.append(token)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def parse_amount(raw: str) -> Optional[float]:
+    """'1.234,56' -> 1234.56; '35,90' -> 35.9; '1.500' -> 1500.0"""
+    raw = raw.strip(".,")
+    if not raw:
+        return None
+    if "," in raw:
+        raw = raw.replace(".", "").replace(",", ".")
+    elif _THOUSANDS_RE.match(raw):
+        raw = raw.replace(".", "")
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+class NaiveBayesIntentModel:
+    """Naive Bayes multinomial sobre unigramas e bigramas (NumPy)"""
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.classes: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.log_prior: Optional[np.ndarray] = None
+        self.log_likelihood: Optional[np.ndarray] = None
+
+    def fit(self, texts: List[str], labels: List[str]) -> "NaiveBayesIntentModel":
+        docs = [features(text) for text in texts]
+        for doc in docs:
+            for feature in doc:
+                self.vocabulary.setdefault(feature, len(self.vocabulary))
+        self.classes = sorted(set(labels))
+        class_index = {label: i for i, label in enumerate(self.classes)}
+
+        counts = np.zeros((len(self.classes), len(self.vocabulary)))
+        for doc, label in zip(docs, labels):
+            for feature in doc:
+                counts[class_index[label], self.vocabulary[feature]] += 1
+
+        priors = np.bincount([class_index[label] for label in labels], minlength=len(self.classes))
+        self.log_prior = np.log(priors / priors.sum())
+        smoothed = counts + self.alpha
+        self.log_likelihood = np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+        return self
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        indexes = [self.vocabulary[f] for f in features(text) if f in self.vocabulary]
+        scores = self.log_prior + self.log_likelihood[:, indexes].sum(axis=1)
+        probs = np.exp(scores - scores.max())
+        probs /= probs.sum()
+        return {label: float(p) for label, p in zip(self.classes, probs)}
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probs = self.predict_proba(text)
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+
+@dataclass
+class IntentMatch:
+    """Intenção reconhecida, com os parâmetros prontos para a ferramenta"""
+    intent: str
+    confidence: float
+    source: str  # "pattern" ou "model"
+    slots: Dict[str, Any] = field(default_factory=dict)
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class IntentRouter:
+    """
+    Classificador de intenções e extrator de parâmetros.
+
+    Padrões compilados têm precedência; sem padrão, vale o naive Bayes se a
+    probabilidade passar de `threshold`. Só há roteamento quando todos os
+    parâmetros obrigatórios da ferramenta foram extraídos do texto.
+    """
+
+    def __init__(self,
+                 model: Optional[NaiveBayesIntentModel] = None,
+                 threshold: float = 0.9,
+                 allow_writes: bool = False,
+                 today: Callable[[], date] = date.today):
+        self.model = model
+        self.threshold = threshold
+        self.allow_writes = allow_writes
+        self.today = today
+
+        self.stats = {
+            "requests": 0,
+            "matched_pattern": 0,
+            "matched_model": 0,
+            "dispatched": 0,
+            "by_intent": defaultdict(int),
+            "fallbacks": defaultdict(int),
+            "classify_seconds": 0.0,
+        }
+
+    # ------------------------------------------
+    # Treino
+    # ------------------------------------------
+
+    @classmethod
+    def train(cls, questions: Iterable[str] = (), **kwargs) -> "IntentRouter":
+        """
+        Treina o modelo com os exemplos-semente e perguntas históricas
+
+        Args:
+            questions: Perguntas sem rótulo (ex.: nós Question do Neo4j),
+                rotuladas pelos padrões; as que não casam viram "other"
+            **kwargs: Parâmetros do IntentRouter
+
+        Returns:
+            Roteador pronto para uso
+        """
+        texts = [text for _, text in SEED_EXAMPLES]
+        labels = [label for label, _ in SEED_EXAMPLES]
+        historical = 0
+        for question in questions:
+            if question:
+                texts.append(question)
+                labels.append(cls.match_pattern(question) or OTHER)
+                historical += 1
+
+        model = NaiveBayesIntentModel().fit(texts, labels)
+        logger.info(f"Classificador de intenções treinado: {len(texts)} exemplos "
+                    f"({historical} históricos), vocabulário de {len(model.vocabulary)}")
+        return cls(model=model, **kwargs)
+
+    @staticmethod
+    def load_questions(driver, limit: int = 5000) -> List[str]:
+        """Perguntas mais recentes salvas no Neo4j"""
+        with driver.session() as session:
+            result = session.run(
+                "MATCH (q:Question) RETURN q.text AS text ORDER BY q.createdAt DESC LIMIT $limit",
+                limit=limit,
+            )
+            return [record["text"] for record in result if record["text"]]
+
+    # ------------------------------------------
+    # Classificação e parâmetros
+    # ------------------------------------------
+
+    @staticmethod
+    def match_pattern(text: str) -> Optional[str]:
+        normalized = normalize(text).strip()
+        for intent, pattern in INTENT_PATTERNS:
+            if intent in WRITE_INTENTS and not IntentRouter.is_write_request(text):
+                continue
+            if pattern.search(normalized):
+                return intent
+        return None
+
+    @staticmethod
+    def is_write_request(text: str) -> bool:
+        """Falso para apagar/corrigir, perguntas e negações (nunca viram inclusão)"""
+        normalized = normalize(text)
+        return not EDIT_VERBS_RE.search(normalized) and not _NOT_A_WRITE_RE.search(normalized)
+
+    def classify(self, text: str) -> Tuple[str, float, str]:
+        """Retorna (intenção, confiança, origem)"""
+        intent = self.match_pattern(text)
+        if intent:
+            return intent, 1.0, "pattern"
+        if self.model is None:
+            return OTHER, 0.0, "none"
+        intent, confidence = self.model.predict(text)
+        return intent, confidence, "model"
+
+    def extract_period(self, text: str) -> Optional[Tuple[str, str]]:
+        """Mês ou ano citado na pergunta -> (início, fim) em YYYY-MM-DD"""
+        normalized = normalize(text)
+        today = self.today()
+
+        month = year = None
+        match = _MONTH_NAME_RE.search(normalized)
+        if match:
+            month = MONTHS[match.group(1)]
+            # Sem ano: a ocorrência mais recente do mês
+            year = int(match.group(2)) if match.group(2) else (
+                today.year if month <= today.month else today.year - 1)
+        elif _MONTH_NUMBER_RE.search(normalized):
+            match = _MONTH_NUMBER_RE.search(normalized)
+            month, year = int(match.group(1)), int(match.group(2))
+        elif _CURRENT_MONTH_RE.search(normalized):
+            month, year = today.month, today.year
+        elif _PREVIOUS_MONTH_RE.search(normalized):
+            previous = today.replace(day=1) - timedelta(days=1)
+            month, year = previous.month, previous.year
+
+        if month:
+            if not 1 <= month <= 12:
+                return None
+            last_day = calendar.monthrange(year, month)[1]
+            return f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{last_day:02d}"
+
+        match = _YEAR_RE.search(normalized)
+        if match or _CURRENT_YEAR_RE.search(normalized):
+            year = int(match.group(1)) if match else today.year
+            return f"{year:04d}-01-01", f"{year:04d}-12-31"
+        return None
+
+    @staticmethod
+    def extract_amount(text: str) -> Optional[float]:
+        match = _AMOUNT_RE.search(normalize(text))
+        if not match:
+            return None
+        return parse_amount(next(group for group in match.groups() if group))
+
+    @staticmethod
+    def extract_category(text: str,
+                         categories: List[Dict[str, Any]],
+                         kind: str = "expense") -> Optional[Dict[str, Any]]:
+        """Categoria citada pelo nome (ambiguidade = nenhuma)"""
+        normalized = normalize(text)
+        found = {}
+        for category in categories:
+            if category.get("type") not in (None, kind):
+                continue
+            name = normalize(category["name"])
+            if re.search(rf"\b{re.escape(name)}\b", normalized):
+                found.setdefault(name, category)
+        return next(iter(found.values())) if len(found) == 1 else None
+
+    @staticmethod
+    def extract_description(text: str, category: Dict[str, Any]) -> str:
+        quoted = _QUOTED_RE.search(text)
+        if quoted:
+            return quoted.group(1).strip()
+        match = _DESCRIPTION_RE.search(text)
+        if match and normalize(match.group(1).strip()) != normalize(category["name"]):
+            return match.group(1).strip()
+        return category["name"]
+
+    def _build_arguments(self,
+                         intent: str,
+                         text: str,
+                         categories_loader: Optional[Callable[[], List[Dict[str, Any]]]]
+                         ) -> Optional[Dict[str, Any]]:
+        period = self.extract_period(text)
+
+        if intent in ("top_spending", "balance"):
+            if not period:
+                return None
+            # "maiores gastos de transporte" pergunta por transações, não pela categoria
+            if intent == "top_spending" and categories_loader is not None \
+                    and self.extract_category(text, categories_loader()):
+                return None
+            return {"start_date": period[0], "end_date": period[1]}
+
+        if categories_loader is None:
+            return None
+        category = self.extract_category(text, categories_loader())
+        if category is None:
+            return None
+
+        if intent == "expenses_by_category":
+            args = {"category_id": category["id"]}
+            if period:
+                args.update({"start_date": period[0], "end_date": period[1]})
+            return args
+
+        if intent == "add_expense":
+            amount = self.extract_amount(text)
+            if not amount or amount <= 0:
+                return None
+            day = self.today()
+            if re.search(r"\bontem\b", normalize(text)):
+                day -= timedelta(days=1)
+            return {
+                "amount": amount,
+                "category_id": category["id"],
+                "date": day.isoformat(),
+                "description": self.extract_description(text, category),
+                "type": "expense",
+            }
+        return None
+
+    def route(self,
+              text: str,
+              categories_loader: Optional[Callable[[], List[Dict[str, Any]]]] = None
+              ) -> Optional[IntentMatch]:
+        """
+        Decide se a pergunta pode ir direto para uma ferramenta
+
+        Args:
+            text: Pergunta do usuário
+            categories_loader: Função que lista as categorias (id, name, type);
+                só é chamada para intenções que dependem de categoria
+
+        Returns:
+            IntentMatch com as tool calls prontas, ou None para seguir pelo LLM
+        """
+        started = time.perf_counter()
+        self.stats["requests"] += 1
+        try:
+            intent, confidence, source = self.classify(text)
+            if intent == OTHER:
+                return None
+            if confidence < self.threshold:
+                self.stats["fallbacks"]["low_confidence"] += 1
+                return None
+            if intent in WRITE_INTENTS and not self.allow_writes:
+                self.stats["fallbacks"]["writes_disabled"] += 1
+                return None
+            # Escrita só com o padrão imperativo; o modelo nunca dispara uma inclusão
+            if intent in WRITE_INTENTS and source != "pattern":
+                self.stats["fallbacks"]["write_without_pattern"] += 1
+                return None
+
+            args = self._build_arguments(intent, text, categories_loader)
+            if args is None:
+                self.stats["fallbacks"]["missing_slots"] += 1
+                return None
+
+            self.stats[f"matched_{source}"] += 1
+            return IntentMatch(
+                intent=intent,
+                confidence=confidence,
+                source=source,
+                slots=args,
+                tool_calls=[{"name": INTENT_TOOLS[intent], "args": args, "id": f"intent_{intent}"}],
+            )
+        finally:
+            self.stats["classify_seconds"] += time.perf_counter() - started
+
+    def record_result(self, match: IntentMatch, answered: bool):
+        """Registra se a resposta local foi usada ou se caiu para o LLM"""
+        if answered:
+            self.stats["dispatched"] += 1
+            self.stats["by_intent"][match.intent] += 1
+        else:
+            self.stats["fallbacks"]["tool_failed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Roteamentos por intenção, motivos de fallback e tempo de classificação"""
+        stats = {
+            **self.stats,
+            "by_intent": dict(self.stats["by_intent"]),
+            "fallbacks": dict(self.stats["fallbacks"]),
+        }
+        requests = stats["requests"]
+        stats["dispatch_rate"] = (stats["dispatched"] / requests * 100) if requests else 0.0
+        stats["avg_classify_ms"] = (stats["classify_seconds"] / requests * 1000) if requests else 0.0
+        stats["llm_calls_saved"] = 2 * stats["dispatched"]
+        stats["threshold"] = self.threshold
+        return stats
+
+
+def evaluate(router: IntentRouter,
+             examples: List[Tuple[str, str, Optional[Dict[str, Any]]]] = None,
+             categories: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Acurácia de roteamento offline
+
+    Args:
+        router: Roteador treinado
+        examples: (pergunta, intenção esperada, argumentos esperados ou None)
+        categories: Categorias usadas na extração de parâmetros
+
+    Returns:
+        Acurácia, precisão/cobertura do roteamento e tempo médio por pergunta
+    """
+    examples = examples or EVALUATION_SET
+    categories = categories or EVALUATION_CATEGORIES
+
+    correct = dispatched = wrong_dispatch = expected_dispatch = 0
+    per_intent: Dict[str, Dict[str, int]] = defaultdict(lambda: {"total": 0, "correct": 0})
+    errors = []
+    timings = []
+
+    for text, expected, expected_args in examples:
+        started = time.perf_counter()
+        match = router.route(text, categories_loader=lambda: categories)
+        timings.append(time.perf_counter() - started)
+
+        predicted = match.intent if match else OTHER
+        args_ok = match is None or not expected_args or all(
+            match.slots.get(key) == value for key, value in expected_args.items())
+        ok = predicted == expected and args_ok
+
+        per_intent[expected]["total"] += 1
+        per_intent[expected]["correct"] += int(ok)
+        correct += int(ok)
+        expected_dispatch += int(expected != OTHER)
+        if match:
+            dispatched += 1
+            wrong_dispatch += int(not ok)
+        if not ok:
+            errors.append({"text": text, "expected": expected, "predicted": predicted,
+                           "slots": match.slots if match else None})
+
+    return {
+        "examples": len(examples),
+        "accuracy": correct / len(examples) * 100,
+        # Roteamento errado é o erro caro: responde algo diferente do pedido
+        "dispatch_precision": (dispatched - wrong_dispatch) / dispatched * 100 if dispatched else 0.0,
+        "dispatch_coverage": (dispatched - wrong_dispatch) / expected_dispatch * 100 if expected_dispatch else 0.0,
+        "avg_route_ms": float(np.mean(timings) * 1000),
+        "p95_route_ms": float(np.percentile(timings, 95) * 1000),
+        "per_intent": dict(per_intent),
+        "errors": errors,
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--neo4j", action="store_true",
+                        help="treina também com as perguntas do Neo4j (NEO4J_URI/USER/PASSWORD)")
+    args = parser.parse_args(argv)
+
+    questions: List[str] = []
+    if args.neo4j:
+        import os
+        from neo4j import GraphDatabase
+
+        driver = GraphDatabase.driver(
+            os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+            auth=(os.getenv("NEO4J_USER", "neo4j"), os.getenv("NEO4J_PASSWORD")),
+        )
+        try:
+            questions = IntentRouter.load_questions(driver)
+        finally:
+            driver.close()
+
+    # Data fixa: os exemplos relativos ("mês passado") não dependem do dia da avaliação
+    router = IntentRouter.train(questions, threshold=args.threshold, allow_writes=True,
+                                today=lambda: date(2024, 10, 15))
+    print(json.dumps(evaluate(router), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
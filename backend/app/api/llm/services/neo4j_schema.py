@@ -0,0 +1,127 @@
+# backend/app/api/llm/services/neo4j_schema.py
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from neo4j import GraphDatabase
+
+logger = logging.getLogger(__name__)
+
+# Constraints e índices exigidos pelas consultas do RAGService.
+# Todos nomeados e com IF NOT EXISTS: rodar de novo não muda nada.
+SCHEMA_STATEMENTS = [
+    (
+        "user_id_unique",
+        "CREATE CONSTRAINT user_id_unique IF NOT EXISTS "
+        "FOR (u:User) REQUIRE u.id IS UNIQUE",
+    ),
+    (
+        "context_hash_unique",
+        "CREATE CONSTRAINT context_hash_unique IF NOT EXISTS "
+        "FOR (c:Context) REQUIRE c.hash IS UNIQUE",
+    ),
+    (
+        "question_user_created_at",
+        "CREATE RANGE INDEX question_user_created_at IF NOT EXISTS "
+        "FOR (q:Question) ON (q.userId, q.createdAt)",
+    ),
+]
+
+# Perguntas gravadas antes de `userId` existir recebem o id pelo relacionamento
+BACKFILL_QUESTION_USER_ID = """
+CALL {
+    MATCH (u:User)-[:ASKED]->(q:Question)
+    WHERE q.userId IS NULL
+    SET q.userId = u.id
+} IN TRANSACTIONS OF 1000 ROWS
+"""
+
+# Consultas conferidas com EXPLAIN: (nome, consulta, parâmetros, operador esperado)
+PLAN_CHECKS = [
+    (
+        "save_conversation.user",
+        "MERGE (u:User {id: $user_id})",
+        {"user_id": ""},
+        "NodeUniqueIndexSeek",
+    ),
+    (
+        "save_conversation.context",
+        "MERGE (c:Context {hash: $context_hash})",
+        {"context_hash": ""},
+        "NodeUniqueIndexSeek",
+    ),
+    (
+        "get_user_conversation_history",
+        "MATCH (q:Question {userId: $user_id}) WHERE q.createdAt IS NOT NULL "
+        "RETURN q ORDER BY q.createdAt DESC LIMIT $limit",
+        {"user_id": "", "limit": 10},
+        "NodeIndexSeek",
+    ),
+]
+
+
+def plan_operators(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """Lista os operadores de um plano do EXPLAIN (sem o sufixo "@neo4j")"""
+    if not plan:
+        return []
+    operators = [plan.get("operatorType", "").split("@")[0]]
+    for child in plan.get("children", []):
+        operators.extend(plan_operators(child))
+    return operators
+
+
+class Neo4jSchemaManager:
+    """
+    Cria de forma idempotente as constraints e índices usados pelo chat e
+    confere com EXPLAIN que as consultas de escrita e de histórico fazem
+    seek em índice em vez de varrer todos os nós do label.
+    """
+
+    def __init__(self, neo4j_driver: GraphDatabase.driver):
+        self.neo4j_driver = neo4j_driver
+
+    def ensure_schema(self) -> Dict[str, Any]:
+        """
+        Aplica o schema e verifica os planos
+
+        Returns:
+            Relatório com o que foi aplicado, falhas e planos verificados
+        """
+        report = {"applied": [], "failed": {}, "plans": {}}
+
+        with self.neo4j_driver.session() as session:
+            for name, statement in SCHEMA_STATEMENTS:
+                try:
+                    session.run(statement).consume()
+                    report["applied"].append(name)
+                except Exception as e:
+                    report["failed"][name] = str(e)
+                    logger.error(f"Erro ao aplicar '{name}' no Neo4j: {e}")
+
+            try:
+                session.run("CALL db.awaitIndexes(300)").consume()
+                session.run(BACKFILL_QUESTION_USER_ID).consume()
+            except Exception as e:
+                report["failed"]["backfill"] = str(e)
+                logger.warning(f"Erro ao preencher Question.userId: {e}")
+
+            for name, query, params, expected in PLAN_CHECKS:
+                report["plans"][name] = self._verify_plan(session, name, query, params, expected)
+
+        verified = sum(1 for plan in report["plans"].values() if plan["uses_index"])
+        logger.info(f"Schema do Neo4j aplicado: {len(report['applied'])}/{len(SCHEMA_STATEMENTS)} "
+                    f"itens, {verified}/{len(PLAN_CHECKS)} consultas usando índice")
+        return report
+
+    def _verify_plan(self, session, name: str, query: str, params: dict, expected: str) -> Dict[str, Any]:
+        try:
+            plan = session.run(f"EXPLAIN {query}", params).consume().plan
+        except Exception as e:
+            logger.warning(f"Erro no EXPLAIN de '{name}': {e}")
+            return {"uses_index": False, "operators": [], "error": str(e)}
+
+        operators = plan_operators(plan)
+        uses_index = any(operator.startswith(expected) for operator in operators)
+        if not uses_index:
+            logger.warning(f"Consulta '{name}' não usa {expected}: {operators}")
+        return {"uses_index": uses_index, "operators": operators}
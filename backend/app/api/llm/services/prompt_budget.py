@@ -0,0 +1,280 @@
+# backend/app/api/llm/services/prompt_budget.py
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage
+from langchain_core.tools import BaseTool
+
+from ..providers.base_provider import BaseLLMProvider
+from ..providers.tool_subset import active_tool_subset
+from .tool_selector import schema_tokens
+
+logger = logging.getLogger(__name__)
+
+# Prioridades das partes do prompt: quanto maior o número, mais cedo é cortada.
+# System prompt, pergunta e tool calls do modelo nunca são cortados.
+PRIORITY_REQUIRED = 0
+PRIORITY_TOOL_OUTPUT = 1
+PRIORITY_CONTEXT = 2
+PRIORITY_HISTORY = 3
+
+# Caracteres por token para texto em português, por família de tokenizer
+CHARS_PER_TOKEN = {
+    "gemini": 4.0,
+    "openai": 3.7,
+    "groq": 3.5,
+    "lmstudio": 3.2,
+}
+DEFAULT_CHARS_PER_TOKEN = 3.5
+
+TRUNCATION_MARKER = "\n[... truncado]"
+
+
+def resolve_provider_name(provider: BaseLLMProvider) -> str:
+    """Nome do provider real por trás de decoradores (cache, hedge, replay)"""
+    while True:
+        inner = getattr(provider, "provider", None)
+        if inner is None and getattr(provider, "providers", None):
+            inner = provider.providers[0]
+        if not isinstance(inner, BaseLLMProvider):
+            return provider.provider_name
+        provider = inner
+
+
+def _prompt_tokens(response: Any) -> Optional[int]:
+    """Tokens de entrada reportados pelo provedor, se houver"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("input_tokens"):
+        return int(usage["input_tokens"])
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    if token_usage.get("prompt_tokens"):
+        return int(token_usage["prompt_tokens"])
+    return None
+
+
+class TokenEstimator:
+    """
+    Estimativa de tokens por provedor (caracteres por token), corrigida
+    continuamente pela contagem real que o provedor devolve.
+    """
+
+    def __init__(self,
+                 chars_per_token: float = DEFAULT_CHARS_PER_TOKEN,
+                 message_overhead: int = 4,
+                 smoothing: float = 0.2):
+        self.chars_per_token = chars_per_token
+        self.message_overhead = message_overhead
+        self.smoothing = smoothing
+        self.correction = 1.0
+
+    @classmethod
+    def for_provider(cls, provider: BaseLLMProvider, **kwargs) -> "TokenEstimator":
+        name = resolve_provider_name(provider)
+        return cls(chars_per_token=CHARS_PER_TOKEN.get(name, DEFAULT_CHARS_PER_TOKEN), **kwargs)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return math.ceil(len(text) / self.chars_per_token * self.correction)
+
+    def chars_for(self, tokens: int) -> int:
+        """Quantos caracteres cabem em `tokens`"""
+        return int(tokens * self.chars_per_token / self.correction)
+
+    def count_messages(self, messages: List[BaseMessage]) -> int:
+        total = 0
+        for message in messages:
+            total += self.count(str(message.content)) + self.message_overhead
+            for call in getattr(message, "tool_calls", None) or []:
+                total += self.count(f"{call['name']}{call['args']}")
+        return total
+
+    def calibrate(self, estimated: int, actual: int):
+        """Aproxima a correção da razão real/estimado (média móvel exponencial)"""
+        if estimated <= 0 or actual <= 0:
+            return
+        target = self.correction * actual / estimated
+        self.correction += self.smoothing * (target - self.correction)
+        self.correction = min(max(self.correction, 0.5), 2.0)
+
+
+@dataclass
+class BudgetPlan:
+    """Resultado da alocação: mensagens cortadas e tokens estimados"""
+    messages: List[BaseMessage]
+    estimated_tokens: int
+    budget: int
+    trimmed: Dict[int, int] = field(default_factory=dict)  # índice -> tokens cortados
+    reserved_tokens: int = 0  # schemas das ferramentas vinculadas, fora das mensagens
+
+    @property
+    def trimmed_tokens(self) -> int:
+        return sum(self.trimmed.values())
+
+    @property
+    def over_budget(self) -> bool:
+        return self.estimated_tokens > self.budget
+
+
+class PromptBudget:
+    """
+    Orçamento de tokens para montagem de prompts.
+
+    Cada mensagem recebe uma prioridade; quando o total estimado passa do
+    orçamento (limite total menos a reserva para a resposta), as mensagens
+    de prioridade mais baixa são encurtadas primeiro, proporcionalmente
+    dentro do mesmo nível e preferindo quebras de linha. Os schemas das
+    ferramentas vinculadas também ocupam o prompt: ficam reservados no
+    orçamento e fora da calibração do estimador.
+    """
+
+    def __init__(self,
+                 estimator: TokenEstimator = None,
+                 total_tokens: int = 8000,
+                 completion_reserve: int = 1024,
+                 min_section_tokens: int = 32):
+        self.estimator = estimator or TokenEstimator()
+        self.total_tokens = total_tokens
+        self.completion_reserve = completion_reserve
+        self.min_section_tokens = min_section_tokens
+        self._tool_schema_tokens: Dict[str, int] = {}
+
+        self.stats = {
+            "requests": 0,
+            "trimmed_requests": 0,
+            "trimmed_tokens": 0,
+            "over_budget": 0,
+            "estimated_tokens": 0,
+            "measured_requests": 0,
+            "measured_estimated_tokens": 0,
+            "actual_tokens": 0,
+            "reserved_tokens": 0,
+        }
+
+    @classmethod
+    def for_provider(cls, provider: BaseLLMProvider, **kwargs) -> "PromptBudget":
+        return cls(estimator=TokenEstimator.for_provider(provider), **kwargs)
+
+    @property
+    def budget(self) -> int:
+        return max(self.total_tokens - self.completion_reserve, 0)
+
+    def measure_tools(self, tools: List[BaseTool]):
+        """Registra os tokens do schema de cada ferramenta vinculada ao LLM"""
+        self._tool_schema_tokens = {tool.name: schema_tokens(tool) for tool in tools}
+
+    def tool_schema_tokens(self) -> int:
+        """Tokens dos schemas enviados nesta requisição (subconjunto ativo ou todas)"""
+        subset = active_tool_subset()
+        if subset is None:
+            return sum(self._tool_schema_tokens.values())
+        return sum(self._tool_schema_tokens.get(name, 0) for name in subset)
+
+    def fit(self, messages: List[BaseMessage], priorities: List[int]) -> BudgetPlan:
+        """
+        Encurta as mensagens para caberem no orçamento
+
+        Args:
+            messages: Mensagens na ordem em que serão enviadas
+            priorities: Prioridade de cada mensagem (PRIORITY_*)
+
+        Returns:
+            Plano com as mensagens (cópias, se cortadas) e o total estimado
+        """
+        if len(messages) != len(priorities):
+            raise ValueError("Cada mensagem precisa de uma prioridade")
+
+        estimator = self.estimator
+        reserved = self.tool_schema_tokens()
+        budget = max(self.budget - reserved, 0)
+        sizes = [estimator.count_messages([message]) for message in messages]
+        excess = sum(sizes) - budget
+        trimmed: Dict[int, int] = {}
+
+        for level in sorted({p for p in priorities if p != PRIORITY_REQUIRED}, reverse=True):
+            if excess <= 0:
+                break
+            indexes = [i for i, p in enumerate(priorities) if p == level]
+            slack = {i: max(sizes[i] - self.min_section_tokens, 0) for i in indexes}
+            available = sum(slack.values())
+            if not available:
+                continue
+            cut = min(excess, available)
+            for i in indexes:
+                share = math.ceil(cut * slack[i] / available)
+                if share:
+                    trimmed[i] = min(share, slack[i])
+            excess -= sum(trimmed[i] for i in indexes if i in trimmed)
+
+        fitted = list(messages)
+        for i, tokens in trimmed.items():
+            fitted[i] = self._shorten(messages[i], sizes[i] - tokens)
+            size = estimator.count_messages([fitted[i]])
+            trimmed[i], sizes[i] = sizes[i] - size, size
+
+        trimmed = {i: tokens for i, tokens in trimmed.items() if tokens > 0}
+        plan = BudgetPlan(messages=fitted, estimated_tokens=sum(sizes), budget=budget,
+                          trimmed=trimmed, reserved_tokens=reserved)
+        self.stats["requests"] += 1
+        self.stats["estimated_tokens"] += plan.estimated_tokens
+        if trimmed:
+            self.stats["trimmed_requests"] += 1
+            self.stats["trimmed_tokens"] += plan.trimmed_tokens
+        if plan.over_budget:
+            self.stats["over_budget"] += 1
+            logger.warning(f"Prompt acima do orçamento mesmo após cortes: "
+                           f"{plan.estimated_tokens}/{plan.budget} tokens")
+        return plan
+
+    def _shorten(self, message: BaseMessage, tokens: int) -> BaseMessage:
+        text = str(message.content)
+        limit = max(self.estimator.chars_for(tokens - self.estimator.message_overhead)
+                    - len(TRUNCATION_MARKER), 0)
+        if len(text) <= limit:
+            return message
+        head = text[:limit]
+        # Prefere cortar numa quebra de linha (itens inteiros de contexto/resultado)
+        boundary = head.rfind("\n")
+        if boundary >= limit * 0.8:
+            head = head[:boundary]
+        return message.copy(update={"content": head + TRUNCATION_MARKER})
+
+    def record(self, plan: BudgetPlan, response: Any, label: str = "prompt"):
+        """Registra tokens reais vs. orçados e recalibra o estimador (sem os schemas das ferramentas)"""
+        actual = _prompt_tokens(response)
+        if actual is not None:
+            actual = max(actual - plan.reserved_tokens, 0)
+        if actual is None:
+            logger.info(f"Prompt {label}: ~{plan.estimated_tokens} tokens estimados "
+                        f"(orçamento {plan.budget}, cortados {plan.trimmed_tokens})")
+            return
+
+        self.stats["measured_requests"] += 1
+        self.stats["measured_estimated_tokens"] += plan.estimated_tokens
+        self.stats["actual_tokens"] += actual
+        self.stats["reserved_tokens"] += plan.reserved_tokens
+        logger.info(f"Prompt {label}: {actual} tokens reais, {plan.estimated_tokens} estimados "
+                    f"(orçamento {plan.budget}, cortados {plan.trimmed_tokens}, "
+                    f"schemas de ferramentas {plan.reserved_tokens})")
+        self.estimator.calibrate(plan.estimated_tokens, actual)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tokens médios por prompt, cortes e erro da estimativa"""
+        stats = self.stats.copy()
+        stats["total_tokens"] = self.total_tokens
+        stats["budget"] = self.budget
+        stats["chars_per_token"] = self.estimator.chars_per_token
+        stats["correction"] = round(self.estimator.correction, 4)
+        stats["avg_estimated_tokens"] = (
+            stats["estimated_tokens"] / stats["requests"] if stats["requests"] else 0.0
+        )
+        measured = stats["measured_estimated_tokens"]
+        stats["estimation_error"] = (
+            (measured - stats["actual_tokens"]) / stats["actual_tokens"] * 100
+            if stats["actual_tokens"] else 0.0
+        )
+        return stats
+
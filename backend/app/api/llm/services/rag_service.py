@@ -1,27 +1,122 @@
 # backend/app/api/llm/services/rag_service.py
 
+import asyncio
 import hashlib
 import logging
+import re
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from neo4j import GraphDatabase
 import redis.asyncio as redis
 
+from app.utils.embeddings import VectorIndex
+from app.utils.metrics import REGISTRY
+from ..cache.codec import CacheCodec
+from ..cache.local import LocalTTLCache
+from ..cache.namespace import VersionedNamespace, CacheSweeper
+from ..cache.tiered import TieredCache
+
 logger = logging.getLogger(__name__)
 
+# Palavras muito frequentes que não ajudam no ranqueamento da busca full-text
+STOPWORDS_PT = frozenset({
+    "a", "ao", "aos", "as", "com", "como", "da", "das", "de", "do", "dos", "e",
+    "em", "eu", "foi", "isso", "me", "meu", "minha", "na", "nas", "no", "nos",
+    "o", "os", "ou", "para", "pela", "pelo", "por", "qual", "quais", "que",
+    "se", "sem", "ser", "seu", "sua", "um", "uma", "é",
+})
+
+MAX_QUERY_TERMS = 16
+
+NEO4J_QUERY_SECONDS = REGISTRY.histogram(
+    "neo4j_query_duration_seconds", "Latência das consultas ao Neo4j por operação", ["operation"]
+)
+
+
+def build_fulltext_query(text: str) -> str:
+    """
+    Converte a mensagem do usuário em uma consulta Lucene segura
+
+    Args:
+        text: Mensagem livre do usuário
+
+    Returns:
+        Termos relevantes unidos por OR (string vazia se nada sobrar)
+    """
+    terms: List[str] = []
+    for token in re.findall(r"\w+", text.lower()):
+        if len(token) < 2 or token in STOPWORDS_PT or token in terms:
+            continue
+        terms.append(token)
+        if len(terms) >= MAX_QUERY_TERMS:
+            break
+    return " OR ".join(terms)
+
 
 class RAGService:
     """Serviço de Retrieval-Augmented Generation usando Neo4j e Redis"""
     
-    def __init__(self, neo4j_driver: GraphDatabase.driver, redis_client: redis.Redis, redis_ttl: int = 3600):
+    # Índice full-text restrito aos rótulos que carregam conhecimento
+    # (Question/Answer ficam de fora para não poluir o contexto)
+    FULLTEXT_INDEX = "rag_knowledge_text"
+    FULLTEXT_LABELS = ("Document", "Chunk", "Context")
+    FULLTEXT_ANALYZER = "brazilian"
+    
+    # Quantidade máxima de trechos concatenados no contexto
+    CONTEXT_LIMIT = 5
+    
+    def __init__(self, 
+                 neo4j_driver: GraphDatabase.driver, 
+                 redis_client: redis.Redis, 
+                 redis_ttl: int = 3600,
+                 vector_index: Optional[VectorIndex] = None,
+                 semantic_min_score: float = 0.2,
+                 local_cache_size: int = 1024,
+                 local_cache_ttl: float = 30.0,
+                 negative_ttl: int = 60,
+                 distributed_lock: bool = False,
+                 compression_threshold: int = 1024):
         self.neo4j_driver = neo4j_driver
         self.redis_client = redis_client
         self.redis_ttl = redis_ttl
+        self.vector_index = vector_index
+        self.semantic_min_score = semantic_min_score
+        self.negative_ttl = negative_ttl
+        
+        # Cache de contexto versionado: limpar é só avançar a geração
+        self.context_namespace = VersionedNamespace(redis_client, "context")
+        self.cache_sweeper = CacheSweeper(self.context_namespace)
+        
+        # Camada em memória na frente do Redis, invalidada via pub/sub
+        self.context_cache = TieredCache(
+            self.context_namespace,
+            LocalTTLCache(max_entries=local_cache_size, ttl_seconds=local_cache_ttl),
+            redis_ttl=redis_ttl,
+            distributed_lock=distributed_lock,
+            codec=CacheCodec(compression_threshold=compression_threshold),
+        )
     
     def _hash_query(self, query: str) -> str:
         """Gera uma hash única para a consulta"""
         return hashlib.sha256(query.strip().lower().encode()).hexdigest()
     
+    def ensure_fulltext_indexes(self):
+        """Cria (se necessário) o índice full-text usado na busca de contexto"""
+        labels = "|".join(self.FULLTEXT_LABELS)
+        try:
+            with self.neo4j_driver.session() as session:
+                session.run(
+                    f"""
+                    CREATE FULLTEXT INDEX {self.FULLTEXT_INDEX} IF NOT EXISTS
+                    FOR (n:{labels}) ON EACH [n.text]
+                    OPTIONS {{indexConfig: {{`fulltext.analyzer`: $analyzer}}}}
+                    """,
+                    {"analyzer": self.FULLTEXT_ANALYZER},
+                )
+            logger.info(f"Índice full-text '{self.FULLTEXT_INDEX}' disponível para {labels}")
+        except Exception as e:
+            logger.error(f"Erro ao criar índice full-text no Neo4j: {e}")
+    
     async def get_relevant_context(self, search_query: str) -> str:
         """
         Busca contexto relevante no Neo4j com cache no Redis
@@ -32,48 +127,85 @@ class RAGService:
         Returns:
             Contexto relevante encontrado
         """
-        # Tenta buscar no cache Redis primeiro
-        cache_key = f"context:{self._hash_query(search_query)}"
+        query_hash = self._hash_query(search_query)
         
-        try:
-            cached_context = await self.redis_client.get(cache_key)
-            if cached_context:
-                logger.info("Contexto carregado do Redis (cache)")
-                return cached_context.decode("utf-8")
-        except Exception as e:
-            logger.warning(f"Erro ao acessar cache Redis: {e}")
+        async def search_neo4j() -> bytes:
+            # Driver síncrono: roda em thread para não bloquear o event loop
+            context = await asyncio.to_thread(self._search_context, search_query)
+            logger.info("Contexto buscado no Neo4j e salvo no cache")
+            return context.encode("utf-8")
         
-        # Se não encontrado no cache, busca no Neo4j
         try:
-            with self.neo4j_driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (n)
-                    WHERE n.text IS NOT NULL 
-                    AND toLower(n.text) CONTAINS toLower($search_query)
-                    RETURN n.text 
-                    ORDER BY size(n.text) DESC
-                    LIMIT 5
-                    """,
-                    {"search_query": search_query},
-                )
-                
-                texts = [record["n.text"] for record in result]
-                context = "\n---\n".join(texts) if texts else ""
-                
-                # Salva no cache Redis
-                try:
-                    await self.redis_client.set(cache_key, context, ex=self.redis_ttl)
-                    logger.info("Contexto salvo no Redis (cache)")
-                except Exception as e:
-                    logger.warning(f"Erro ao salvar no cache Redis: {e}")
-                
-                return context
-                
+            # Cache local -> Redis -> Neo4j, com single-flight por consulta,
+            # renovação antecipada e cache negativo para resultados vazios
+            context = await self.context_cache.get_or_compute(
+                query_hash,
+                search_neo4j,
+                ttl=self.redis_ttl,
+                negative_ttl=self.negative_ttl,
+            )
+            return context.decode("utf-8")
         except Exception as e:
             logger.error(f"Erro ao buscar contexto no Neo4j: {e}")
             return ""
     
+    def _search_context(self, search_query: str) -> str:
+        """Combina busca full-text e semântica no Neo4j"""
+        with NEO4J_QUERY_SECONDS.time(operation="search_context"), self.neo4j_driver.session() as session:
+            texts = self._fulltext_search(session, search_query)
+            for text in self._semantic_search(session, search_query):
+                if len(texts) >= self.CONTEXT_LIMIT:
+                    break
+                if text not in texts:
+                    texts.append(text)
+        
+        return "\n---\n".join(texts) if texts else ""
+    
+    def _fulltext_search(self, session, search_query: str) -> List[str]:
+        """Busca textos pelo índice full-text, ordenados por relevância"""
+        fulltext_query = build_fulltext_query(search_query)
+        if not fulltext_query:
+            return []
+        
+        result = session.run(
+            """
+            CALL db.index.fulltext.queryNodes($index_name, $fulltext_query)
+            YIELD node, score
+            RETURN node.text AS text, score
+            ORDER BY score DESC
+            LIMIT $limit
+            """,
+            {
+                "index_name": self.FULLTEXT_INDEX,
+                "fulltext_query": fulltext_query,
+                "limit": self.CONTEXT_LIMIT,
+            },
+        )
+        return [record["text"] for record in result]
+    
+    def _semantic_search(self, session, search_query: str) -> List[str]:
+        """Busca textos por similaridade de embeddings (paráfrases que o full-text não pega)"""
+        if self.vector_index is None:
+            return []
+        
+        hits = self.vector_index.search(
+            search_query, k=self.CONTEXT_LIMIT, min_score=self.semantic_min_score
+        )
+        if not hits:
+            return []
+        
+        ranking = {node_id: position for position, (node_id, _) in enumerate(hits)}
+        result = session.run(
+            """
+            MATCH (n)
+            WHERE elementId(n) IN $node_ids AND n.text IS NOT NULL
+            RETURN elementId(n) AS node_id, n.text AS text
+            """,
+            {"node_ids": list(ranking.keys())},
+        )
+        records = sorted(result, key=lambda record: ranking[record["node_id"]])
+        return [record["text"] for record in records]
+    
     async def save_conversation(self, user_id: str, question: str, answer: str, context: str):
         """
         Salva uma conversa no grafo Neo4j
@@ -88,13 +220,14 @@ class RAGService:
             context_hash = hashlib.sha256(context.encode()).hexdigest()
             now = datetime.utcnow().isoformat()
             
-            with self.neo4j_driver.session() as session:
+            with NEO4J_QUERY_SECONDS.time(operation="save_conversation"), self.neo4j_driver.session() as session:
                 session.run(
                     """
                     MERGE (u:User {id: $user_id})
-                    CREATE (q:Question {text: $question, createdAt: $now})
+                    CREATE (q:Question {text: $question, createdAt: $now, userId: $user_id})
                     CREATE (a:Answer {text: $answer, createdAt: $now})
-                    MERGE (c:Context {hash: $context_hash, text: $context})
+                    MERGE (c:Context {hash: $context_hash})
+                    ON CREATE SET c.text = $context
                     
                     MERGE (u)-[:ASKED]->(q)
                     MERGE (q)-[:GENERATED]->(a)
@@ -125,13 +258,15 @@ class RAGService:
             Lista com histórico de conversas
         """
         try:
-            with self.neo4j_driver.session() as session:
+            with NEO4J_QUERY_SECONDS.time(operation="conversation_history"), self.neo4j_driver.session() as session:
                 result = session.run(
                     """
-                    MATCH (u:User {id: $user_id})-[:ASKED]->(q:Question)-[:GENERATED]->(a:Answer)
+                    MATCH (q:Question {userId: $user_id})
+                    WHERE q.createdAt IS NOT NULL
+                    WITH q ORDER BY q.createdAt DESC LIMIT $limit
+                    MATCH (q)-[:GENERATED]->(a:Answer)
                     RETURN q.text as question, a.text as answer, q.createdAt as timestamp
                     ORDER BY q.createdAt DESC
-                    LIMIT $limit
                     """,
                     {"user_id": user_id, "limit": limit}
                 )
@@ -150,17 +285,29 @@ class RAGService:
             logger.error(f"Erro ao buscar histórico de conversas: {e}")
             return []
     
-    async def clear_cache(self, pattern: str = "context:*"):
+    async def clear_cache(self) -> int:
         """
-        Limpa o cache Redis baseado em um pattern
+        Invalida o cache de contexto em O(1) avançando a geração do namespace.
+        Os demais workers descartam sua camada local ao receber o pub/sub e as
+        chaves antigas são removidas em segundo plano com SCAN + UNLINK.
         
-        Args:
-            pattern: Pattern para buscar chaves a serem removidas
+        Returns:
+            Nova geração do cache de contexto
         """
-        try:
-            keys = await self.redis_client.keys(pattern)
-            if keys:
-                await self.redis_client.delete(*keys)
-                logger.info(f"Cache limpo: {len(keys)} chaves removidas")
-        except Exception as e:
-            logger.error(f"Erro ao limpar cache: {e}")
\ No newline at end of file
+        generation = await self.context_cache.invalidate()
+        self.cache_sweeper.schedule()
+        logger.info(f"Cache de contexto invalidado (geração {generation})")
+        return generation
+    
+    def start_cache_listener(self):
+        """Passa a receber invalidações de cache feitas por outros workers"""
+        self.context_cache.start_listener()
+    
+    async def stop_cache_listener(self):
+        await self.context_cache.stop_listener()
+    
+    def get_cache_stats(self) -> dict:
+        """Hit ratios por camada do cache de contexto"""
+        stats = self.context_cache.get_stats()
+        stats["sweeper"] = self.cache_sweeper.stats.copy()
+        return stats
@@ -0,0 +1,183 @@
+# backend/app/api/llm/services/response_templates.py
+
+import logging
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from ..multiagent.models import AgentResult
+
+logger = logging.getLogger(__name__)
+
+# (argumentos do tool call, campo "data" do resultado) -> texto da resposta
+ResponseRenderer = Callable[[Dict[str, Any], Any], str]
+
+TRANSACTION_TYPES = {"income": "receita", "expense": "despesa"}
+
+
+def format_currency(value: float) -> str:
+    """1234.5 -> 'R$ 1.234,50'"""
+    text = f"{float(value):,.2f}"
+    return "R$ " + text.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def format_date(value: str) -> str:
+    """'2024-03-05' ou ISO completo -> '05/03/2024' (texto original se não for data)"""
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).strftime("%d/%m/%Y")
+    except ValueError:
+        return str(value)
+
+
+def render_categories(args: Dict[str, Any], data: Any) -> str:
+    if not data:
+        return "Nenhuma categoria cadastrada."
+    lines = [f"Categorias disponíveis ({len(data)}):"]
+    lines.extend(f"- {category['name']} (ID {category['id']})" for category in data)
+    return "\n".join(lines)
+
+
+def render_transaction(args: Dict[str, Any], data: Any) -> str:
+    kind = TRANSACTION_TYPES.get(data.get("type"), data.get("type"))
+    text = (
+        f"Transação #{data['id']}: {data.get('description') or 'sem descrição'} — "
+        f"{format_currency(data['amount'])} ({kind}) em {format_date(data['date'])}, "
+        f"categoria {data.get('category_name') or data.get('category_id')}."
+    )
+    if data.get("notes"):
+        text += f" Notas: {data['notes']}"
+    return text
+
+
+def _period(args: Dict[str, Any]) -> str:
+    if args.get("start_date") and args.get("end_date"):
+        return f" entre {format_date(args['start_date'])} e {format_date(args['end_date'])}"
+    return ""
+
+
+def render_top_spending_category(args: Dict[str, Any], data: Any) -> str:
+    period = _period(args)
+    return (
+        f"A categoria com maior gasto{period} foi {data['category']}, "
+        f"com {format_currency(data['total'])}."
+    )
+
+
+def render_balance(args: Dict[str, Any], data: Any) -> str:
+    return (
+        f"Saldo{_period(args)}: {format_currency(data['balance'])} "
+        f"(receitas {format_currency(data['income'])}, despesas {format_currency(data['expense'])}, "
+        f"{data['transactions']} transações)."
+    )
+
+
+def render_transactions_by_category(args: Dict[str, Any], data: Any, max_items: int = 10) -> str:
+    if not data:
+        return f"Nenhuma transação encontrada nessa categoria{_period(args)}."
+    category = data[0].get("category_name") or args.get("category_id")
+    total = sum(item["amount"] for item in data)
+    lines = [f"Transações de {category}{_period(args)}: {len(data)}, total de {format_currency(total)}."]
+    for item in sorted(data, key=lambda t: t["date"], reverse=True)[:max_items]:
+        lines.append(f"- {format_date(item['date'])}: {item.get('description') or 'sem descrição'} "
+                     f"— {format_currency(item['amount'])}")
+    if len(data) > max_items:
+        lines.append(f"... e mais {len(data) - max_items}.")
+    return "\n".join(lines)
+
+
+def render_created_transaction(args: Dict[str, Any], data: Any) -> str:
+    kind = TRANSACTION_TYPES.get(args.get("type"), "transação")
+    return (
+        f"Pronto! Registrei a {kind} \"{args.get('description')}\" de "
+        f"{format_currency(args['amount'])} em {format_date(args['date'])}."
+    )
+
+
+class ResponseTemplateRegistry:
+    """
+    Templates de resposta por ferramenta.
+
+    Quando todas as tool calls de uma resposta do LLM têm template e
+    retornaram com sucesso, a resposta final é montada localmente e a
+    segunda chamada ao LLM (só para redigir o texto) é evitada.
+    """
+
+    def __init__(self):
+        self._renderers: Dict[str, ResponseRenderer] = {}
+        self.stats = {
+            "rendered": 0,
+            "fallbacks": 0,
+            "llm_calls_saved": 0,
+            "by_tool": defaultdict(int),
+        }
+
+    @classmethod
+    def default(cls) -> "ResponseTemplateRegistry":
+        """Registro com as ferramentas simples (leituras e criação de transação)"""
+        registry = cls()
+        registry.register("get_categories", render_categories)
+        registry.register("get_transaction_by_id", render_transaction)
+        registry.register("get_top_spending_category", render_top_spending_category)
+        registry.register("get_balance", render_balance)
+        registry.register("get_transactions_by_category", render_transactions_by_category)
+        registry.register("create_transaction", render_created_transaction)
+        return registry
+
+    def register(self, tool_name: str, renderer: ResponseRenderer):
+        self._renderers[tool_name] = renderer
+
+    def supports(self, tool_calls: List[Dict]) -> bool:
+        """Todas as tool calls têm template?"""
+        return bool(tool_calls) and all(call["name"] in self._renderers for call in tool_calls)
+
+    def render(self,
+               tool_calls: List[Dict],
+               results: List[AgentResult],
+               llm_calls_saved: int = 1) -> Optional[str]:
+        """
+        Monta a resposta final a partir dos resultados das ferramentas
+
+        Args:
+            tool_calls: Tool calls pedidas pelo LLM, na ordem original
+            results: Resultados do orquestrador (ExecutionSummary.results)
+            llm_calls_saved: Chamadas ao LLM evitadas se o template for usado
+
+        Returns:
+            Texto da resposta ou None se for preciso chamar o LLM
+        """
+        if not self.supports(tool_calls):
+            return None
+
+        # Resultados da mesma ferramenta saem na ordem das tool calls
+        by_tool: Dict[str, deque] = defaultdict(deque)
+        for result in results:
+            by_tool[result.tool_name].append(result)
+
+        parts = []
+        for call in tool_calls:
+            result = by_tool[call["name"]].popleft() if by_tool[call["name"]] else None
+            payload = result.result if result and result.success else None
+            if not isinstance(payload, dict) or payload.get("status") != "success":
+                # Erro ou "não encontrado": o LLM explica melhor ao usuário
+                self.stats["fallbacks"] += 1
+                return None
+            try:
+                parts.append(self._renderers[call["name"]](call.get("args") or {}, payload.get("data")))
+            except Exception as e:
+                logger.warning(f"Falha no template de {call['name']}: {e}")
+                self.stats["fallbacks"] += 1
+                return None
+
+        self.stats["rendered"] += 1
+        self.stats["llm_calls_saved"] += llm_calls_saved
+        for call in tool_calls:
+            self.stats["by_tool"][call["name"]] += 1
+        return "\n\n".join(parts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Respostas montadas localmente e chamadas ao LLM economizadas"""
+        stats = {**self.stats, "by_tool": dict(self.stats["by_tool"])}
+        attempts = stats["rendered"] + stats["fallbacks"]
+        stats["render_rate"] = (stats["rendered"] / attempts * 100) if attempts else 0.0
+        stats["templates"] = sorted(self._renderers)
+        return stats
@@ -0,0 +1,133 @@
+# backend/app/api/llm/services/tool_selector.py
+
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from .intent_router import EDIT_VERBS_RE, IntentRouter, OTHER, WRITE_INTENTS, normalize
+
+logger = logging.getLogger(__name__)
+
+# Intenção -> ferramentas que o LLM pode precisar para respondê-la.
+# Os grupos são folgados de propósito: além da ferramenta principal, entram
+# as alternativas que o modelo costuma usar para a mesma pergunta.
+INTENT_TOOL_GROUPS = {
+    "top_spending": (
+        "get_top_spending_category",
+        "get_transactions_by_type_and_date_range",
+        "get_transactions_by_date_range",
+    ),
+    "balance": (
+        "get_balance",
+        "get_transactions_by_type_and_date_range",
+        "get_transactions_by_date_range",
+    ),
+    "expenses_by_category": (
+        "get_transactions_by_category",
+        "get_transactions_by_type_and_date_range",
+    ),
+    "add_expense": (
+        "create_transaction",
+    ),
+}
+
+# Vinculadas em todo subconjunto (o modelo precisa delas para resolver nomes de categoria)
+ALWAYS_BOUND = ("get_categories",)
+
+CHARS_PER_TOKEN = 4.0
+
+
+def schema_tokens(tool: BaseTool) -> int:
+    """Estimativa dos tokens que o schema da ferramenta ocupa no prompt"""
+    try:
+        schema = json.dumps(convert_to_openai_tool(tool), ensure_ascii=False)
+    except Exception:
+        schema = f"{getattr(tool, 'name', '')} {getattr(tool, 'description', '')}"
+    return int(len(schema) / CHARS_PER_TOKEN) + 1
+
+
+class ToolSelector:
+    """
+    Escolhe, por requisição, quais ferramentas vincular ao LLM.
+
+    A intenção vem do IntentRouter (padrões + naive Bayes); com confiança
+    suficiente só o grupo da intenção vai no prompt, do contrário todas as
+    ferramentas são vinculadas como antes. Pedidos para apagar ou corrigir
+    sempre recebem todas (os grupos não têm update/delete) e o subconjunto
+    de escrita só vale com o padrão imperativo, nunca só pelo modelo.
+    """
+
+    def __init__(self,
+                 intent_router: IntentRouter,
+                 groups: Optional[Dict[str, Iterable[str]]] = None,
+                 min_confidence: float = 0.6,
+                 always_bound: Iterable[str] = ALWAYS_BOUND):
+        self.intent_router = intent_router
+        self.groups = {
+            intent: frozenset(names) | frozenset(always_bound)
+            for intent, names in (groups or INTENT_TOOL_GROUPS).items()
+        }
+        self.min_confidence = min_confidence
+        self._schema_tokens: Dict[str, int] = {}
+
+        self.stats = {
+            "selections": 0,
+            "full_binding": 0,
+            "by_intent": defaultdict(int),
+            "schema_tokens_bound": 0,
+            "schema_tokens_saved": 0,
+        }
+
+    def measure(self, tools: List[BaseTool]):
+        """Registra o tamanho do schema de cada ferramenta vinculada"""
+        self._schema_tokens = {tool.name: schema_tokens(tool) for tool in tools}
+        unknown = {name for group in self.groups.values() for name in group} - set(self._schema_tokens)
+        if unknown:
+            logger.warning(f"Ferramentas dos grupos de intenção não vinculadas: {sorted(unknown)}")
+
+    def subsets(self) -> List[FrozenSet[str]]:
+        """Subconjuntos possíveis (para pré-vincular os clientes no provider)"""
+        return list(set(self.groups.values()))
+
+    def select(self, text: str) -> Optional[FrozenSet[str]]:
+        """
+        Ferramentas a vincular para a pergunta
+
+        Args:
+            text: Pergunta do usuário
+
+        Returns:
+            Nomes das ferramentas ou None para vincular todas
+        """
+        intent, confidence, source = self.intent_router.classify(text)
+        full = sum(self._schema_tokens.values())
+
+        subset = self.groups.get(intent)
+        if (intent == OTHER or subset is None or confidence < self.min_confidence
+                or EDIT_VERBS_RE.search(normalize(text))
+                or (intent in WRITE_INTENTS and source != "pattern")):
+            self.stats["full_binding"] += 1
+            self.stats["schema_tokens_bound"] += full
+            return None
+
+        bound = sum(self._schema_tokens.get(name, 0) for name in subset)
+        self.stats["selections"] += 1
+        self.stats["by_intent"][intent] += 1
+        self.stats["schema_tokens_bound"] += bound
+        self.stats["schema_tokens_saved"] += full - bound
+        logger.info(f"Intenção '{intent}' ({confidence:.2f}): vinculando {len(subset)} ferramentas "
+                    f"(~{full - bound} tokens de schema a menos)")
+        return subset
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Seleções por intenção e tokens de schema economizados"""
+        stats = {**self.stats, "by_intent": dict(self.stats["by_intent"])}
+        requests = stats["selections"] + stats["full_binding"]
+        stats["selection_rate"] = (stats["selections"] / requests * 100) if requests else 0.0
+        stats["schema_tokens_full"] = sum(self._schema_tokens.values())
+        stats["avg_schema_tokens_bound"] = (stats["schema_tokens_bound"] / requests) if requests else 0.0
+        return stats
@@ -419,8 +419,54 @@ def get_transactions_by_type_and_date_range(transaction_type: str, start_date: s
         logger.error(f"Erro ao buscar transações por tipo e data: {str(e)}")
         return {"status": "error", "message": str(e)}
 
+@tool
+def get_balance(start_date: str, end_date: str) -> dict:
+    """Calcula receitas, despesas e saldo em um intervalo de datas.
+
+    Args:
+        start_date: Data de início no formato 'YYYY-MM-DD'
+        end_date: Data de fim no formato 'YYYY-MM-DD'
+
+    Returns:
+        dict: Totais de receitas e despesas, saldo e quantidade de transações
+    """
+    try:
+        db = get_db_session()
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        rows = db.query(
+            TransactionModel.type,
+            func.sum(TransactionModel.amount),
+            func.count(TransactionModel.id)
+        ).filter(
+            TransactionModel.date >= start,
+            TransactionModel.date <= end
+        ).group_by(TransactionModel.type).all()
+        totals = {row[0]: (float(row[1] or 0), row[2]) for row in rows}
+        income = totals.get("income", (0.0, 0))
+        expense = totals.get("expense", (0.0, 0))
+        return {
+            "status": "success",
+            "data": {
+                "income": income[0],
+                "expense": expense[0],
+                "balance": income[0] - expense[0],
+                "transactions": income[1] + expense[1]
+            }
+        }
+    except Exception as e:
+        logger.error(f"Erro ao calcular saldo: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
 # --- Ponto de Entrada para as Ferramentas ---
 
+# Ferramentas que alteram transações (invalidam respostas em cache)
+WRITE_TOOL_NAMES = frozenset({
+    "create_transaction",
+    "update_transaction",
+    "delete_transaction",
+})
+
 def get_tools():
     """Retorna uma lista de todas as ferramentas disponíveis para o agente."""
     return [
@@ -437,4 +483,5 @@ def get_tools():
         get_transactions_by_type,
         get_transactions_by_description,
         get_transactions_by_type_and_date_range,
+        get_balance,
     ]
\ No newline at end of file
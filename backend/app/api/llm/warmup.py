@@ -0,0 +1,93 @@
+# backend/app/api/llm/warmup.py
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupState:
+    """
+    Aquecimento feito na inicialização (lifespan), componente a componente.
+
+    Cada etapa tem o tempo de cold start registrado e logado; /ready só
+    responde pronto quando todas as etapas obrigatórias terminaram bem.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self._required: set = set()
+
+    def start(self):
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self.components.clear()
+        self._required.clear()
+        logger.info("Aquecimento iniciado")
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+        logger.info(f"Aquecimento concluído em {self.finished_at - self.started_at:.3f}s "
+                    f"({'pronto' if self.ready else 'com falhas'})")
+
+    async def run_step(self,
+                       name: str,
+                       step: Callable[[], Awaitable[Any]],
+                       required: bool = True,
+                       timeout: Optional[float] = None) -> Any:
+        """
+        Executa e cronometra uma etapa
+
+        Args:
+            name: Nome do componente (aparece em /ready)
+            step: Função assíncrona que cria/aquece o componente
+            required: Falha deixa o serviço não pronto?
+            timeout: Limite em segundos
+
+        Returns:
+            Resultado da etapa ou None se falhou
+        """
+        if required:
+            self._required.add(name)
+        self.components[name] = {"status": "running", "required": required}
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(step(), timeout)
+        except Exception as e:
+            seconds = time.perf_counter() - started
+            self.components[name] = {"status": "error", "required": required,
+                                     "seconds": seconds, "error": str(e) or type(e).__name__}
+            logger.error(f"Aquecimento: falha em {name} após {seconds:.3f}s: {e}")
+            return None
+
+        seconds = time.perf_counter() - started
+        self.components[name] = {"status": "ok", "required": required, "seconds": seconds}
+        logger.info(f"Aquecimento: {name} pronto em {seconds:.3f}s")
+        return result
+
+    @property
+    def ready(self) -> bool:
+        """Sem aquecimento (modo preguiçoso) o serviço é considerado pronto"""
+        if not self.enabled:
+            return True
+        if self.finished_at is None:
+            return False
+        return all(self.components.get(name, {}).get("status") == "ok" for name in self._required)
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"ready": True, "warmup": "disabled", "components": {}}
+        elapsed_until = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return {
+            "ready": self.ready,
+            "warmup": "finished" if self.finished_at is not None else "running",
+            "elapsed_seconds": elapsed_until - self.started_at,
+            "checked_at": datetime.now().isoformat(),
+            "components": {name: dict(info) for name, info in self.components.items()},
+        }
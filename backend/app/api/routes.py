@@ -28,6 +28,10 @@ from app.api.models.models_response import (
 
 from .auth.auth_handler import sign_jwt
 from .auth.auth_bearer import JWTBearer
+from .llm.chat import get_redis_client
+# As ferramentas do chat consultam as transações de todos os usuários, então
+# qualquer alteração invalida as respostas em cache de todos os tenants
+from .llm.services.answer_cache import bump_data_version
 
 router = APIRouter()
 
@@ -343,7 +347,11 @@ async def get_transactions(db: Session = Depends(get_db)):
     response_model=TransactionResponse,
     dependencies=[Depends(JWTBearer())],
 )
-async def create_transaction(transaction: Transaction, db: Session = Depends(get_db)):
+async def create_transaction(
+    transaction: Transaction,
+    db: Session = Depends(get_db),
+    redis_client=Depends(get_redis_client),
+):
     validate_transaction(transaction)
     if not transaction.category_id:
         raise HTTPException(status_code=400, detail="Category ID is required")
@@ -354,6 +362,7 @@ async def create_transaction(transaction: Transaction, db: Session = Depends(get
     db.add(new_transaction)
     db.commit()
     db.refresh(new_transaction)
+    await bump_data_version(redis_client)
     return to_response(new_transaction, category.name)
 
 
@@ -364,7 +373,10 @@ async def create_transaction(transaction: Transaction, db: Session = Depends(get
     dependencies=[Depends(JWTBearer())],
 )
 async def update_transaction(
-    transaction: PutTransaction, transaction_id: int, db: Session = Depends(get_db)
+    transaction: PutTransaction,
+    transaction_id: int,
+    db: Session = Depends(get_db),
+    redis_client=Depends(get_redis_client),
 ):
     existing_transaction = (
         db.query(TransactionModel).filter(TransactionModel.id == transaction_id).first()
@@ -382,6 +394,7 @@ async def update_transaction(
     existing_transaction.date = datetime.fromisoformat(transaction.date)
     db.commit()
     db.refresh(existing_transaction)
+    await bump_data_version(redis_client)
     category_name = get_category_name(db, existing_transaction.category_id)
     return to_response(existing_transaction, category_name)
 
@@ -405,7 +418,11 @@ async def get_transaction_by_id(transaction_id: int, db: Session = Depends(get_d
     tags=["transactions"],
     dependencies=[Depends(JWTBearer())],
 )
-async def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
+async def delete_transaction(
+    transaction_id: int,
+    db: Session = Depends(get_db),
+    redis_client=Depends(get_redis_client),
+):
     transaction = (
         db.query(TransactionModel).filter(TransactionModel.id == transaction_id).first()
     )
@@ -413,6 +430,7 @@ async def delete_transaction(transaction_id: int, db: Session = Depends(get_db))
         raise HTTPException(status_code=404, detail="Transaction not found")
     db.delete(transaction)
     db.commit()
+    await bump_data_version(redis_client)
     return {"message": "Transaction deleted successfully"}
 
 
@@ -420,7 +438,9 @@ async def delete_transaction(transaction_id: int, db: Session = Depends(get_db))
     "/transactions/bulk", tags=["transactions"], dependencies=[Depends(JWTBearer())]
 )
 async def save_transactions(
-    transactions_data: List[Transaction], db: Session = Depends(get_db)
+    transactions_data: List[Transaction],
+    db: Session = Depends(get_db),
+    redis_client=Depends(get_redis_client),
 ):
     if not transactions_data:
         raise HTTPException(status_code=400, detail="No transactions provided")
@@ -437,6 +457,7 @@ async def save_transactions(
         new_transaction = build_transaction_model(transaction)
         db.add(new_transaction)
     db.commit()
+    await bump_data_version(redis_client)
     return {"message": "Transactions saved successfully"}
 
 
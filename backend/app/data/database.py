@@ -5,9 +5,30 @@ from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 
+from app.utils.metrics import REGISTRY
+
 # Substitua os valores conforme seu banco
 load_dotenv()
 DATABASE_URL = os.getenv("DB_URL")
 
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+DB_POOL_CONNECTIONS = REGISTRY.gauge(
+    "db_pool_connections", "Conexões do pool do banco relacional por estado", ["state"]
+)
+
+
+def collect_pool_metrics():
+    """Conexões em uso, livres e em overflow do pool (QueuePool)"""
+    pool = engine.pool
+    for state, method in (("checked_out", "checkedout"), ("checked_in", "checkedin"),
+                          ("overflow", "overflow"), ("size", "size")):
+        # Outros pools (SingletonThreadPool, StaticPool) não têm todos os métodos: size é um int
+        value = getattr(pool, method, None)
+        if callable(value):
+            # overflow() fica negativo enquanto o pool não enche
+            DB_POOL_CONNECTIONS.set(max(value(), 0), state=state)
+
+
+REGISTRY.register_collector(collect_pool_metrics)
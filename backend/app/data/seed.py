@@ -1,5 +1,4 @@
 from sqlalchemy.orm import Session
-from app.data.database import SessionLocal
 from app.data.models import Category
 
 # Dados padrão para categorias
@@ -19,6 +18,9 @@ def seed_categories(db: Session):
     db.commit()
 
 def main():
+    # Import tardio: seed_categories também é usado com bancos em memória (benchmark)
+    from app.data.database import SessionLocal
+
     db = SessionLocal()
     try:
         seed_categories(db)
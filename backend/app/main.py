@@ -1,14 +1,18 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
+import time
 from app.api import routes
 from app.api.llm import chat
+from app.utils.metrics import CONTENT_TYPE, REGISTRY
 import logging
 
 load_dotenv()
 
-app = FastAPI(title="FastAPI Backend",swagger_ui_parameters={"syntaxHighlighting": {"theme": "obsidian"}})
+# Aquecimento dos serviços do chat na subida (ver /api/ready)
+app = FastAPI(title="FastAPI Backend",swagger_ui_parameters={"syntaxHighlighting": {"theme": "obsidian"}},
+              lifespan=chat.lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -19,10 +23,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota", ["method", "route", "status"]
+)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latência por rota (o template, ex.: /api/transactions/{id}, para não explodir labels)"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
 # Include routes
 app.include_router(routes.router, prefix="/api")
 app.include_router(chat.router, prefix="/api", tags=["LLM"])
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas no formato texto do Prometheus"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 @app.get("/")
 async def root():
     """Rota raiz para verificar se o backend está funcionando."""
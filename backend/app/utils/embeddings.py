@@ -0,0 +1,336 @@
+# backend/app/utils/embeddings.py
+
+import json
+import os
+import re
+import threading
+import unicodedata
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+DEFAULT_DIM = 256
+
+# backend/data/vector_index, independente do diretório de trabalho
+DEFAULT_INDEX_PATH = str(Path(__file__).resolve().parents[2] / "data" / "vector_index")
+TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Converte para minúsculas e remove acentos ("mês" e "mes" viram a mesma feature)"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+class HashingEmbedder:
+    """
+    Embeddings locais, sem rede, por hashing de palavras e n-gramas de caracteres.
+
+    Os n-gramas de caracteres aproximam variações morfológicas
+    ("despesa"/"despesas"/"despesinha"), o que a busca literal não alcança.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, char_ngrams: Tuple[int, int] = (3, 4)):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+
+    def _features(self, text: str) -> List[str]:
+        """Extrai as features (palavras e n-gramas) de um texto"""
+        features = []
+        min_n, max_n = self.char_ngrams
+        for word in TOKEN_RE.findall(normalize_text(text)):
+            features.append(f"w:{word}")
+            padded = f" {word} "
+            for n in range(min_n, max_n + 1):
+                for i in range(len(padded) - n + 1):
+                    features.append(padded[i:i + n])
+        return features
+
+    def term_counts(self, text: str) -> np.ndarray:
+        """Vetor de contagens com sinal (hashing trick) para um texto"""
+        features = self._features(text)
+        if not features:
+            return np.zeros(self.dim, dtype=np.float32)
+
+        hashes = np.fromiter(
+            (zlib.crc32(feature.encode("utf-8")) for feature in features),
+            dtype=np.uint64,
+            count=len(features),
+        )
+        buckets = (hashes % self.dim).astype(np.intp)
+        signs = np.where(hashes & 0x80000000, 1.0, -1.0)
+        return np.bincount(buckets, weights=signs, minlength=self.dim).astype(np.float32)
+
+    def embed(self, text: str, idf: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Gera o embedding normalizado (L2) de um texto
+
+        Args:
+            text: Texto de entrada
+            idf: Pesos IDF por bucket (opcional, usado no lado da consulta)
+
+        Returns:
+            Vetor float32 de dimensão `dim`
+        """
+        counts = self.term_counts(text)
+        vector = np.sign(counts) * np.log1p(np.abs(counts))
+        if idf is not None:
+            vector = vector * idf
+        norm = np.linalg.norm(vector)
+        return (vector / norm).astype(np.float32) if norm else vector.astype(np.float32)
+
+
+class VectorIndex:
+    """
+    Índice vetorial em disco (matriz memory-mapped) com busca top-k por um
+    único produto matriz-vetor.
+
+    Layout do diretório:
+        vectors.f32  - matriz float32 (capacidade x dim)
+        keys.jsonl   - uma chave (elementId do nó no Neo4j) por linha
+        df.npy       - frequência de documentos por bucket (para o IDF)
+        meta.json    - dimensão, quantidade e capacidade atuais
+        write.lock   - trava de escrita entre processos (flock)
+
+    Os vetores gravados são TF normalizados; o IDF é aplicado apenas na
+    consulta, assim novas ingestões não invalidam as linhas já gravadas.
+    Várias instâncias (inclusive em processos diferentes) podem ingerir no
+    mesmo diretório; sem fcntl (Windows) use um único processo escritor.
+    """
+
+    MATRIX_FILE = "vectors.f32"
+    KEYS_FILE = "keys.jsonl"
+    DF_FILE = "df.npy"
+    META_FILE = "meta.json"
+    LOCK_FILE = "write.lock"
+
+    def __init__(self,
+                 path: str,
+                 dim: int = DEFAULT_DIM,
+                 embedder: HashingEmbedder = None,
+                 read_only: bool = False,
+                 initial_capacity: int = 1024):
+        self.path = path
+        self.read_only = read_only
+        self.initial_capacity = initial_capacity
+        self._lock = threading.Lock()
+
+        if not read_only:
+            os.makedirs(path, exist_ok=True)
+
+        meta = self._read_meta()
+        self.dim = meta.get("dim", dim)
+        self.embedder = embedder or HashingEmbedder(self.dim)
+
+        self.count = 0
+        self.capacity = 0
+        self.keys: List[str] = []
+        self._keys_offset = 0
+        self._matrix: Optional[np.memmap] = None
+        self.doc_freq = np.zeros(self.dim, dtype=np.float64)
+        self.doc_count = 0
+
+        self.refresh()
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """Indica se já existe um índice gravado no diretório"""
+        return os.path.exists(os.path.join(path, cls.META_FILE))
+
+    # ------------------------------------------
+    # Persistência
+    # ------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self._file(self.META_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_meta(self):
+        """Grava meta.json de forma atômica (leitores nunca veem arquivo parcial)"""
+        tmp_path = self._file(self.META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "count": self.count,
+                "capacity": self.capacity,
+                "doc_count": self.doc_count,
+            }, f)
+        os.replace(tmp_path, self._file(self.META_FILE))
+
+    def _map_matrix(self, capacity: int):
+        if capacity == 0:
+            self._matrix = None
+        else:
+            mode = "r" if self.read_only else "r+"
+            self._matrix = np.memmap(
+                self._file(self.MATRIX_FILE), dtype=np.float32, mode=mode,
+                shape=(capacity, self.dim),
+            )
+        self.capacity = capacity
+
+    def _ensure_capacity(self, needed: int):
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2, self.initial_capacity)
+        if self._matrix is not None:
+            self._matrix.flush()
+        with open(self._file(self.MATRIX_FILE), "ab") as f:
+            f.truncate(new_capacity * self.dim * np.dtype(np.float32).itemsize)
+        self._map_matrix(new_capacity)
+
+    @contextmanager
+    def _write_lock(self):
+        """Exclusão entre threads (Lock) e entre processos (flock em write.lock)"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._file(self.LOCK_FILE), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Recarrega o que outro processo tenha ingerido desde a última leitura"""
+        meta = self._read_meta()
+        if meta.get("count", 0) == self.count and self._matrix is not None:
+            return
+
+        with self._lock:
+            self._load(meta)
+
+    def _load(self, meta: dict):
+        """Lê do disco capacidade, chaves novas e frequências (chamar com a trava)"""
+        count = meta.get("count", 0)
+        if meta.get("capacity", 0) != self.capacity:
+            self._map_matrix(meta.get("capacity", 0))
+
+        keys_path = self._file(self.KEYS_FILE)
+        if os.path.exists(keys_path):
+            with open(keys_path) as f:
+                f.seek(self._keys_offset)
+                while len(self.keys) < count:
+                    line = f.readline()
+                    if not line:
+                        break
+                    self.keys.append(json.loads(line))
+                self._keys_offset = f.tell()
+
+        df_path = self._file(self.DF_FILE)
+        if os.path.exists(df_path):
+            self.doc_freq = np.load(df_path)
+        self.doc_count = meta.get("doc_count", 0)
+        self.count = min(count, len(self.keys))
+
+    # ------------------------------------------
+    # Ingestão incremental
+    # ------------------------------------------
+
+    def add_vectors(self, keys: Sequence[str], vectors: np.ndarray, doc_freq: np.ndarray = None):
+        """
+        Acrescenta vetores já calculados (uma linha por chave)
+
+        Args:
+            keys: Chaves das linhas
+            vectors: Matriz (len(keys) x dim)
+            doc_freq: Buckets presentes por documento, somados ao IDF (opcional)
+        """
+        if self.read_only:
+            raise RuntimeError("Índice aberto somente para leitura")
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), self.dim)
+
+        with self._write_lock():
+            # Outro processo pode ter gravado desde a última leitura: anexa depois dele
+            self._load(self._read_meta())
+            if doc_freq is not None:
+                self.doc_freq = self.doc_freq + doc_freq
+                self.doc_count += len(keys)
+                np.save(self._file(self.DF_FILE), self.doc_freq)
+
+            start = self.count
+            self._ensure_capacity(start + len(keys))
+            self._matrix[start:start + len(keys)] = vectors
+            self._matrix.flush()
+
+            with open(self._file(self.KEYS_FILE), "a") as f:
+                for key in keys:
+                    f.write(json.dumps(key) + "\n")
+                self._keys_offset = f.tell()
+
+            self.keys.extend(keys)
+            self.count += len(keys)
+            self._write_meta()
+
+    def add_texts(self, items: Iterable[Tuple[str, str]]):
+        """
+        Indexa textos incrementalmente
+
+        Args:
+            items: Pares (chave, texto)
+        """
+        keys, vectors = [], []
+        doc_freq = np.zeros(self.dim, dtype=np.float64)
+        for key, text in items:
+            doc_freq += self.embedder.term_counts(text) != 0
+            keys.append(key)
+            vectors.append(self.embedder.embed(text))
+
+        if not keys:
+            return
+
+        self.add_vectors(keys, np.vstack(vectors), doc_freq=doc_freq)
+
+    def add_text(self, key: str, text: str):
+        """Indexa um único texto"""
+        self.add_texts([(key, text)])
+
+    # ------------------------------------------
+    # Busca
+    # ------------------------------------------
+
+    def idf(self) -> np.ndarray:
+        """Pesos IDF suavizados por bucket"""
+        return (np.log((1 + self.doc_count) / (1 + self.doc_freq)) + 1).astype(np.float32)
+
+    def search_vector(self, query: np.ndarray, k: int = 5) -> List[Tuple[str, float]]:
+        """Top-k por similaridade (produto interno) com um vetor de consulta"""
+        if self.count == 0 or not np.any(query):
+            return []
+
+        scores = self._matrix[:self.count] @ query
+        k = min(k, self.count)
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(-scores[top])]
+        return [(self.keys[i], float(scores[i])) for i in top]
+
+    def search(self, text: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Busca semântica pelos k textos mais próximos
+
+        Args:
+            text: Consulta em linguagem natural
+            k: Quantidade de resultados
+            min_score: Similaridade mínima para considerar um resultado
+
+        Returns:
+            Lista de (chave, score) em ordem decrescente de score
+        """
+        self.refresh()
+        query = self.embedder.embed(text, idf=self.idf())
+        return [(key, score) for key, score in self.search_vector(query, k) if score >= min_score]
@@ -0,0 +1,215 @@
+# backend/app/utils/metrics.py
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: de comandos do Redis (ms) a chamadas de LLM (dezenas de segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value != value:
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class _Metric:
+    """Base das métricas: valores por combinação de labels"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Métrica {self.name} espera labels {self.labelnames}, recebeu {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: Iterable[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f"{name}=\"{_escape(value)}\"" for name, value in pairs) + "}"
+
+    def _samples(self, key: Tuple[str, ...], value: Any) -> List[str]:
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}"]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    """Total que só cresce (requisições, tokens, erros)"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Contador não pode diminuir")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels):
+        """Total mantido por outro componente (lido por um coletor na raspagem)"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Valor instantâneo (conexões em uso, fila, hit rate)"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    """Distribuição de latências em buckets cumulativos, com soma e contagem"""
+
+    kind = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Cronometra o bloco (registrado também se ele falhar)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def get(self, **labels) -> Dict[str, Any]:
+        state = self._values.get(self._key(labels))
+        if state is None:
+            return {"count": 0, "sum": 0.0}
+        return {"count": state["count"], "sum": state["sum"]}
+
+    def _samples(self, key: Tuple[str, ...], state: Dict[str, Any]) -> List[str]:
+        lines = [
+            f"{self.name}_bucket{self._labels(key, [('le', _format_value(bound))])} {count}"
+            for bound, count in zip(self.buckets, state["buckets"])
+        ]
+        lines.append(f"{self.name}_bucket{self._labels(key, [('le', '+Inf')])} {state['count']}")
+        lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{self._labels(key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas exposto em /metrics (formato texto do Prometheus).
+
+    Os módulos declaram suas métricas no import (pegar ou criar pelo nome);
+    coletores registrados atualizam, na raspagem, valores que outros
+    componentes já mantêm (pool do banco, estatísticas de cache).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric_class, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not metric_class or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Métrica {name} já registrada como {metric.kind} com labels {metric.labelnames}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self,
+                  name: str,
+                  documentation: str,
+                  labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], None]):
+        """Função chamada antes de cada raspagem"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Todas as métricas no formato de exposição em texto"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Coletor de métricas {getattr(collector, '__name__', collector)} falhou: {e}")
+
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+# Registro padrão do processo
+REGISTRY = MetricsRegistry()
@@ -1,8 +1,12 @@
 from neo4j import GraphDatabase
 import os
 
+from app.utils.embeddings import DEFAULT_INDEX_PATH, VectorIndex
+
+DEFAULT_VECTOR_INDEX_PATH = os.getenv("RAG_VECTOR_INDEX_PATH", DEFAULT_INDEX_PATH)
+
 class RAGStore:
-    def __init__(self):
+    def __init__(self, vector_index_path: str = DEFAULT_VECTOR_INDEX_PATH):
         self.neo4j_uri = "bolt://neo4j:7687"
         self.neo4j_user = "neo4j"
         self.neo4j_password = "password"
@@ -10,26 +14,34 @@ class RAGStore:
             self.neo4j_uri,
             auth=(self.neo4j_user, self.neo4j_password)
         )
+        # Embeddings locais, atualizados a cada ingestão
+        self.vector_index = VectorIndex(vector_index_path)
 
     def add_document(self, content: str, metadata: dict = None):
         """Add a document to the RAG store"""
         with self.driver.session() as session:
-            session.run(
+            record = session.run(
                 """
                 CREATE (d:Document {
                     text: $content,
                     created_at: datetime(),
                     metadata: $metadata
                 })
+                RETURN elementId(d) AS node_id
                 """,
                 content=content,
                 metadata=metadata or {}
-            )
+            ).single()
+
+        if record:
+            self.vector_index.add_text(record["node_id"], content)
+            return record["node_id"]
+        return None
 
     def add_chunk(self, content: str, document_id: str, metadata: dict = None):
         """Add a chunk of text to the RAG store"""
         with self.driver.session() as session:
-            session.run(
+            record = session.run(
                 """
                 MATCH (d:Document {id: $document_id})
                 CREATE (c:Chunk {
@@ -38,11 +50,17 @@ class RAGStore:
                     metadata: $metadata
                 })
                 CREATE (d)-[:HAS_CHUNK]->(c)
+                RETURN elementId(c) AS node_id
                 """,
                 document_id=document_id,
                 content=content,
                 metadata=metadata or {}
-            )
+            ).single()
+
+        if record:
+            self.vector_index.add_text(record["node_id"], content)
+            return record["node_id"]
+        return None
 
     def search(self, query: str, limit: int = 5):
         """Search for relevant chunks based on query"""
@@ -59,6 +77,28 @@ class RAGStore:
             )
             return [{"text": record[0], "metadata": record[1]} for record in result]
 
+    def semantic_search(self, query: str, limit: int = 5):
+        """Search for semantically similar nodes using the local embedding index"""
+        hits = self.vector_index.search(query, k=limit)
+        if not hits:
+            return []
+
+        scores = dict(hits)
+        with self.driver.session() as session:
+            result = session.run(
+                """
+                MATCH (n)
+                WHERE elementId(n) IN $node_ids
+                RETURN elementId(n) AS node_id, n.text AS text, n.metadata AS metadata
+                """,
+                node_ids=list(scores.keys())
+            )
+            found = [
+                {"text": record["text"], "metadata": record["metadata"], "score": scores[record["node_id"]]}
+                for record in result
+            ]
+        return sorted(found, key=lambda item: item["score"], reverse=True)
+
 # Example usage
 if __name__ == "__main__":
     rag = RAGStore()
@@ -0,0 +1,15 @@
+# backend/benchmarks/multiagent_benchmark.py
+"""
+Benchmark ponta a ponta LangGraph x orquestrador customizado (offline).
+
+Uso (a partir de backend/):
+    python -m benchmarks.multiagent_benchmark --iterations 5 --llm-latency 0.3 --output resultado.json
+
+A implementação fica em app/api/llm/multiagent/benchmark.py, compartilhada
+com a rota POST /api/admin/benchmark.
+"""
+
+from app.api.llm.multiagent.benchmark import main
+
+if __name__ == "__main__":
+    main()
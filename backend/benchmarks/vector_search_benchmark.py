@@ -0,0 +1,66 @@
+# backend/benchmarks/vector_search_benchmark.py
+"""
+Benchmark da busca top-k do índice vetorial local.
+
+Uso (a partir de backend/):
+    python -m benchmarks.vector_search_benchmark --rows 1000000 --dim 256
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from app.utils.embeddings import VectorIndex
+
+
+def build_index(path: str, rows: int, dim: int, batch_size: int = 100_000) -> VectorIndex:
+    """Preenche um índice com vetores aleatórios normalizados"""
+    rng = np.random.default_rng(42)
+    index = VectorIndex(path, dim=dim, initial_capacity=rows)
+    for start in range(0, rows, batch_size):
+        size = min(batch_size, rows - start)
+        vectors = rng.standard_normal((size, dim), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        index.add_vectors([f"chunk-{start + i}" for i in range(size)], vectors)
+    return index
+
+
+def run(rows: int, dim: int, queries: int, k: int):
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        build_index(path, rows, dim)
+        build_time = time.perf_counter() - start
+
+        # Abre como leitor, do mesmo jeito que o RAGService
+        index = VectorIndex(path, read_only=True)
+        rng = np.random.default_rng(7)
+        query_vectors = rng.standard_normal((queries, dim), dtype=np.float32)
+
+        index.search_vector(query_vectors[0], k)  # aquece o page cache
+        timings = []
+        for query in query_vectors:
+            start = time.perf_counter()
+            index.search_vector(query, k)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        print(f"Vetores: {rows} x {dim} ({os.path.getsize(os.path.join(path, VectorIndex.MATRIX_FILE)) / 1e6:.0f} MB)")
+        print(f"Construção: {build_time:.1f}s")
+        print(f"Top-{k} em {queries} consultas: "
+              f"p50={statistics.median(timings):.2f}ms "
+              f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms "
+              f"max={timings[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.dim, args.queries, args.k)
@@ -0,0 +1,82 @@
+import asyncio
+
+from app.api.llm.multiagent.benchmark import ScriptedLLMProvider, StaticContextService
+from app.api.llm.multiagent.hybrid_conversation_service import HybridConversationService
+from app.api.llm.services.answer_cache import AnswerCache
+
+
+def test_answer_cache_hit_similar_e_invalidacao(fake_redis):
+    async def scenario():
+        cache = AnswerCache(fake_redis, similarity_threshold=0.8)
+        assert await cache.get("7", "Qual a maior despesa do mês?") is None
+
+        await cache.set("7", "Qual a maior despesa do mês?", "Moradia", "", latency=2.5)
+        exact = await cache.get("7", "qual a maior despesa do mes")
+        similar = await cache.get("7", "qual a maior despesa do mês???  ")
+        other_tenant = await cache.get("8", "Qual a maior despesa do mês?")
+
+        await cache.invalidate()
+        after_change = await cache.get("7", "Qual a maior despesa do mês?")
+        return cache, exact, similar, other_tenant, after_change
+
+    cache, exact, similar, other_tenant, after_change = asyncio.run(scenario())
+
+    assert exact["response"] == "Moradia"
+    assert similar["response"] == "Moradia"
+    assert other_tenant is None
+    assert after_change is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["saved_latency_seconds"] == 5.0
+
+
+def test_answer_cache_near_duplicate(fake_redis):
+    async def scenario():
+        cache = AnswerCache(fake_redis, similarity_threshold=0.7)
+        await cache.set("7", "qual foi a maior despesa do mês", "Moradia", "", latency=1.0)
+        return cache, await cache.get("7", "qual a maior despesa deste mês")
+
+    cache, entry = asyncio.run(scenario())
+    assert entry["response"] == "Moradia"
+    assert cache.get_stats()["near_duplicate_hits"] == 1
+
+
+def test_similar_so_com_as_mesmas_palavras_de_conteudo(fake_redis):
+    async def scenario():
+        cache = AnswerCache(fake_redis, similarity_threshold=0.5)
+        await cache.set("7", "Mostre a transação 12", "Transação 12: R$ 50", "", latency=1.0)
+        await cache.set("7", "Quanto gastei em janeiro de 2024?", "R$ 900", "", latency=1.0)
+        return cache, [
+            await cache.get("7", "Mostre a transação 13"),
+            await cache.get("7", "Quanto gastei em janeiro de 2025?"),
+            await cache.get("7", "Quanto gastei em fevereiro de 2024?"),
+            await cache.get("7", "Quanto eu gastei em janeiro de 2024?"),
+        ]
+
+    cache, (other_id, other_year, other_month, filler) = asyncio.run(scenario())
+    assert other_id is None and other_year is None and other_month is None
+    assert filler["response"] == "R$ 900"
+    assert AnswerCache(fake_redis).similarity_threshold is None
+
+
+def test_erros_e_respostas_vazias_nao_entram_no_cache(fake_redis):
+    cache = AnswerCache(fake_redis)
+    service = HybridConversationService(
+        llm_provider=ScriptedLLMProvider(), rag_service=StaticContextService(), answer_cache=cache
+    )
+    replies = iter(["Erro no processamento: timeout", "   ", "Saldo: R$ 10"])
+
+    async def process_with_llm(message, user_id, context):
+        return next(replies), False
+
+    service._process_with_llm = process_with_llm
+
+    async def scenario():
+        for _ in range(3):
+            await service.process_conversation("Qual meu saldo?", "7", None)
+        return await cache.get("7", "Qual meu saldo?")
+
+    assert asyncio.run(scenario())["response"] == "Saldo: R$ 10"
+    assert cache.get_stats()["stores"] == 1
@@ -0,0 +1,80 @@
+import asyncio
+
+from app.api.llm.cache import CacheSweeper, LocalTTLCache, TieredCache, VersionedNamespace
+
+
+def test_bump_invalida_e_sweeper_remove_geracoes_antigas(fake_redis):
+    async def scenario():
+        namespace = VersionedNamespace(fake_redis, "context")
+        sweeper = CacheSweeper(namespace, batch_size=2, pause_seconds=0)
+
+        for i in range(5):
+            await fake_redis.set(namespace.key(0, f"q{i}"), "antigo")
+        await fake_redis.set("context:legacyhash", "formato antigo")
+        await fake_redis.set("answer:7:0.0:abc", "outro namespace")
+
+        generation = await namespace.bump()
+        await fake_redis.set(namespace.key(generation, "q0"), "novo")
+
+        await sweeper.schedule()
+        return generation, sweeper
+
+    generation, sweeper = asyncio.run(scenario())
+
+    assert generation == 1
+    assert sorted(fake_redis.data) == ["answer:7:0.0:abc", "context:1:q0", "context:generation"]
+    assert sweeper.stats["keys_removed"] == 6
+
+
+def test_tiered_cache_hit_local_sem_ida_ao_redis(fake_redis):
+    async def scenario():
+        cache = TieredCache(VersionedNamespace(fake_redis, "context"), LocalTTLCache(max_entries=2))
+        await cache.set("q1", b"contexto")
+        calls_before = fake_redis.calls
+        local_value = await cache.get("q1")
+        calls_after = fake_redis.calls
+
+        # Outro worker sem a entrada em memória busca no Redis
+        other_worker = TieredCache(VersionedNamespace(fake_redis, "context"))
+        redis_value = await other_worker.get("q1")
+
+        generation = await cache.invalidate()
+        miss = await cache.get("q1")
+        return cache, other_worker, local_value, calls_after - calls_before, redis_value, generation, miss
+
+    cache, other_worker, local_value, redis_calls, redis_value, generation, miss = asyncio.run(scenario())
+
+    assert local_value == b"contexto"
+    assert redis_calls == 0
+    assert redis_value == b"contexto"
+    assert miss is None
+    assert fake_redis.published == [("context:invalidations", generation)]
+    assert cache.get_stats()["local_hits"] == 1
+    assert other_worker.get_stats()["redis_hits"] == 1
+
+    # Mensagem de pub/sub recebida pelo outro worker descarta a camada local
+    other_worker._apply_generation(generation)
+    assert len(other_worker.local) == 0
+
+
+def test_get_or_compute_calcula_uma_vez_e_cacheia_vazio(fake_redis):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return b""
+
+    async def scenario():
+        cache = TieredCache(VersionedNamespace(fake_redis, "context"), early_refresh_beta=0)
+        concurrent = await asyncio.gather(*(cache.get_or_compute("q1", compute) for _ in range(10)))
+        again = await cache.get_or_compute("q1", compute)
+        return cache, concurrent, again
+
+    cache, concurrent, again = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert concurrent == [b""] * 10 and again == b""
+    stats = cache.get_stats()
+    assert stats["single_flight"] == {"leaders": 1, "followers": 9}
+    assert stats["negative_hits"] == 1
@@ -0,0 +1,51 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.api.llm.providers import LLMProviderFactory
+from app.api.llm.providers.base_provider import BaseLLMProvider
+
+
+class CountingProvider(BaseLLMProvider):
+    def __init__(self, temperature=0.0):
+        super().__init__("stub-model", temperature)
+        self.calls = 0
+
+    def _initialize_llm(self, tools):
+        return object()
+
+    async def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content=f"resposta {self.calls}", id=f"run-{self.calls}")
+
+
+def test_cache_de_respostas_identicas_em_memoria_e_redis(fake_redis):
+    async def scenario(provider):
+        cached = provider.bind_tools([])
+        first = await cached.invoke([HumanMessage(content="Quais categorias existem?")])
+        second = await cached.invoke([HumanMessage(content="Quais categorias existem?")])
+        other = await cached.invoke([HumanMessage(content="Qual a maior despesa?")])
+        return first, second, other
+
+    for backend in ("memory", "redis"):
+        inner = CountingProvider()
+        provider = LLMProviderFactory.wrap_with_cache(inner, backend=backend, redis_client=fake_redis)
+        first, second, other = asyncio.run(scenario(provider))
+
+        assert inner.calls == 2
+        assert second.content == first.content == "resposta 1"
+        assert other.content == "resposta 2"
+        assert provider.get_stats()["hits"] == 1
+
+
+def test_cache_ignorado_com_temperatura_alta():
+    inner = CountingProvider(temperature=0.9)
+    provider = LLMProviderFactory.wrap_with_cache(inner).bind_tools([])
+
+    async def scenario():
+        for _ in range(2):
+            await provider.invoke([HumanMessage(content="oi")])
+
+    asyncio.run(scenario())
+    assert inner.calls == 2
+    assert provider.get_stats()["bypassed"] == 2
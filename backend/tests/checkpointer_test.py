@@ -0,0 +1,49 @@
+import asyncio
+
+from app.api.llm.multiagent.benchmark import ScriptedLLMProvider, run_offline_benchmark
+from app.api.llm.multiagent.checkpointer import (
+    SQLITE_CHECKPOINTER_AVAILABLE,
+    BoundedMemorySaver,
+    create_checkpointer,
+)
+from app.api.llm.multiagent.langgraph_implementation import LangGraphFinancialMultiAgent
+
+
+def run(agent, runs):
+    for index in range(runs):
+        asyncio.run(agent.process_financial_query(f"Liste minhas receitas {index}", f"u{index}"))
+
+
+def test_descarta_threads_antigas_e_reporta_bytes():
+    checkpointer = BoundedMemorySaver(max_threads=3, ttl_seconds=0)
+    agent = LangGraphFinancialMultiAgent(ScriptedLLMProvider(), checkpointer=checkpointer)
+
+    run(agent, 6)
+
+    stats = checkpointer.get_stats()
+    assert stats["retained_threads"] == 3 == len(checkpointer.storage)
+    assert stats["evictions"]["lru"] == 3
+    assert stats["retained_bytes"] > 0
+
+
+def test_teto_de_memoria_e_ttl():
+    checkpointer = BoundedMemorySaver(max_threads=100, ttl_seconds=0, max_bytes=1)
+    agent = LangGraphFinancialMultiAgent(ScriptedLLMProvider(), checkpointer=checkpointer)
+    run(agent, 3)
+    # Só a execução mais recente fica, mesmo acima do teto
+    assert checkpointer.get_stats()["retained_threads"] == 1
+    assert checkpointer.get_stats()["evictions"]["memory"] == 2
+
+    checkpointer.tracker.ttl_seconds = 1e-9
+    checkpointer.max_bytes = None
+    run(agent, 1)
+    assert checkpointer.get_stats()["evictions"]["ttl"] == 1
+
+    if not SQLITE_CHECKPOINTER_AVAILABLE:
+        # Sem o pacote opcional, volta para a memória
+        assert isinstance(create_checkpointer("sqlite"), BoundedMemorySaver)
+
+
+def test_benchmark_reporta_checkpoints():
+    results = asyncio.run(run_offline_benchmark(iterations=1, warmup=0, transactions=50))
+    assert 0 < results["checkpointer"]["retained_threads"] <= 256
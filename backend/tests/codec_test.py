@@ -0,0 +1,28 @@
+from app.api.llm.cache import CacheCodec
+
+
+def test_codec_comprime_acima_do_limite_e_preserva_tipos():
+    codec = CacheCodec(compression_threshold=64)
+    context = "Gastos com moradia e alimentação no mês. " * 50
+    answer = {"response": "Moradia", "context": context, "latency": 2.5}
+
+    small = codec.encode(b"curto")
+    big_text = codec.encode(context)
+    structured = codec.encode(answer)
+
+    assert codec.decode(small) == b"curto"
+    assert codec.decode(big_text) == context
+    assert codec.decode(structured) == answer
+    assert len(big_text) < len(context.encode()) / 5
+
+    stats = codec.get_stats()
+    assert stats["encoded"] == 3
+    assert stats["compressed"] == 2
+    assert stats["stored_bytes"] < stats["original_bytes"]
+    assert stats["compression_ratio"] > 1
+
+
+def test_codec_le_valores_gravados_antes_do_cabecalho():
+    codec = CacheCodec()
+    assert codec.decode("contexto antigo".encode()) == b"contexto antigo"
+    assert codec.get_stats()["legacy_values"] == 1
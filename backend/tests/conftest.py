@@ -0,0 +1,51 @@
+import fnmatch
+
+import pytest
+
+
+class FakeRedis:
+    """Subconjunto assíncrono do cliente Redis usado pelos caches"""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        self.calls += 1
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    async def mget(self, *keys):
+        self.calls += 1
+        return [self.data.get(key) for key in keys]
+
+    async def incr(self, key):
+        self.calls += 1
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+    async def unlink(self, *keys):
+        self.calls += 1
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    async def publish(self, channel, message):
+        self.calls += 1
+        self.published.append((channel, message))
+        return 0
+
+    async def scan_iter(self, match="*", count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key.encode()
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
@@ -0,0 +1,49 @@
+import numpy as np
+
+from app.utils.embeddings import HashingEmbedder, VectorIndex
+
+
+def test_embedder_aproxima_variacoes_da_mesma_palavra():
+    embedder = HashingEmbedder()
+    base = embedder.embed("maior despesa do mês")
+    parafrase = embedder.embed("quais foram as despesas do mes")
+    outro_assunto = embedder.embed("cadastro de empresa parceira")
+    assert float(base @ parafrase) > float(base @ outro_assunto)
+
+
+def test_vector_index_busca_incremental_e_persistente(tmp_path):
+    index = VectorIndex(str(tmp_path), initial_capacity=2)
+    index.add_text("doc-1", "Orçamento mensal de despesas com alimentação")
+    index.add_text("doc-2", "Investimentos em renda fixa e tesouro direto")
+    index.add_text("doc-3", "Despesas com transporte e combustível")
+
+    assert index.capacity >= 3
+    assert index.search("gastos com alimentação", k=1)[0][0] == "doc-1"
+
+    # Um leitor em outro processo enxerga o que foi ingerido depois de aberto
+    reader = VectorIndex(str(tmp_path), read_only=True)
+    index.add_text("doc-4", "Aplicações em tesouro direto e CDB")
+    keys = [key for key, _ in reader.search("tesouro direto", k=2)]
+    assert set(keys) == {"doc-2", "doc-4"}
+
+
+def test_search_vector_ordena_por_score(tmp_path):
+    index = VectorIndex(str(tmp_path), dim=4)
+    index.add_vectors(["a", "b", "c"], np.eye(3, 4, dtype=np.float32))
+    query = np.array([0.1, 0.9, 0.5, 0.0], dtype=np.float32)
+    assert [key for key, _ in index.search_vector(query, k=2)] == ["b", "c"]
+
+
+def test_dois_escritores_no_mesmo_diretorio_nao_sobrescrevem_linhas(tmp_path):
+    # Instâncias separadas fazem o papel de processos: cada uma com sua contagem em memória
+    first = VectorIndex(str(tmp_path), initial_capacity=2)
+    second = VectorIndex(str(tmp_path), initial_capacity=2)
+    first.add_text("doc-1", "Orçamento mensal de despesas com alimentação")
+    second.add_text("doc-2", "Investimentos em renda fixa e tesouro direto")
+    first.add_text("doc-3", "Despesas com transporte e combustível")
+
+    reader = VectorIndex(str(tmp_path), read_only=True)
+    assert reader.keys == ["doc-1", "doc-2", "doc-3"]
+    assert reader.doc_count == 3
+    assert reader.search("tesouro direto", k=1)[0][0] == "doc-2"
+    assert reader.search("gastos com alimentação", k=1)[0][0] == "doc-1"
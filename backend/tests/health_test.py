@@ -0,0 +1,112 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from app.api.llm import chat
+from app.api.llm.health import HealthProber
+from app.api.llm.multiagent.benchmark import ScriptedLLMProvider
+from app.api.llm.providers.cached_provider import CachingProvider
+from app.main import app
+
+
+class PingClient:
+    def __init__(self):
+        self.calls = []
+
+    async def ainvoke(self, messages):
+        self.calls.append(messages)
+        return AIMessage(content="pong")
+
+
+class PingRecorder(ScriptedLLMProvider):
+    def __init__(self):
+        super().__init__()
+        self.client = PingClient()
+        self.bound = []
+
+    def _initialize_llm(self, tools):
+        self.bound.append(list(tools))
+        return self.client
+
+
+def test_prober_guarda_resultados_com_timeout_por_dependencia():
+    calls = {"redis": 0}
+
+    async def redis_ok():
+        calls["redis"] += 1
+
+    async def neo4j_slow():
+        await asyncio.sleep(1)
+
+    prober = HealthProber(interval=60)
+    prober.register("redis", redis_ok)
+    prober.register("neo4j", neo4j_slow, timeout=0.05)
+    assert prober.snapshot()["status"] == "starting"
+
+    asyncio.run(prober.check_all())
+    snapshot = prober.snapshot()
+    assert snapshot["status"] == "unhealthy"
+    assert snapshot["dependencies"]["redis"]["status"] == "healthy"
+    assert "timeout" in snapshot["dependencies"]["neo4j"]["error"]
+    assert snapshot["dependencies"]["redis"]["age_seconds"] >= 0
+
+    # Dentro do intervalo nada é verificado de novo
+    asyncio.run(prober.check_due())
+    assert calls["redis"] == 1
+
+
+def test_ping_do_llm_sem_ferramentas_e_sem_cache():
+    inner = PingRecorder()
+    provider = CachingProvider(inner)
+    assert provider.last_success_at is None
+
+    asyncio.run(provider.ping())
+    asyncio.run(provider.ping())
+
+    assert inner.bound == [[]]
+    assert len(inner.client.calls) == 2
+    assert provider.stats["hits"] == provider.stats["misses"] == 0
+    assert provider.last_success_at is not None
+
+
+def test_health_responde_do_snapshot(monkeypatch):
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        return {"source": "ping"}
+
+    prober = HealthProber(interval=60)
+    prober.register("llm", probe)
+    asyncio.run(prober.check_all())
+    monkeypatch.setattr(chat, "_health", prober)
+
+    client = TestClient(app)
+    for _ in range(3):
+        response = client.get("/api/health")
+
+    body = response.json()
+    assert body["status"] == "healthy"
+    assert body["details"]["dependencies"]["llm"]["details"] == {"source": "ping"}
+    assert len(calls) == 1
+
+
+def test_health_nao_cria_o_servico_antes_do_aquecimento(monkeypatch):
+    async def create(*args):
+        raise AssertionError("o health check não pode criar o serviço")
+
+    prober = HealthProber(interval=60)
+    prober.register("llm", chat._probe_llm, interval=300)
+    monkeypatch.setattr(chat, "_health", prober)
+    monkeypatch.setattr(chat, "_conversation_service", None)
+    monkeypatch.setattr(chat, "_create_conversation_service", create)
+
+    # HEALTH_PROBE_ENABLED=false: a verificação roda dentro de /health
+    body = TestClient(app).get("/api/health").json()
+
+    assert body["status"] == "starting"
+    assert body["details"]["dependencies"]["llm"]["status"] == "unknown"
+    assert prober.stats["failures"] == 0
+    # Sem o serviço, o LLM volta a ser verificado no intervalo base, não no do LLM
+    assert prober._interval("llm") == 60
@@ -0,0 +1,76 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.api.llm.providers import HedgedProvider
+from app.api.llm.providers.base_provider import BaseLLMProvider
+
+
+class ScriptedProvider(BaseLLMProvider):
+    """Provider local com latência (e falha) roteirizada"""
+
+    def __init__(self, name, latency, fail=False):
+        super().__init__(f"{name}-model", 0.0)
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.cancelled = 0
+
+    def _initialize_llm(self, tools):
+        return object()
+
+    async def invoke(self, messages):
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} indisponível")
+        return AIMessage(content=self.name)
+
+    @property
+    def provider_name(self):
+        return self.name
+
+
+MESSAGES = [HumanMessage(content="oi")]
+
+
+def test_hedge_dispara_segundo_provider_e_cancela_o_lento():
+    slow, fast = ScriptedProvider("lento", 1.0), ScriptedProvider("rapido", 0.01)
+    provider = HedgedProvider([slow, fast], default_hedge_delay=0.05).bind_tools([])
+
+    response = asyncio.run(provider.invoke(MESSAGES))
+
+    assert response.content == "rapido"
+    assert slow.cancelled == 1
+    stats = provider.get_stats()
+    assert stats["hedges"] == 1
+    assert [p["wins"] for p in stats["providers"]] == [0, 1]
+    assert stats["providers"][0]["cancelled"] == 1
+    # O lento, cancelado após o hedge, entra na janela com o tempo decorrido (amostra censurada)
+    assert stats["providers"][0]["censored"] == 1
+    assert provider._latencies[0][0] >= 0.05
+
+
+def test_erro_cai_para_o_proximo_sem_esperar_o_hedge():
+    broken, backup = ScriptedProvider("quebrado", 0.0, fail=True), ScriptedProvider("reserva", 0.0)
+    provider = HedgedProvider([broken, backup], default_hedge_delay=5.0).bind_tools([])
+
+    response = asyncio.run(provider.invoke(MESSAGES))
+
+    assert response.content == "reserva"
+    stats = provider.get_stats()
+    assert stats["fallbacks"] == 1 and stats["hedges"] == 0
+    assert stats["providers"][0]["errors"] == 1
+
+
+def test_atraso_do_hedge_usa_p95_apos_amostras_minimas():
+    primary = ScriptedProvider("primario", 0.0)
+    provider = HedgedProvider([primary, ScriptedProvider("outro", 0.0)],
+                              default_hedge_delay=3.0, min_samples=5, min_hedge_delay=0.0)
+    assert provider.hedge_delay(0) == 3.0
+
+    provider._latencies[0].extend([0.1, 0.1, 0.1, 0.1, 0.5])
+    assert 0.1 < provider.hedge_delay(0) <= 0.5
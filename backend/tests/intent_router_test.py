@@ -0,0 +1,72 @@
+import asyncio
+from datetime import date
+
+from app.api.llm.multiagent.benchmark import run_offline_benchmark
+from app.api.llm.services.intent_router import EVALUATION_CATEGORIES, IntentRouter, evaluate
+
+TODAY = date(2024, 10, 15)
+
+
+def categories():
+    return EVALUATION_CATEGORIES
+
+
+def test_extrai_parametros_e_monta_tool_call():
+    router = IntentRouter.train(allow_writes=True, today=lambda: TODAY)
+
+    match = router.route("Gastei R$ 1.234,56 com aluguel ontem em moradia", categories_loader=categories)
+    assert match.intent == "add_expense" and match.source == "pattern"
+    assert match.tool_calls[0]["name"] == "create_transaction"
+    assert match.slots == {"amount": 1234.56, "category_id": 6, "date": "2024-10-14",
+                           "description": "aluguel", "type": "expense"}
+
+    match = router.route("Qual foi meu saldo no mês passado?")
+    assert match.tool_calls[0] == {"name": "get_balance", "id": "intent_balance",
+                                   "args": {"start_date": "2024-09-01", "end_date": "2024-09-30"}}
+
+    # Sem período não há como chamar a ferramenta: segue pelo LLM
+    assert router.route("Qual o meu saldo?") is None
+    assert router.route("Adicione uma receita de 3000 de salário", categories_loader=categories) is None
+    assert router.get_stats()["fallbacks"] == {"missing_slots": 1}
+
+
+def test_avaliacao_offline_sem_roteamento_errado():
+    results = evaluate(IntentRouter.train(allow_writes=True, today=lambda: TODAY))
+
+    assert results["dispatch_precision"] == 100.0
+    assert results["accuracy"] >= 90.0
+    assert results["avg_route_ms"] < 5
+
+
+def test_escrita_so_com_pedido_imperativo_de_inclusao():
+    router = IntentRouter.train(allow_writes=True, today=lambda: TODAY)
+    not_writes = [
+        "Apague a despesa de 50 reais em lazer",
+        "Remova o gasto de 20 reais em transporte",
+        "Corrija a despesa de 50 reais em lazer para 40",
+        "Como registro uma despesa de 50 reais em lazer?",
+        "Eu já registrei o gasto de 30 reais em alimentação?",
+        "Não adicione a despesa de 50 reais em lazer",
+        "Se eu gastei 100 reais em lazer, quanto sobra do saldo?",
+    ]
+    for text in not_writes:
+        assert router.route(text, categories_loader=categories) is None, text
+
+    # Sem padrão imperativo o modelo não dispara escrita, mesmo confiante
+    assert router.classify("Lançamento de despesa de 10 reais em lazer")[2] == "model"
+    assert router.route("Lançamento de despesa de 10 reais em lazer", categories_loader=categories) is None
+
+    # Escritas ficam desligadas por padrão
+    default = IntentRouter.train(today=lambda: TODAY)
+    assert default.route("Registre uma despesa de R$ 42,50 em lazer", categories_loader=categories) is None
+
+
+def test_benchmark_roteia_sem_chamar_o_llm():
+    baseline = asyncio.run(run_offline_benchmark(iterations=1, warmup=0, transactions=50,
+                                                 response_templates=True))
+    routed = asyncio.run(run_offline_benchmark(iterations=1, warmup=0, transactions=50,
+                                               intent_router=True))
+
+    assert routed["intent_router"]["dispatched"] > 0
+    assert routed["paths"]["custom"]["success_rate"] == 100.0
+    assert routed["paths"]["custom"]["llm_calls_total"] < baseline["paths"]["custom"]["llm_calls_total"]
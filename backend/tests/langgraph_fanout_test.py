@@ -0,0 +1,75 @@
+import asyncio
+import time
+from datetime import datetime
+
+from langchain_core.tools import tool
+
+from app.api.llm.multiagent.benchmark import ScriptedLLMProvider
+from app.api.llm.multiagent.langgraph_implementation import LangGraphFinancialMultiAgent
+
+QUERY = "Análise completa de 2024"
+DELAY = 0.1
+CALLS = [
+    {"name": "get_categories", "args": {}, "id": "c1"},
+    {"name": "get_transactions_by_type", "args": {"type": "income"}, "id": "c2"},
+    {"name": "get_transactions_by_type", "args": {"type": "expense"}, "id": "c3"},
+    {"name": "get_balance", "args": {"start_date": "2024-01-01", "end_date": "2024-12-31"}, "id": "c4"},
+    {"name": "get_top_spending_category", "args": {"start_date": "2024-01-01", "end_date": "2024-12-31"}, "id": "c5"},
+]
+
+
+def slow_tool(name):
+    @tool(name)
+    def run(type: str = "", start_date: str = "", end_date: str = "") -> dict:
+        """Ferramenta lenta de teste"""
+        time.sleep(DELAY)
+        return {"status": "success", "tool": name, "type": type}
+    return run
+
+
+def agent_with_slow_tools(**kwargs):
+    agent = LangGraphFinancialMultiAgent(ScriptedLLMProvider(), **kwargs)
+    for call in CALLS:
+        agent.tool_map[call["name"]] = slow_tool(call["name"])
+    return agent
+
+
+def test_ferramentas_e_agentes_independentes_rodam_em_paralelo():
+    before = datetime.now()
+    result = asyncio.run(agent_with_slow_tools().process_financial_query(QUERY, "u1", tool_calls=CALLS))
+
+    summary = result["execution_summary"]
+    timings = result["state"]["execution_metadata"]["node_timings"]
+    # Buscas e cálculos juntos, como ramos paralelos (sequencial: 5 x DELAY)
+    assert summary["total_execution_time"] < 2.5 * DELAY
+    assert summary["performance_metrics"]["node_seconds"]["data_retriever"] < 2 * DELAY
+    assert {"data_retriever", "calculator", "validator"} <= {t["node"] for t in timings}
+    assert summary["agents_used"]["coordinator"] == 2
+    assert result["errors"] == []
+    # Cada chamada tem o próprio resultado, com os argumentos pedidos pelo LLM
+    assert result["tool_results"]["c3"]["type"] == "expense"
+    assert result["state"]["data_validation"]["status"] == "valid"
+    # started_at é o início do nó, não o fim (as ferramentas levam DELAY)
+    started = {t["node"]: datetime.fromisoformat(t["started_at"]) for t in timings}
+    assert (started["data_retriever"] - before).total_seconds() < DELAY
+    assert abs((started["calculator"] - started["data_retriever"]).total_seconds()) < DELAY
+
+
+def test_limite_de_concorrencia_por_no():
+    result = asyncio.run(
+        agent_with_slow_tools(max_concurrency=1).process_financial_query(QUERY, "u1", tool_calls=CALLS)
+    )
+
+    assert result["execution_summary"]["performance_metrics"]["node_seconds"]["data_retriever"] >= 3 * DELAY
+
+
+def test_no_sem_ferramenta_executavel_relata_erro():
+    agent = LangGraphFinancialMultiAgent(ScriptedLLMProvider())
+    del agent.tool_map["get_balance"]
+    result = asyncio.run(agent.process_financial_query(QUERY, "u1", tool_calls=CALLS[3:4]))
+
+    # Sem nenhuma ferramenta executada: nada de "Análise concluída"
+    assert "get_balance" not in agent.executable_tools
+    assert result["tools_executed"] == []
+    assert result["response"].startswith("Erro no processamento")
+    assert any("get_balance: ferramenta indisponível" in error for error in result["errors"])
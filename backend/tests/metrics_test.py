@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from app.api.llm.multiagent.benchmark import ScriptedLLMProvider, run_offline_benchmark
+from app.api.llm.multiagent.orchestrator import AGENT_TASKS, TOOL_CALL_SECONDS
+from app.api.llm.providers.base_provider import LLM_TOKENS
+from app.data.database import collect_pool_metrics, engine
+from app.main import app
+from app.utils.metrics import MetricsRegistry
+
+
+def test_registro_no_formato_texto():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requisições", ["route"])
+    latency = registry.histogram("latency_seconds", "Latência", buckets=(0.1, 1.0))
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/a\\"b"} 3.0' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+
+    assert registry.counter("requests_total", "Requisições", ["route"]) is requests
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "Outro tipo")
+
+
+def test_metrics_expoe_rotas_e_pool_do_banco():
+    client = TestClient(app)
+    client.get("/")
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/",status="200"}' in response.text
+    assert "# TYPE db_pool_connections gauge" in response.text
+    # Pools sem todos os métodos (SingletonThreadPool com sqlite:///:memory:) não quebram o coletor
+    collect_pool_metrics()
+    if callable(getattr(engine.pool, "checkedout", None)):
+        assert 'db_pool_connections{state="checked_out"}' in response.text
+
+
+def test_llm_registra_tokens_por_provedor():
+    provider = ScriptedLLMProvider()
+    labels = {"provider": provider.provider_name, "model": provider.model_name}
+    before = LLM_TOKENS.get(type="input", **labels)
+
+    async def call():
+        return AIMessage(content="ok", usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15})
+
+    asyncio.run(provider._invoke_with_limits([], call))
+    assert LLM_TOKENS.get(type="input", **labels) - before == 12
+
+
+def test_ferramentas_e_fila_dos_orquestradores():
+    asyncio.run(run_offline_benchmark(iterations=1, warmup=0, transactions=50))
+
+    assert TOOL_CALL_SECONDS.get(tool="get_categories", implementation="custom")["count"] > 0
+    assert AGENT_TASKS.get(implementation="custom", state="queued") == 0
+    assert AGENT_TASKS.get(implementation="custom", state="running") == 0
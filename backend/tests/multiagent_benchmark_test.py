@@ -0,0 +1,55 @@
+import asyncio
+import tracemalloc
+
+from app.api.llm.multiagent.benchmark import (
+    DEFAULT_CORPUS,
+    MultiAgentBenchmark,
+    run_benchmark_subprocess,
+    run_offline_benchmark,
+)
+from app.api.llm.tools import functions
+
+
+def test_benchmark_offline_mede_os_dois_caminhos():
+    results = asyncio.run(run_offline_benchmark(iterations=1, warmup=0, transactions=50))
+
+    custom = results["paths"]["custom"]
+    assert custom["executions"] == len(DEFAULT_CORPUS)
+    assert custom["success_rate"] == 100.0
+    # Perguntas com ferramentas fazem 2 chamadas ao LLM; a saudação, 1
+    assert custom["llm_calls_total"] == 2 * (len(DEFAULT_CORPUS) - 1) + 1
+    assert custom["tool_calls_total"] == sum(len(item["tool_calls"]) for item in DEFAULT_CORPUS)
+    assert custom["peak_memory_bytes"] > 0
+    assert set(custom["latency_seconds"]) == {"p50", "p95", "p99", "mean"}
+    # O LangGraph executa as mesmas ferramentas: a latência dos dois é comparável
+    langgraph = results["paths"]["langgraph"]
+    assert langgraph["tool_calls_total"] == custom["tool_calls_total"]
+    assert langgraph["comparable"] and custom["comparable"]
+
+
+def test_caminho_sem_as_ferramentas_pedidas_fica_fora_da_comparacao():
+    benchmark = MultiAgentBenchmark(hybrid_service=None, db_session=None)
+    run = {"query": "q", "latency": 0.01, "success": True, "llm_calls": 1}
+    benchmark.benchmark_results = {
+        "langgraph": [{**run, "tool_calls": 0}, {**run, "query": "oi", "tool_calls": 0}],
+        "custom": [{**run, "latency": 0.5, "tool_calls": 2}, {**run, "query": "oi", "tool_calls": 0}],
+    }
+
+    analysis = benchmark.analyze_benchmark_results()
+
+    langgraph = analysis["paths"]["langgraph"]
+    assert (langgraph["runs_without_tools"], langgraph["comparable"]) == (1, False)
+    assert langgraph["success_rate"] == 50.0
+    assert analysis["paths"]["custom"]["comparable"]
+    assert analysis["recommendation"].startswith("Sem comparação - langgraph")
+
+
+def test_benchmark_do_endpoint_roda_em_outro_processo():
+    session = functions._db_session
+    results = asyncio.run(run_benchmark_subprocess(iterations=1, warmup=0, transactions=20))
+
+    assert results["paths"]["custom"]["success_rate"] == 100.0
+    assert results["config"]["transactions"] == 20
+    # tracemalloc e a sessão das ferramentas ficaram no processo filho
+    assert not tracemalloc.is_tracing()
+    assert functions._db_session is session
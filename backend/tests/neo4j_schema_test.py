@@ -0,0 +1,61 @@
+from app.api.llm.services.neo4j_schema import Neo4jSchemaManager, SCHEMA_STATEMENTS, plan_operators
+
+
+class FakeSummary:
+    def __init__(self, plan=None):
+        self.plan = plan
+
+
+class FakeResult:
+    def __init__(self, plan=None):
+        self.plan = plan
+
+    def consume(self):
+        return FakeSummary(self.plan)
+
+
+class FakeSession:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def run(self, query, params=None):
+        self.queries.append(query)
+        if not query.startswith("EXPLAIN"):
+            return FakeResult()
+        # Só a consulta de Context ainda varre o label
+        if "Context" in query:
+            return FakeResult({"operatorType": "ProduceResults@neo4j", "children": [
+                {"operatorType": "NodeByLabelScan@neo4j", "children": []}]})
+        return FakeResult({"operatorType": "ProduceResults@neo4j", "children": [
+            {"operatorType": "NodeUniqueIndexSeek(Locking)@neo4j", "children": []},
+            {"operatorType": "NodeIndexSeek@neo4j", "children": []}]})
+
+
+class FakeDriver:
+    def __init__(self):
+        self.queries = []
+
+    def session(self):
+        return FakeSession(self.queries)
+
+
+def test_plan_operators_remove_sufixo_do_runtime():
+    plan = {"operatorType": "Limit@neo4j", "children": [{"operatorType": "NodeIndexSeek@neo4j"}]}
+    assert plan_operators(plan) == ["Limit", "NodeIndexSeek"]
+
+
+def test_ensure_schema_aplica_itens_e_aponta_consulta_sem_indice():
+    driver = FakeDriver()
+    report = Neo4jSchemaManager(driver).ensure_schema()
+
+    assert report["applied"] == [name for name, _ in SCHEMA_STATEMENTS]
+    assert report["plans"]["save_conversation.user"]["uses_index"]
+    assert report["plans"]["get_user_conversation_history"]["uses_index"]
+    assert not report["plans"]["save_conversation.context"]["uses_index"]
+    assert all("IF NOT EXISTS" in query for query in driver.queries[:len(SCHEMA_STATEMENTS)])
@@ -0,0 +1,88 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.api.llm.providers.tool_subset import tool_subset
+from app.api.llm.services.prompt_budget import (
+    PRIORITY_CONTEXT,
+    PRIORITY_REQUIRED,
+    PRIORITY_TOOL_OUTPUT,
+    TRUNCATION_MARKER,
+    PromptBudget,
+    TokenEstimator,
+)
+from app.api.llm.tools.functions import get_tools
+
+
+def make_budget(total_tokens):
+    return PromptBudget(TokenEstimator(chars_per_token=4.0), total_tokens=total_tokens,
+                        completion_reserve=0, min_section_tokens=8)
+
+
+def test_prompt_dentro_do_orcamento_nao_e_cortado():
+    budget = make_budget(1000)
+    messages = [HumanMessage(content="sistema"), HumanMessage(content="contexto"), HumanMessage(content="pergunta")]
+
+    plan = budget.fit(messages, [PRIORITY_REQUIRED, PRIORITY_CONTEXT, PRIORITY_REQUIRED])
+
+    assert plan.messages == messages
+    assert plan.trimmed == {}
+    assert not plan.over_budget
+
+
+def test_corta_contexto_antes_das_ferramentas_e_preserva_obrigatorias():
+    budget = make_budget(200)
+    system = HumanMessage(content="s" * 200)
+    context = HumanMessage(content="\n".join(f"linha de contexto {i}" for i in range(100)))
+    question = HumanMessage(content="Quanto gastei?")
+    call = AIMessage(content="", tool_calls=[{"name": "get_categories", "args": {}, "id": "c1"}])
+    tool = ToolMessage(content="r" * 300, tool_call_id="c1")
+
+    plan = budget.fit(
+        [system, context, question, call, tool],
+        [PRIORITY_REQUIRED, PRIORITY_CONTEXT, PRIORITY_REQUIRED, PRIORITY_REQUIRED, PRIORITY_TOOL_OUTPUT],
+    )
+
+    fitted = plan.messages
+    assert fitted[0] is system and fitted[2] is question and fitted[3] is call
+    assert fitted[1].content.endswith(TRUNCATION_MARKER)
+    assert fitted[1].content.split("\n")[-2].startswith("linha de contexto")  # cortado numa quebra de linha
+    assert fitted[4].tool_call_id == "c1"
+    assert 1 in plan.trimmed
+    assert plan.estimated_tokens <= plan.budget
+    assert budget.get_stats()["trimmed_requests"] == 1
+
+
+def test_record_calibra_estimativa_pelo_uso_real():
+    budget = make_budget(1000)
+    plan = budget.fit([HumanMessage(content="x" * 400)], [PRIORITY_REQUIRED])
+    response = AIMessage(content="ok", usage_metadata={
+        "input_tokens": plan.estimated_tokens * 2, "output_tokens": 1,
+        "total_tokens": plan.estimated_tokens * 2 + 1})
+
+    budget.record(plan, response)
+
+    stats = budget.get_stats()
+    assert stats["measured_requests"] == 1
+    assert stats["actual_tokens"] == plan.estimated_tokens * 2
+    assert stats["estimation_error"] == -50.0
+    assert budget.estimator.correction > 1.0
+
+
+def test_schemas_das_ferramentas_reservados_e_fora_da_calibracao():
+    budget = make_budget(4000)
+    budget.measure_tools(get_tools())
+    full = budget.tool_schema_tokens()
+    with tool_subset(["get_balance", "get_categories"]):
+        assert 0 < budget.tool_schema_tokens() < full
+
+    plan = budget.fit([HumanMessage(content="x" * 400)], [PRIORITY_REQUIRED])
+    assert plan.reserved_tokens == full
+    assert plan.budget == 4000 - full
+
+    # O provedor conta mensagens + schemas: a estimativa das mensagens estava certa
+    response = AIMessage(content="ok", usage_metadata={
+        "input_tokens": plan.estimated_tokens + full, "output_tokens": 1,
+        "total_tokens": plan.estimated_tokens + full + 1})
+    budget.record(plan, response)
+
+    assert budget.estimator.correction == 1.0
+    assert budget.get_stats()["estimation_error"] == 0.0
@@ -0,0 +1,15 @@
+from app.api.llm.services.rag_service import build_fulltext_query
+
+
+def test_build_fulltext_query_tokeniza_e_remove_stopwords():
+    query = build_fulltext_query("Qual a maior despesa do mês?")
+    assert query == "maior OR despesa OR mês"
+
+
+def test_build_fulltext_query_escapa_sintaxe_lucene():
+    query = build_fulltext_query('gastos "mercado" AND (lazer)~ OR saúde*')
+    assert query == "gastos OR mercado OR and OR lazer OR or OR saúde"
+
+
+def test_build_fulltext_query_vazia():
+    assert build_fulltext_query("o que é?") == ""
@@ -0,0 +1,77 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.api.llm.providers.base_provider import BaseLLMProvider
+from app.api.llm.providers.rate_limiter import RateLimiter, parse_retry_after
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.status_code = 429
+        self.headers = headers
+
+
+class FakeRateLimitError(Exception):
+    def __init__(self, headers=None, message="Too Many Requests"):
+        super().__init__(message)
+        self.response = FakeResponse(headers or {})
+
+
+class ThrottledProvider(BaseLLMProvider):
+    """Responde 429 nas primeiras chamadas"""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__("stub-model", 0.0, **kwargs)
+        self.failures = failures
+        self.calls = 0
+
+    def _initialize_llm(self, tools):
+        return object()
+
+    async def invoke(self, messages):
+        async def call():
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise FakeRateLimitError({"retry-after": "0.05"})
+            return AIMessage(content="ok", usage_metadata={
+                "input_tokens": 10, "output_tokens": 5, "total_tokens": 15})
+        return await self._invoke_with_limits(messages, call)
+
+
+def test_parse_retry_after_de_headers_e_mensagens():
+    assert parse_retry_after(FakeRateLimitError({"retry-after-ms": "250"})) == 0.25
+    assert parse_retry_after(Exception("429 Resource exhausted. Please retry in 12.5s")) == 12.5
+    assert parse_retry_after(Exception("quota\nretry_delay {\n  seconds: 7\n}\n 429")) == 7.0
+    assert parse_retry_after(FakeRateLimitError()) == 0.0
+    assert parse_retry_after(ValueError("payload inválido")) is None
+
+
+def test_fila_espera_saldo_de_tokens_em_ordem():
+    limiter = RateLimiter(tokens_per_minute=6000)
+    order = []
+
+    async def request(name, tokens):
+        await limiter.acquire(tokens)
+        order.append(name)
+
+    async def scenario():
+        await asyncio.gather(request("a", 6000), request("b", 10), request("c", 10))
+
+    asyncio.run(scenario())
+
+    assert order == ["a", "b", "c"]
+    stats = limiter.get_stats()
+    assert stats["queued"] == 2
+    assert 0.08 < stats["max_wait_seconds"] < 1.0
+
+
+def test_429_bloqueia_fila_e_repete_a_chamada():
+    provider = ThrottledProvider(failures=1, requests_per_minute=600)
+    response = asyncio.run(provider.invoke([HumanMessage(content="oi")]))
+
+    assert response.content == "ok"
+    assert provider.calls == 2
+    assert response.response_metadata["queue_wait_seconds"] >= 0.04
+    assert provider.extra_params["max_retries"] == 0
+    assert provider.get_model_info()["rate_limit"]["rate_limited_429"] == 1
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.api.llm.multiagent.benchmark import DEFAULT_CORPUS, run_offline_benchmark
+from app.api.llm.multiagent.models import AgentResult, AgentRole
+from app.api.llm.services.response_templates import ResponseTemplateRegistry, format_currency
+
+
+def result(tool_name, payload, success=True):
+    return AgentResult(task_id=f"task_{tool_name}", agent_role=AgentRole.DATA_RETRIEVER,
+                       tool_name=tool_name, success=success, result=payload)
+
+
+def test_renderiza_quando_todas_as_ferramentas_tem_template_e_sucesso():
+    registry = ResponseTemplateRegistry.default()
+    calls = [
+        {"name": "get_top_spending_category", "args": {"start_date": "2024-01-01", "end_date": "2024-12-31"}},
+        {"name": "get_categories", "args": {}},
+    ]
+    results = [
+        result("get_categories", {"status": "success", "data": [{"id": 1, "name": "Alimentação"}]}),
+        result("get_top_spending_category", {"status": "success", "data": {"category": "Moradia", "total": 1234.5}}),
+    ]
+
+    text = registry.render(calls, results)
+
+    assert text.startswith("A categoria com maior gasto entre 01/01/2024 e 31/12/2024 foi Moradia, com R$ 1.234,50.")
+    assert "- Alimentação (ID 1)" in text
+    stats = registry.get_stats()
+    assert stats["llm_calls_saved"] == 1
+    assert stats["by_tool"] == {"get_top_spending_category": 1, "get_categories": 1}
+
+
+def test_erro_ou_ferramenta_sem_template_volta_para_o_llm():
+    registry = ResponseTemplateRegistry.default()
+    not_found = {"status": "error", "message": "Transação com ID 9 não encontrada."}
+
+    assert registry.render([{"name": "get_transaction_by_id", "args": {"transaction_id": 9}}],
+                           [result("get_transaction_by_id", not_found)]) is None
+    assert not registry.supports([{"name": "get_categories", "args": {}},
+                                  {"name": "get_all_transactions", "args": {}}])
+    assert registry.get_stats()["fallbacks"] == 1
+    assert format_currency(0.5) == "R$ 0,50"
+
+
+def test_benchmark_com_templates_economiza_segunda_chamada():
+    results = asyncio.run(run_offline_benchmark(iterations=1, warmup=0, transactions=50,
+                                                response_templates=True))
+
+    saved = results["response_templates"]["llm_calls_saved"]
+    assert saved >= 3
+    custom = results["paths"]["custom"]
+    assert custom["llm_calls_total"] < 2 * (len(DEFAULT_CORPUS) - 1) + 1
@@ -0,0 +1,28 @@
+import asyncio
+
+from app.api.llm.multiagent.benchmark import ScriptedLLMProvider, create_seeded_session
+from app.api.llm.multiagent.langgraph_implementation import LangGraphFinancialMultiAgent
+from app.api.llm.multiagent.result_store import is_handle
+from app.api.llm.tools.functions import set_db_session
+
+CALLS = [{"name": "get_all_transactions", "args": {}, "id": "c1"}]
+
+
+def test_estado_guarda_handles_e_resultados_ficam_no_store():
+    set_db_session(create_seeded_session(transactions=2000))
+    agent = LangGraphFinancialMultiAgent(ScriptedLLMProvider())
+
+    result = asyncio.run(agent.process_financial_query("Liste minhas transações", "u1", tool_calls=CALLS))
+
+    state = result["state"]
+    assert is_handle(state["tool_results"]["c1"])
+    store = agent.result_stores.get(state["run_id"])
+    grouped = store.get(state["tool_results"]["c1"])["data"]
+    assert sum(len(rows) for rows in grouped.values()) == 2000
+    assert result["tool_results"]["c1"] == store.get(state["tool_results"]["c1"])
+
+    # As 2000 transações não entram nos checkpoints
+    metrics = result["execution_summary"]["performance_metrics"]
+    assert metrics["checkpoint_bytes"] < 64 * 1024
+    assert metrics["stored_results"] == 1
+    assert agent.stats["checkpoint_bytes"] == metrics["checkpoint_bytes"]
@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Orçamento da subida: tempo de import de app.api.llm.chat (python -X importtime) e RSS do processo
+IMPORT_BUDGET_SECONDS = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", 4.0))
+RSS_BUDGET_MB = float(os.getenv("STARTUP_RSS_BUDGET_MB", 192))
+
+LAZY_MODULES = ("langchain_google_genai", "langchain_openai", "langchain_groq", "langgraph")
+
+# VmRSS atual: ru_maxrss herda o pico do processo pai (pytest) através do fork/exec
+PROBE = """
+import json, resource, sys
+import app.api.llm.chat
+try:
+    with open("/proc/self/status") as status:
+        rss_mb = next(int(line.split()[1]) for line in status if line.startswith("VmRSS:")) / 1024
+except OSError:
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({
+    "rss_mb": rss_mb,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def _import_chat():
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "PYTHONPATH": "."},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = next(
+        int(line.split("|")[1])
+        for line in completed.stderr.splitlines()
+        if line.startswith("import time:") and line.rstrip().endswith("| app.api.llm.chat")
+    )
+    return cumulative_us / 1e6, json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_import_do_chat_dentro_do_orcamento():
+    seconds, probe = _import_chat()
+
+    # SDKs dos provedores e LangGraph ficam para o primeiro uso
+    assert probe["loaded"] == []
+    assert seconds < IMPORT_BUDGET_SECONDS, f"import de app.api.llm.chat levou {seconds:.2f}s"
+    assert probe["rss_mb"] < RSS_BUDGET_MB, f"RSS após o import: {probe['rss_mb']:.0f} MB"
+
+
+def test_factory_resolve_provedor_sob_demanda():
+    from app.api.llm.providers import LLMProviderFactory
+
+    assert "groq" in LLMProviderFactory.get_available_providers()
+    provider_class = LLMProviderFactory.get_provider_class("lmstudio")
+    assert provider_class.__name__ == "LMStudioProvider"
+    assert LLMProviderFactory.get_provider_class("lmstudio") is provider_class
@@ -0,0 +1,65 @@
+import asyncio
+
+from app.api.llm.multiagent.benchmark import ScriptedLLMProvider, StaticContextService, run_offline_benchmark
+from app.api.llm.multiagent.hybrid_conversation_service import HybridConversationService
+from app.api.llm.multiagent.strategy_selector import StrategySelector, bucket_key
+
+CALLS = [{"name": "get_categories", "args": {}}, {"name": "get_balance", "args": {}}]
+LATENCY = {"langgraph": 0.5, "custom": 0.1}
+
+
+def test_aprende_o_caminho_mais_rapido_por_bucket():
+    selector = StrategySelector(epsilon=0.0, min_samples=2, seed=1)
+    bucket = bucket_key(CALLS, "balance")
+    assert bucket == "n=2|tools=get_balance,get_categories|intent=balance"
+
+    for _ in range(10):
+        decision = selector.choose(bucket, static_path="langgraph")
+        selector.record(decision, LATENCY[decision.path], success=True)
+
+    stats = selector.get_stats()
+    assert stats["decisions"] == {"warmup": 4, "exploit": 6}
+    assert stats["paths"] == {"langgraph": 2, "custom": 8}
+    assert stats["buckets"][bucket]["custom"]["latency_ewma"] == 0.1
+    assert stats["recent_decisions"][-1]["reason"] == "exploit"
+
+
+def test_falhas_pesam_contra_o_caminho_rapido():
+    selector = StrategySelector(epsilon=0.0, min_samples=3)
+    for _ in range(6):
+        decision = selector.choose("b", static_path="custom")
+        selector.record(decision, LATENCY[decision.path], success=decision.path == "langgraph")
+
+    assert selector.choose("b", static_path="custom").path == "langgraph"
+
+
+def test_kill_switch_volta_para_as_regras_estaticas():
+    selector = StrategySelector(enabled=False)
+    decision = selector.choose("b", static_path="langgraph")
+    assert (decision.path, decision.reason) == ("langgraph", "static")
+    assert selector.choose("b", static_path="langgraph", available=["custom"]).path == "custom"
+
+
+def test_escritas_e_ferramentas_fora_do_grafo_nao_vao_para_o_langgraph():
+    service = HybridConversationService(
+        llm_provider=ScriptedLLMProvider(),
+        rag_service=StaticContextService(),
+        strategy_selector=StrategySelector(epsilon=1.0),
+    )
+    write = [{"name": "create_transaction", "args": {}}] * 3
+
+    assert service._choose_path(write, "análise completa") == ("custom", None)
+    assert service._choose_path([{"name": "get_stock_price", "args": {}}], "cotação") == ("custom", None)
+    path, decision = service._choose_path(CALLS * 2, "análise completa")
+    assert decision is not None and decision.static_path == "langgraph"
+    service.strategy_override = "langgraph"
+    assert service._choose_path(write, "análise completa") == ("custom", None)
+
+
+def test_seletor_decide_entre_os_caminhos_com_ferramentas_do_app():
+    results = asyncio.run(run_offline_benchmark(iterations=2, warmup=0, transactions=50, adaptive_strategy=True))
+
+    assert results["paths"]["adaptive"]["success_rate"] == 100.0
+    assert results["paths"]["langgraph"]["tool_calls_per_query"] > 0
+    assert sum(results["strategy_selector"]["decisions"].values()) > 0
+    assert results["strategy_selector"]["paths"]["langgraph"] > 0
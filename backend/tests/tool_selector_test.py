@@ -0,0 +1,72 @@
+import asyncio
+
+from app.api.llm.multiagent.benchmark import ScriptedLLMProvider, run_offline_benchmark
+from app.api.llm.providers.cached_provider import CachingProvider
+from app.api.llm.providers.tool_subset import tool_subset
+from app.api.llm.services.intent_router import IntentRouter
+from app.api.llm.services.tool_selector import ToolSelector
+from app.api.llm.tools.functions import get_tools
+
+
+class BindingRecorder(ScriptedLLMProvider):
+    def __init__(self):
+        super().__init__()
+        self.bound = []
+
+    def _initialize_llm(self, tools):
+        self.bound.append(sorted(tool.name for tool in tools))
+        return self.bound[-1]
+
+
+def test_provider_reaproveita_clientes_por_subconjunto():
+    provider = BindingRecorder()
+    cached = CachingProvider(provider)
+    cached.bind_tools(get_tools())
+    cached.prebind_tool_subsets([{"get_balance", "get_categories"}])
+    assert provider.bound[-1] == ["get_balance", "get_categories"]
+
+    full_key = cached.cache_key([])
+    with tool_subset(["get_categories", "get_balance", "ferramenta_inexistente"]):
+        assert provider._get_bound_llm() == ["get_balance", "get_categories"]
+        assert cached.cache_key([]) != full_key
+    with tool_subset(None):
+        assert len(provider._get_bound_llm()) == len(get_tools())
+
+    assert len(provider.bound) == 2
+    assert provider.get_model_info()["tool_binding"]["subset_hits"] == 1
+
+
+def test_seletor_vincula_so_o_grupo_da_intencao():
+    selector = ToolSelector(IntentRouter.train())
+    selector.measure(get_tools())
+
+    subset = selector.select("Qual foi meu saldo no mês passado?")
+    assert {"get_balance", "get_categories"} <= subset and len(subset) < len(get_tools())
+    assert selector.select("Olá, tudo bem?") is None
+
+    stats = selector.get_stats()
+    assert stats["by_intent"] == {"balance": 1}
+    assert 0 < stats["schema_tokens_saved"] < stats["schema_tokens_full"]
+
+
+def test_benchmark_com_subconjuntos_mantem_as_respostas():
+    results = asyncio.run(run_offline_benchmark(iterations=1, warmup=0, transactions=50, tool_subsets=True))
+
+    assert results["tool_selector"]["selections"] > 0
+    assert results["tool_binding"]["subset_misses"] == 0
+    # O grafo LangGraph não executa as ferramentas do app e relata erro: só o caminho customizado conta
+    assert results["paths"]["custom"]["success_rate"] == 100.0
+
+
+def test_apagar_ou_corrigir_vincula_todas_as_ferramentas():
+    selector = ToolSelector(IntentRouter.train())
+    selector.measure(get_tools())
+
+    for text in ("Apague a despesa de 50 reais em lazer",
+                 "Exclua o gasto de 20 reais em transporte",
+                 "Corrija a despesa de 30 reais em mercado para 35"):
+        assert selector.select(text) is None, text
+
+    # Subconjunto de escrita só com o pedido imperativo reconhecido pelo padrão
+    assert "create_transaction" in selector.select("Adicione uma despesa de 50 reais em lazer")
+    assert selector.select("Despesa de 50 reais em lazer ontem") is None
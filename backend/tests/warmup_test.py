@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.api.llm import chat
+from app.api.llm.warmup import WarmupState
+from app.main import app
+
+
+async def ok():
+    return "pronto"
+
+
+async def fails():
+    raise ConnectionError("recusado")
+
+
+def test_pronto_so_quando_etapas_obrigatorias_terminam_bem():
+    state = WarmupState()
+    assert state.ready  # sem aquecimento: modo preguiçoso
+
+    state.start()
+    assert asyncio.run(state.run_step("database", ok)) == "pronto"
+    assert not state.ready  # ainda aquecendo
+    asyncio.run(state.run_step("caches", fails, required=False))
+    state.finish()
+    assert state.ready
+
+    payload = state.to_dict()
+    assert payload["components"]["caches"]["status"] == "error"
+    assert payload["components"]["database"]["seconds"] >= 0
+
+    state.start()
+    asyncio.run(state.run_step("neo4j", fails))
+    state.finish()
+    assert not state.ready
+
+
+def test_ready_reporta_componentes_do_lifespan(monkeypatch):
+    # Sem Neo4j no ambiente de teste: o banco aquece e o serviço fica não pronto
+    monkeypatch.delenv("NEO4J_PASSWORD", raising=False)
+    monkeypatch.setattr(chat, "_warmup", WarmupState())
+
+    with TestClient(app) as client:
+        for _ in range(100):
+            if chat._warmup.finished_at is not None:
+                break
+            time.sleep(0.05)
+        response = client.get("/api/ready")
+
+    assert response.status_code == 503
+    components = response.json()["components"]
+    assert components["database"]["status"] == "ok"
+    assert components["neo4j"]["status"] == "error"
+    assert "conversation_service" not in components
+
+
+def test_servico_de_conversacao_montado_fora_do_event_loop(monkeypatch):
+    built, listening = [], []
+
+    def build(neo4j_driver, redis_client):
+        built.append(threading.current_thread() is threading.main_thread())
+        time.sleep(0.05)
+        return SimpleNamespace(rag_service=SimpleNamespace(start_cache_listener=lambda: listening.append(1)))
+
+    monkeypatch.setattr(chat, "_conversation_service", None)
+    monkeypatch.setattr(chat, "_conversation_service_lock", asyncio.Lock())
+    monkeypatch.setattr(chat, "_build_conversation_service", build)
+
+    async def scenario():
+        return await asyncio.gather(*(chat._create_conversation_service(None, None) for _ in range(3)))
+
+    services = asyncio.run(scenario())
+    assert built == [False]  # uma vez, numa thread
+    assert listening == [1]
+    assert services[0] is services[1] is services[2]
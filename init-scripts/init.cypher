@@ -1,10 +1,9 @@
+// Schema usado pelo chat (RAGService). O backend aplica o mesmo schema
+// na inicialização (Neo4jSchemaManager), então este script é idempotente.
+CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE;
+CREATE CONSTRAINT context_hash_unique IF NOT EXISTS FOR (c:Context) REQUIRE c.hash IS UNIQUE;
+CREATE RANGE INDEX question_user_created_at IF NOT EXISTS FOR (q:Question) ON (q.userId, q.createdAt);
 
 // Exemplo de estrutura inicial
-CREATE CONSTRAINT IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE;
-CREATE CONSTRAINT IF NOT EXISTS FOR (p:Pergunta) REQUIRE p.text IS UNIQUE;
-CREATE CONSTRAINT IF NOT EXISTS FOR (r:Resposta) REQUIRE r.text IS UNIQUE;
-CREATE CONSTRAINT IF NOT EXISTS FOR (c:Contexto) REQUIRE c.hash IS UNIQUE;
-
-MERGE (u:User {id: "lucas", nome: "Lucas Florentino"})
-MERGE (c:Contexto {hash: "ctx-001", descricao: "Consulta financeira"})
-MERGE (u)-[:FEZ_PERGUNTA]->(c);
+MERGE (u:User {id: "lucas"})
+ON CREATE SET u.nome = "Lucas Florentino";